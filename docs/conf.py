@@ -18,6 +18,17 @@ sys.path.insert(
     ))
 )
 
+# robottelo.ssh_async uses the async/await syntax of Python 3.5 and can not be
+# imported by older interpreters. Document a placeholder module instead.
+if sys.version_info < (3, 5):
+    import types
+    sys.modules['robottelo.ssh_async'] = types.ModuleType(
+        'robottelo.ssh_async',
+        'Asyncio based engine to run commands on remote hosts. It requires '
+        'Python 3.5 or later, build the documentation with such a version '
+        'to read its reference.'
+    )
+
 # Project Information ---------------------------------------------------------
 
 project = u'Robottelo'
@@ -0,0 +1,272 @@
+# -*- encoding: utf-8 -*-
+"""Cache of the objects created by the factory functions.
+
+Objects are cached under a key made of a name, usually the kind of object,
+and of the options used to create it, so objects created with different
+options are cached apart. The cache keeps a bounded number of objects,
+dropping the least recently used ones first, and objects can expire after
+some time.
+
+The cache can be shared by several processes, like the ``py.test-xdist``
+workers, through a directory where the JSON serializable objects are stored:
+an object created by a process is then reused by the others. The objects only
+exist on the server they were created on, so they are stored apart for every
+server hostname, and stored objects expire after ``DEFAULT_DISK_TTL`` seconds
+if no time to live is set, as the server may be reprovisioned meanwhile.
+
+The cache size, the objects time to live and the shared directory are read
+from the ``object_cache_size``, ``object_cache_ttl`` and ``object_cache_dir``
+settings when not given.
+
+"""
+import errno
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+
+from collections import OrderedDict
+from robottelo.config import settings
+from robottelo.helpers import canonical_options
+
+logger = logging.getLogger(__name__)
+
+# Maximum number of objects cached in memory by default
+DEFAULT_MAX_SIZE = 128
+# Seconds after which objects stored on disk expire by default
+DEFAULT_DISK_TTL = 3600
+
+
+class ObjectCache(object):
+    """A thread-safe LRU cache with optional expiration and disk storage.
+
+    :param int max_size: The maximum number of objects kept in memory.
+    :param int ttl: The number of seconds after which an object expires.
+        Objects kept in memory never expire if not set, the ones stored on
+        disk expire after ``DEFAULT_DISK_TTL`` seconds.
+    :param str path: The directory where the objects are shared with other
+        processes. Objects are kept in memory only if not set.
+
+    """
+
+    def __init__(self, max_size=None, ttl=None, path=None):
+        self._max_size = max_size
+        self._ttl = ttl
+        self._path = path
+        self._entries = OrderedDict()
+        self._lock = threading.RLock()
+        self._key_locks = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def max_size(self):
+        """The maximum number of objects kept in memory."""
+        if self._max_size is not None:
+            return self._max_size
+        return settings.object_cache_size or DEFAULT_MAX_SIZE
+
+    @property
+    def ttl(self):
+        """The number of seconds after which an object expires."""
+        if self._ttl is not None:
+            return self._ttl
+        return settings.object_cache_ttl
+
+    @property
+    def path(self):
+        """The directory where the objects are shared with other processes.
+        """
+        if self._path is not None:
+            return self._path
+        return settings.object_cache_dir
+
+    @property
+    def _server_path(self):
+        """The directory where the objects of the configured server are
+        shared.
+
+        """
+        return os.path.join(
+            self.path, settings.server.hostname or u'no-server')
+
+    @staticmethod
+    def make_key(name, options=None):
+        """Build the key of the object created by ``name`` with ``options``.
+
+        :param str name: The kind of object, like ``org``.
+        :param dict options: The options used to create the object.
+
+        """
+        digest = hashlib.sha1(
+            canonical_options(options).encode('utf-8')).hexdigest()
+        return u'{0}-{1}'.format(name, digest)
+
+    def _expired(self, created, stored=False):
+        """Whether an object created at ``created`` has expired.
+
+        :param bool stored: Whether the object was read from the disk, where
+            objects expire even if no time to live is set.
+
+        """
+        ttl = self.ttl
+        if ttl is None and stored:
+            ttl = DEFAULT_DISK_TTL
+        return ttl is not None and time.time() - created > ttl
+
+    def _file(self, key):
+        """Return the path of the file storing ``key`` on disk."""
+        return os.path.join(self._server_path, u'{0}.json'.format(key))
+
+    def _load(self, key):
+        """Read ``key`` from the disk storage.
+
+        :return: A tuple with the object and its creation time, or ``None``
+            if it is not stored or has expired.
+
+        """
+        try:
+            with open(self._file(key)) as handler:
+                entry = json.load(handler)
+        except (IOError, OSError, ValueError):
+            return None
+        if self._expired(entry['created'], stored=True):
+            return None
+        return (entry['value'], entry['created'])
+
+    def _store(self, key, value, created):
+        """Write ``key`` to the disk storage.
+
+        The file is written under a temporary name and renamed, so other
+        processes never read a partial file.
+
+        """
+        try:
+            data = json.dumps({'created': created, 'value': value})
+        except (TypeError, ValueError):
+            logger.debug(u'Object %s is not shared, not serializable', key)
+            return
+        path = self._server_path
+        try:
+            os.makedirs(path)
+        except OSError as err:
+            if err.errno != errno.EEXIST:
+                raise
+        handle, temp_name = tempfile.mkstemp(dir=path, suffix='.tmp')
+        with os.fdopen(handle, 'w') as handler:
+            handler.write(data)
+        os.rename(temp_name, self._file(key))
+
+    def _lookup(self, key):
+        """Return the entry of ``key`` or ``None``, updating the stats."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._expired(entry[1]):
+                del self._entries[key]
+                entry = None
+            if entry is None and self.path:
+                entry = self._load(key)
+                if entry is not None:
+                    self._insert(key, entry)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            # Mark the entry as the most recently used
+            self._insert(key, entry)
+            return entry
+
+    def _insert(self, key, entry):
+        """Add an entry in memory, evicting the least recently used ones."""
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = entry
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def __contains__(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and not self._expired(entry[1]):
+                return True
+        return bool(self.path) and self._load(key) is not None
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def __getitem__(self, key):
+        entry = self._lookup(key)
+        if entry is None:
+            raise KeyError(key)
+        return entry[0]
+
+    def __setitem__(self, key, value):
+        created = time.time()
+        self._insert(key, (value, created))
+        if self.path:
+            self._store(key, value, created)
+
+    def __delitem__(self, key):
+        with self._lock:
+            del self._entries[key]
+        if self.path:
+            try:
+                os.remove(self._file(key))
+            except OSError:
+                pass
+
+    def get(self, key, default=None):
+        """Return the object cached under ``key``, or ``default``."""
+        entry = self._lookup(key)
+        return default if entry is None else entry[0]
+
+    def get_or_create(self, key, create):
+        """Return the object cached under ``key``, creating it if needed.
+
+        Threads asking for the same missing key wait for a single call of
+        ``create``, while other keys are still served.
+
+        :param create: A callable returning the object to cache.
+
+        """
+        entry = self._lookup(key)
+        if entry is not None:
+            return entry[0]
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        try:
+            with key_lock:
+                with self._lock:
+                    entry = self._entries.get(key)
+                if entry is not None and not self._expired(entry[1]):
+                    return entry[0]
+                value = create()
+                self[key] = value
+                return value
+        finally:
+            # Threads still waiting hold the lock and find the stored object
+            with self._lock:
+                if self._key_locks.get(key) is key_lock:
+                    del self._key_locks[key]
+
+    def clear(self):
+        """Drop all the objects kept in memory."""
+        with self._lock:
+            self._entries.clear()
+            self._key_locks.clear()
+
+    def stats(self):
+        """Return a dictionary with the cache statistics."""
+        with self._lock:
+            return {
+                u'evictions': self.evictions,
+                u'hits': self.hits,
+                u'misses': self.misses,
+                u'size': len(self._entries),
+            }
@@ -1,12 +1,44 @@
 # -*- encoding: utf-8 -*-
 """Generic base class for cli hammer commands."""
 import logging
+import re
 
 from robottelo import ssh
-from robottelo.cli import hammer
+from robottelo.cli import hammer, hammer_session, hammer_shell
 from robottelo.config import settings
 
 
+# A foreman task UUID, as reported by hammer commands run with --async
+_TASK_ID = re.compile(
+    r'[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}')
+
+
+def _time_hammer():
+    """Whether hammer commands should be timed for performance tests."""
+    if settings.performance:
+        return settings.performance.time_hammer
+    return False
+
+
+def _use_hammer_shell():
+    """Whether hammer commands are run through ``hammer shell`` sessions.
+
+    Timed commands always run their own hammer process, so their timing
+    covers a whole hammer run.
+
+    """
+    return settings.hammer_shell and not _time_hammer()
+
+
+def _use_hammer_sessions():
+    """Whether hammer commands are authenticated by server-side sessions.
+
+    ``hammer shell`` sessions authenticate only once anyway.
+
+    """
+    return settings.hammer_sessions and not _use_hammer_shell()
+
+
 class CLIError(Exception):
     """Indicates that a CLI command could not be run."""
 
@@ -86,13 +118,21 @@ class Base(object):
     @since: 27.Nov.2013
     """
     command_base = None  # each inherited instance should define this
-    command_sub = None  # specific to instance, like: create, update, etc
     command_requires_org = False  # True when command requires organization-id
+    # Subcommands which do not require organization-id even when
+    # ``command_requires_org`` is True
+    org_optional_subcommands = ()
+    # False when ``create`` can't chain a plain ``info`` command to fetch the
+    # new record, e.g. because ``info`` output needs a special processing
+    create_chains_info = True
+    # Whether the wrappers request JSON output from hammer instead of CSV or
+    # the info text output. ``None`` follows the ``hammer_json`` setting
+    json_output = None
 
     logger = logging.getLogger('robottelo')
 
     @classmethod
-    def _handle_response(cls, response, ignore_stderr=None):
+    def _handle_response(cls, response, ignore_stderr=None, command=None):
         """Verify ``return_code`` of the CLI command.
 
         Check for a non-zero return code or any stderr contents.
@@ -101,6 +141,8 @@ class Base(object):
             :mod:`robottelo.ssh.command`.
         :param ignore_stderr: indicates whether to throw a warning in logs if
             ``stderr`` is not empty.
+        :param command: the hammer command which produced ``response``, used
+            in the error message.
         :returns: contents of ``stdout``.
         :raises robottelo.cli.base.CLIReturnCodeError: If return code is
             different from zero.
@@ -109,11 +151,10 @@ class Base(object):
             raise CLIReturnCodeError(
                 response.return_code,
                 response.stderr,
-                u'Command "{0} {1}" finished with return_code {2}\n'
-                'stderr contains following message:\n{3}'
+                u'Command "{0}" finished with return_code {1}\n'
+                'stderr contains following message:\n{2}'
                 .format(
-                    cls.command_base,
-                    cls.command_sub,
+                    command or cls.command_base,
                     response.return_code,
                     response.stderr,
                 )
@@ -131,54 +172,145 @@ class Base(object):
         Adds OS to record.
         """
 
-        cls.command_sub = 'add-operatingsystem'
-
-        result = cls.execute(cls._construct_command(options))
+        result = cls.execute(
+            cls._construct_command('add-operatingsystem', options))
 
         return result
 
     @classmethod
-    def create(cls, options=None):
+    def create(cls, options=None, fetch_info=True, json_output=None):
         """
         Creates a new record using the arguments passed via dictionary.
-        """
 
-        cls.command_sub = 'create'
+        The new record is then fetched with the ``info`` command. Unless
+        ``hammer shell`` sessions are used, both commands are chained in a
+        single remote invocation, see :meth:`_create_with_info`.
+
+        :param options: The ``create`` command options.
+        :param fetch_info: If ``False``, the ``info`` command is not run and
+            only the ``create`` output, which includes the new record ID, is
+            returned.
+        :param json_output: Whether to request JSON output, see
+            :meth:`_use_json`.
+        """
 
         if options is None:
             options = {}
 
+        if not fetch_info:
+            return cls.execute(
+                cls._construct_command('create', options),
+                output_format='csv',
+                json_output=json_output,
+            )
+
+        # Some Katello obj require the organization-id for subcommands
+        info_options = {}
+        info_requires_org = cls._requires_org('info')
+        if info_requires_org and 'organization-id' in options:
+            info_options[u'organization-id'] = options[u'organization-id']
+
+        if (cls.create_chains_info and not _use_hammer_shell() and
+                (info_options or not info_requires_org)):
+            result, new_obj = cls._create_with_info(
+                options, info_options, json_output)
+            # stdout should be a dictionary containing the object
+            if new_obj:
+                result = new_obj
+            return result
+
         result = cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command('create', options),
+            output_format='csv',
+            json_output=json_output,
+        )
 
         # Extract new object ID if it was successfully created
         if len(result) > 0 and 'id' in result[0]:
             obj_id = result[0]['id']
 
             # Fetch new object
-            # Some Katello obj require the organization-id for subcommands
-            info_options = {u'id': obj_id}
-            if cls.command_requires_org:
-                if 'organization-id' not in options:
-                    raise CLIError(
-                        'organization-id option is required for {0}.create'
-                        .format(cls.__name__)
-                    )
-                info_options[u'organization-id'] = options[u'organization-id']
-
-            new_obj = cls.info(info_options)
+            info_options[u'id'] = obj_id
+            if info_requires_org and not info_options.get(
+                    u'organization-id'):
+                raise CLIError(
+                    'organization-id option is required for {0}.create'
+                    .format(cls.__name__)
+                )
+
+            # ``info`` overrides may not know about ``json_output``
+            if json_output is None:
+                new_obj = cls.info(info_options)
+            else:
+                new_obj = cls.info(info_options, json_output=json_output)
             # stdout should be a dictionary containing the object
             if len(new_obj) > 0:
                 result = new_obj
 
         return result
 
+    @classmethod
+    def _create_with_info(cls, options, info_options, json_output=None):
+        """Run the ``create`` and ``info`` commands in a single remote
+        invocation.
+
+        The new record ID is extracted on the server from the ``create`` CSV
+        output, with the Ruby CSV parser as hammer itself runs on Ruby, and
+        passed to the ``info`` command, which is not run if ``create`` fails
+        or does not report an ID. Both commands are sent as
+        one script, see :func:`robottelo.ssh.command_many`.
+
+        :param options: The ``create`` command options.
+        :param info_options: The ``info`` command options, ``id`` excluded.
+        :param json_output: Whether to request JSON output, see
+            :meth:`_use_json`.
+        :return: A tuple with the parsed ``create`` and ``info`` outputs. The
+            ``info`` output is ``None`` if the command was not run.
+        :raises robottelo.cli.base.CLIReturnCodeError: If any of the commands
+            fails.
+
+        """
+        user, password = cls._get_username_password()
+        as_json = cls._use_json(json_output)
+        info_format = 'json' if as_json else None
+        create_command = cls._construct_command('create', options)
+        info_command = u'{0} --id="$id"'.format(
+            cls._construct_command('info', info_options))
+
+        def run():
+            """Run both commands"""
+            create_script = u' && '.join((
+                u'id= ; out=$({0})'.format(cls._hammer_command(
+                    create_command, user, password, output_format='csv')),
+                u'printf \'%s\\n\' "$out"',
+                u'id=$(printf \'%s\\n\' "$out" | ruby -rcsv -e \''
+                u'print((CSV.parse($stdin.read, :headers => true).first || '
+                u'{})["Id"]) rescue nil\')',
+            ))
+            info_script = u'[ -z "$id" ] || {0}'.format(cls._hammer_command(
+                info_command, user, password, output_format=info_format))
+            return ssh.command_many([
+                (create_script, 'csv'),
+                (info_script, info_format),
+            ])
+
+        create_response, info_response = cls._run_hammer(user, password, run)
+
+        result = cls._handle_response(create_response, command=create_command)
+        new_obj = cls._handle_response(info_response, command=info_command)
+        if not new_obj:
+            new_obj = None
+        elif as_json:
+            new_obj = hammer.normalize_json(new_obj)
+        else:
+            new_obj = hammer.parse_info(new_obj)
+        return (result, new_obj)
+
     @classmethod
     def delete(cls, options=None):
         """Deletes existing record."""
-        cls.command_sub = 'delete'
         return cls.execute(
-            cls._construct_command(options),
+            cls._construct_command('delete', options),
             ignore_stderr=True,
         )
 
@@ -188,9 +320,8 @@ class Base(object):
         Deletes parameter from record.
         """
 
-        cls.command_sub = 'delete-parameter'
-
-        result = cls.execute(cls._construct_command(options))
+        result = cls.execute(
+            cls._construct_command('delete-parameter', options))
 
         return result
 
@@ -200,12 +331,36 @@ class Base(object):
         Displays the content for existing partition table.
         """
 
-        cls.command_sub = 'dump'
-
-        result = cls.execute(cls._construct_command(options))
+        result = cls.execute(cls._construct_command('dump', options))
 
         return result
 
+    @classmethod
+    def _execute_async(cls, command_sub, options=None):
+        """Start the server task of a subcommand without waiting for it.
+
+        The subcommand is run with the ``--async`` flag, hammer then returns
+        as soon as the task is planned. Use
+        :meth:`robottelo.cli.task.Task.wait_for_tasks` to wait for it.
+
+        :param command_sub: The subcommand, like ``synchronize``.
+        :param options: The subcommand options.
+        :return: The task UUID.
+        :raises robottelo.cli.base.CLIError: If hammer does not report a task.
+
+        """
+        options = dict(options or {})
+        options[u'async'] = True
+        command = cls._construct_command(command_sub, options)
+        output = cls.execute(command, ignore_stderr=True)
+        match = _TASK_ID.search(u'\n'.join(output or []))
+        if match is None:
+            raise CLIError(
+                u'Command "{0}" did not report a task: {1}'
+                .format(command, output)
+            )
+        return match.group(0)
+
     @classmethod
     def _get_username_password(cls, username=None, password=None):
         """Lookup for the username and password for cli command in following
@@ -234,35 +389,188 @@ class Base(object):
 
     @classmethod
     def execute(cls, command, user=None, password=None, output_format=None,
-                timeout=None, ignore_stderr=None, return_raw_response=None):
-        """Executes the cli ``command`` on the server via ssh"""
+                timeout=None, ignore_stderr=None, return_raw_response=None,
+                json_output=None, timed=None):
+        """Executes the cli ``command`` on the server via ssh
+
+        When ``timed`` is true, or if not given when ``time_hammer`` is
+        enabled in the ``[performance]`` configuration, the duration of the
+        command is measured and the response gets a ``timing`` attribute, see
+        :func:`robottelo.ssh.timed_command`.
+
+        When ``hammer_shell`` is enabled in the configuration, the command is
+        sent to a long-lived ``hammer shell`` session instead of starting a
+        new hammer process. See :mod:`robottelo.cli.hammer_shell`.
+
+        When JSON output is enabled, see :meth:`_use_json`, commands asking
+        for CSV output get JSON output instead. The records are returned with
+        the same shape, see :func:`robottelo.cli.hammer.normalize_json_list`.
+
+        """
         user, password = cls._get_username_password(user, password)
-        time_hammer = False
-        if settings.performance:
-            time_hammer = settings.performance.time_hammer
+        as_json = output_format == 'csv' and cls._use_json(json_output)
+        if as_json:
+            output_format = 'json'
 
-        # add time to measure hammer performance
-        cmd = u'LANG={0} {1} hammer -v -u {2} -p {3} {4} {5}'.format(
-            settings.locale,
-            u'time -p' if time_hammer else '',
-            user,
-            password,
-            u'--output={0}'.format(output_format) if output_format else u'',
-            command,
-        )
-        response = ssh.command(
-            cmd.encode('utf-8'),
-            output_format=output_format,
-            timeout=timeout,
-        )
+        if timed is None:
+            timed = _time_hammer()
+
+        if _use_hammer_shell() and not timed:
+            try:
+                response = hammer_shell.execute(
+                    command,
+                    user,
+                    password,
+                    output_format=output_format,
+                    timeout=timeout,
+                )
+            except hammer_shell.HammerShellError as err:
+                raise CLIError(
+                    u'hammer shell session failed while running "{0}": {1}'
+                    .format(command, err)
+                )
+        elif timed:
+            response = cls._run_hammer(user, password, lambda: [
+                ssh.timed_command(
+                    cls._hammer_command(
+                        command, user, password, output_format
+                    ).encode('utf-8'),
+                    output_format=output_format,
+                    timeout=timeout,
+                    server_timing=True,
+                )
+            ])[0]
+        else:
+            response = cls._run_hammer(user, password, lambda: [ssh.command(
+                cls._hammer_command(
+                    command, user, password, output_format).encode('utf-8'),
+                output_format=output_format,
+                timeout=timeout,
+            )])[0]
+        if as_json and response.return_code == 0:
+            response.stdout = hammer.normalize_json_list(response.stdout)
         if return_raw_response:
             return response
         else:
             return cls._handle_response(
                 response,
                 ignore_stderr=ignore_stderr,
+                command=command,
             )
 
+    @classmethod
+    def execute_many(cls, commands, user=None, password=None, timeout=None,
+                     stop_on_error=False):
+        """Executes several cli commands on the server in a single round trip
+
+        The commands are run in order, whatever the result of the previous
+        ones unless ``stop_on_error`` is set, as a single script over one ssh
+        channel. When ``hammer_shell`` is enabled in the configuration, they
+        are run through the same ``hammer shell`` session instead.
+
+        :param commands: A list of ``(command, output_format)`` tuples, the
+            commands being built like the ones given to :meth:`execute`.
+        :param timeout: Time to wait for all the commands to finish.
+        :param stop_on_error: Do not run the commands following a command
+            which failed. They get the return code of the failed command and
+            an empty output.
+        :return: A list of ``SSHCommandResult``, one for each command, in
+            order. Return codes are not checked, use :meth:`_handle_response`
+            to do so.
+
+        """
+        user, password = cls._get_username_password(user, password)
+
+        if _use_hammer_shell():
+            try:
+                with hammer_shell.session(user, password) as shell:
+                    responses = []
+                    for command, output_format in commands:
+                        if (stop_on_error and responses and
+                                responses[-1].return_code != 0):
+                            response = ssh.build_command_result(
+                                b'', b'', responses[-1].return_code,
+                                output_format)
+                        else:
+                            response = shell.run(
+                                command, output_format, timeout)
+                        responses.append(response)
+                    return responses
+            except hammer_shell.HammerShellError as err:
+                raise CLIError(
+                    u'hammer shell session failed while running a batch of '
+                    u'commands: {0}'.format(err)
+                )
+        return cls._run_hammer(user, password, lambda: ssh.command_many(
+            [
+                (cls._hammer_command(command, user, password, output_format),
+                 output_format)
+                for command, output_format in commands
+            ],
+            timeout=timeout,
+            stop_on_error=stop_on_error,
+        ))
+
+    @classmethod
+    def _run_hammer(cls, user, password, run):
+        """Call ``run`` once more if the hammer session it used has expired.
+
+        :param user: The username the commands are run with.
+        :param password: The password the commands are run with.
+        :param run: A callable running hammer commands built by
+            :meth:`_hammer_command` and returning the list of their
+            ``SSHCommandResult``. It is called again after the expired session
+            has been dropped, so the commands have to be built by each call.
+        :return: The list returned by the last ``run`` call.
+
+        """
+        responses = run()
+        if responses and cls._session_expired(user, password, responses[0]):
+            responses = run()
+        return responses
+
+    @classmethod
+    def _session_expired(cls, user, password, response):
+        """Whether ``response`` failed because the hammer session of
+        ``user`` has expired, in which case the session is dropped.
+
+        """
+        if (_use_hammer_sessions() and hammer_session.expired(response) and
+                hammer_session.invalidate(user, password)):
+            cls.logger.info(
+                u'hammer session of %s has expired, logging in again', user)
+            return True
+        return False
+
+    @classmethod
+    def _hammer_command(cls, command, user, password, output_format=None):
+        """Build the shell command line which runs the hammer ``command``.
+
+        When ``hammer_sessions`` is enabled in the configuration, hammer is
+        logged in for ``user`` first, if not done yet, and the command line
+        relies on that session instead of carrying the credentials. See
+        :mod:`robottelo.cli.hammer_session`.
+
+        """
+        env = u''
+        credentials = u'-u {0} -p {1}'.format(user, password)
+        stdin = u''
+        if _use_hammer_sessions() and hammer_session.login(user, password):
+            env = u'HOME="{0}" '.format(
+                hammer_session.session_home(user, password))
+            credentials = u'-c "{0}"'.format(
+                hammer_session.session_config(user, password))
+            # Hammer must not wait for credentials if the session expires
+            stdin = u' </dev/null'
+        return u'LANG={0} {1}hammer -v {2} {3} {4}{5}'.format(
+            settings.locale,
+            env,
+            credentials,
+            u'--output={0}'.format(output_format) if output_format else u'',
+            command,
+            stdin,
+        )
+
     @classmethod
     def exists(cls, options=None, search=None):
         """Search for an entity using the query ``search[0]="search[1]"``
@@ -290,52 +598,114 @@ class Base(object):
         return result
 
     @classmethod
-    def info(cls, options=None, output_format=None):
-        """Reads the entity information."""
-        cls.command_sub = 'info'
-
+    def info(cls, options=None, output_format=None, json_output=None):
+        """Reads the entity information.
+
+        :param output_format: The hammer output format. The output is returned
+            as is when it is set, else the text output is parsed.
+        :param json_output: Whether to get the information from the JSON
+            output instead of the text output. The result has the same
+            shape, see :func:`robottelo.cli.hammer.normalize_json`. See
+            :meth:`_use_json`.
+        """
         if options is None:
             options = {}
 
-        if cls.command_requires_org and 'organization-id' not in options:
+        if cls._requires_org('info') and 'organization-id' not in options:
             raise CLIError(
                 'organization-id option is required for {0}.info'
                 .format(cls.__name__)
             )
 
+        as_json = output_format is None and cls._use_json(json_output)
         result = cls.execute(
-            command=cls._construct_command(options),
-            output_format=output_format
+            command=cls._construct_command('info', options),
+            output_format='json' if as_json else output_format
         )
-        if output_format != 'json':
+        if as_json:
+            result = hammer.normalize_json(result or {})
+        elif output_format != 'json':
             result = hammer.parse_info(result)
         return result
 
     @classmethod
-    def list(cls, options=None, per_page=True):
+    def list(cls, options=None, per_page=True, json_output=None):
         """
         List information.
         @param options: ID (sometimes name works as well) to retrieve info.
+        @param json_output: Whether to request JSON output, see
+            :meth:`_use_json`.
         """
 
-        cls.command_sub = 'list'
+        options = cls._list_options(options, per_page)
+
+        result = cls.execute(
+            cls._construct_command('list', options),
+            output_format='csv',
+            json_output=json_output,
+        )
 
+        return result
+
+    @classmethod
+    def iter_list(cls, options=None, per_page=True):
+        """Lists information, yielding the records as hammer outputs them.
+
+        Works like :meth:`list`, but the output is streamed and parsed lazily
+        instead of being loaded at once, which saves memory on large lists.
+        The records are read-only :class:`robottelo.cli.hammer.CSVRecord`
+        mappings, use their ``as_dict`` method to get a dictionary. As the
+        return code is only known at the end of the output, a failure is
+        reported once all the records have been consumed.
+
+        :raises robottelo.cli.base.CLIReturnCodeError: If the command
+            finished with a return code different from zero.
+        """
+        command = cls._construct_command(
+            'list', cls._list_options(options, per_page))
+
+        if _use_hammer_shell():
+            # The session gives the whole output at once, read the CSV lines
+            # as is to get the same records as the streamed output
+            lines = cls.execute(u'--output=csv {0}'.format(command))
+            for record in hammer.iter_csv_records(lines):
+                yield record
+            return
+
+        user, password = cls._get_username_password()
+        for attempt in range(2):
+            with ssh.command_stream(cls._hammer_command(
+                    command, user, password, 'csv').encode('utf-8')) as stream:
+                records = 0
+                for record in hammer.iter_csv_records(stream):
+                    records += 1
+                    yield record
+            # Nothing was listed if the session has expired, list again
+            if attempt or records or not cls._session_expired(
+                    user, password, stream):
+                break
+        cls._handle_response(
+            ssh.SSHCommandResult(
+                stderr=stream.stderr, return_code=stream.return_code),
+            command=command,
+        )
+
+    @classmethod
+    def _list_options(cls, options, per_page):
+        """Complete and check the options of the ``list`` command."""
         if options is None:
             options = {}
 
         if 'per-page' not in options and per_page:
             options[u'per-page'] = 10000
 
-        if cls.command_requires_org and 'organization-id' not in options:
+        if cls._requires_org('list') and 'organization-id' not in options:
             raise CLIError(
                 'organization-id option is required for {0}.list'
                 .format(cls.__name__)
             )
 
-        result = cls.execute(
-            cls._construct_command(options), output_format='csv')
-
-        return result
+        return options
 
     @classmethod
     def puppetclasses(cls, options=None):
@@ -343,10 +713,10 @@ class Base(object):
         Lists all puppet classes.
         """
 
-        cls.command_sub = 'puppet-classes'
-
         result = cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command('puppet-classes', options),
+            output_format='csv',
+        )
 
         return result
 
@@ -356,9 +726,8 @@ class Base(object):
         Removes OS from record.
         """
 
-        cls.command_sub = 'remove-operatingsystem'
-
-        result = cls.execute(cls._construct_command(options))
+        result = cls.execute(
+            cls._construct_command('remove-operatingsystem', options))
 
         return result
 
@@ -368,10 +737,8 @@ class Base(object):
         Lists all smart class parameters.
         """
 
-        cls.command_sub = 'sc-params'
-
         result = cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command('sc-params', options), output_format='csv')
 
         return result
 
@@ -381,22 +748,21 @@ class Base(object):
         Creates or updates parameter for a record.
         """
 
-        cls.command_sub = 'set-parameter'
-
-        result = cls.execute(cls._construct_command(options))
+        result = cls.execute(cls._construct_command('set-parameter', options))
 
         return result
 
     @classmethod
-    def update(cls, options=None):
+    def update(cls, options=None, json_output=None):
         """
         Updates existing record.
         """
 
-        cls.command_sub = 'update'
-
         result = cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command('update', options),
+            output_format='csv',
+            json_output=json_output,
+        )
 
         return result
 
@@ -419,9 +785,42 @@ class Base(object):
         return Wrapper
 
     @classmethod
-    def _construct_command(cls, options=None):
+    def _use_json(cls, json_output=None):
+        """Whether the wrappers request JSON output from hammer.
+
+        :param json_output: The choice made for a single call, if any. Else
+            the ``json_output`` class attribute, then the ``hammer_json``
+            setting are looked up.
+
         """
-        Build a hammer cli command based on the options passed
+        if json_output is None:
+            json_output = cls.json_output
+        if json_output is None:
+            json_output = settings.hammer_json
+        return bool(json_output)
+
+    @classmethod
+    def _requires_org(cls, command_sub):
+        """Whether the ``command_sub`` subcommand requires the
+        ``organization-id`` option.
+
+        """
+        return (
+            cls.command_requires_org and
+            command_sub not in cls.org_optional_subcommands
+        )
+
+    @classmethod
+    def _construct_command(cls, command_sub, options=None):
+        """
+        Build a hammer cli command based on the subcommand and the options
+        passed.
+
+        The subcommand is not stored on the class, so commands can be built
+        for the same class from several threads at once.
+
+        :param command_sub: The subcommand, like ``create`` or ``update``.
+        :param options: A dictionary mapping the options to their values.
         """
 
         tail = u''
@@ -440,7 +839,7 @@ class Base(object):
                 tail += u' --{0}="{1}"'.format(key, val)
         cmd = u'{0} {1} {2}'.format(
             cls.command_base,
-            cls.command_sub,
+            command_sub,
             tail.strip()
         )
 
@@ -32,7 +32,7 @@ class DockerContainer(Base):
     command_base = 'docker container'
 
     @classmethod
-    def create(cls, options=None):
+    def create(cls, options=None, fetch_info=True, json_output=None):
         """Creates a docker container
 
         Usage::
@@ -79,7 +79,8 @@ class DockerContainer(Base):
                                                       yes/no, 1/0.
 
         """
-        return super(DockerContainer, cls).create(options)
+        return super(DockerContainer, cls).create(
+            options, fetch_info, json_output)
 
     @classmethod
     def delete(cls, options=None):
@@ -100,7 +101,7 @@ class DockerContainer(Base):
         return super(DockerContainer, cls).delete(options)
 
     @classmethod
-    def info(cls, options=None):
+    def info(cls, options=None, json_output=None):
         """Gets information about a docker container
 
         Usage::
@@ -115,7 +116,8 @@ class DockerContainer(Base):
             --name NAME                               Name to search by
 
         """
-        return super(DockerContainer, cls).info(options)
+        return super(DockerContainer, cls).info(
+            options, json_output=json_output)
 
     @classmethod
     def list(cls, options=None, per_page=True):
@@ -158,8 +160,7 @@ class DockerContainer(Base):
                                                       Default: 100
 
         """
-        cls.command_sub = 'logs'
-        return cls.execute(cls._construct_command(options))
+        return cls.execute(cls._construct_command('logs', options))
 
     @classmethod
     def start(cls, options=None):
@@ -177,8 +178,7 @@ class DockerContainer(Base):
             --name NAME                               Name to search by
 
         """
-        cls.command_sub = 'start'
-        return cls.execute(cls._construct_command(options))
+        return cls.execute(cls._construct_command('start', options))
 
     @classmethod
     def status(cls, options=None):
@@ -196,8 +196,7 @@ class DockerContainer(Base):
             --name NAME                               Name to search by
 
         """
-        cls.command_sub = 'status'
-        return cls.execute(cls._construct_command(options))
+        return cls.execute(cls._construct_command('status', options))
 
     @classmethod
     def stop(cls, options=None):
@@ -215,8 +214,7 @@ class DockerContainer(Base):
             --name NAME                               Name to search by
 
         """
-        cls.command_sub = 'stop'
-        return cls.execute(cls._construct_command(options))
+        return cls.execute(cls._construct_command('stop', options))
 
 
 class DockerImage(Base):
@@ -240,7 +238,7 @@ class DockerImage(Base):
     command_base = 'docker image'
 
     @classmethod
-    def info(cls, options=None):
+    def info(cls, options=None, json_output=None):
         """Gets information about docker images
 
         Usage::
@@ -255,7 +253,8 @@ class DockerImage(Base):
             --repository-id REPOSITORY_ID repository ID
 
         """
-        return super(DockerImage, cls).info(options)
+        return super(DockerImage, cls).info(
+            options, json_output=json_output)
 
     @classmethod
     def list(cls, options=None, per_page=True):
@@ -327,7 +326,7 @@ class DockerRegistry(Base):
     command_base = 'docker registry'
 
     @classmethod
-    def create(cls, options=None):
+    def create(cls, options=None, fetch_info=True, json_output=None):
         """Creates a docker registry
 
         Usage::
@@ -343,7 +342,8 @@ class DockerRegistry(Base):
             --username USERNAME
 
         """
-        return super(DockerRegistry, cls).create(options)
+        return super(DockerRegistry, cls).create(
+            options, fetch_info, json_output)
 
     @classmethod
     def delete(cls, options=None):
@@ -362,7 +362,7 @@ class DockerRegistry(Base):
         return super(DockerRegistry, cls).delete(options)
 
     @classmethod
-    def info(cls, options=None):
+    def info(cls, options=None, json_output=None):
         """Gets information about docker registry
 
         Usage::
@@ -375,7 +375,8 @@ class DockerRegistry(Base):
             --name NAME                   Name to search by
 
         """
-        return super(DockerRegistry, cls).info(options)
+        return super(DockerRegistry, cls).info(
+            options, json_output=json_output)
 
     @classmethod
     def list(cls, options=None, per_page=True):
@@ -438,7 +439,7 @@ class DockerTag(Base):
     command_base = 'docker tag'
 
     @classmethod
-    def info(cls, options=None):
+    def info(cls, options=None, json_output=None):
         """Gets information about docker tags
 
         Usage::
@@ -453,7 +454,8 @@ class DockerTag(Base):
             --repository-id REPOSITORY_ID repository ID
 
         """
-        return super(DockerTag, cls).info(options)
+        return super(DockerTag, cls).info(
+            options, json_output=json_output)
 
     @classmethod
     def list(cls, options=None, per_page=True):
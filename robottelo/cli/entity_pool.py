@@ -0,0 +1,233 @@
+# -*- encoding: utf-8 -*-
+"""Pools of entities created ahead of time by the factory ``make_*``
+functions.
+
+Creating an entity through hammer takes seconds, and tests which need a fresh
+entity usually create it in ``setUp``. A pool keeps a few entities created
+with the same options ready and creates new ones in a background thread as
+they are checked out::
+
+    from robottelo.cli.factory import make_org
+    from robottelo.cli.org import Org
+
+    org = entity_pool.checkout(make_org, cleanup=entity_pool.deleter(Org))
+
+When ``entity_pool_size`` is set in the configuration, ``make_org()`` and
+``make_location()`` called without options take their entity from a pool, see
+:func:`robottelo.cli.factory.pooled`.
+
+Pools are keyed on the ``make_*`` function and a canonical form of the
+options, the first checkout starts the pool and later ones take an entity
+from it. When the pool is empty, the entity is created on the spot.
+
+The entities left in the pools are deleted when the process exits, and the
+number of checkouts served by the pools (hits) or not (misses) is logged.
+
+"""
+import atexit
+import copy
+import logging
+import os
+import threading
+
+from collections import deque
+from robottelo.helpers import canonical_options
+
+logger = logging.getLogger(__name__)
+
+# Number of entities kept ready by default
+DEFAULT_SIZE = 3
+
+
+def deleter(cli_object):
+    """Return a function deleting an entity with the ``delete`` command of
+    ``cli_object``, to be used as the ``cleanup`` of a pool.
+
+    """
+    return lambda entity: cli_object.delete({u'id': entity['id']})
+
+
+class EntityPool(object):
+    """Entities created with the same ``make_*`` function and options.
+
+    :param make: The ``make_*`` function creating the entities.
+    :param options: The options given to ``make`` for every entity.
+    :param int size: The number of entities to keep ready.
+    :param cleanup: A callable deleting an entity which was not checked out.
+        If not provided, the entities are left on the server.
+
+    """
+
+    def __init__(self, make, options=None, size=DEFAULT_SIZE, cleanup=None):
+        self.make = make
+        self.options = options or {}
+        self.size = size
+        self.cleanup = cleanup
+        self.hits = 0
+        self.misses = 0
+        self.failures = 0
+        self._closed = False
+        self._lock = threading.Lock()
+        self._ready = deque()
+        self._thread = None
+
+    def __repr__(self):
+        return u'{0}({1})'.format(
+            self.make.__name__, canonical_options(self.options))
+
+    def _create(self):
+        """Create a new entity."""
+        # make_* functions may update the options they are given
+        return self.make(copy.deepcopy(self.options))
+
+    def checkout(self):
+        """Take an entity from the pool, or create one if the pool is empty.
+
+        The pool is refilled in the background.
+
+        """
+        with self._lock:
+            if self._ready:
+                self.hits += 1
+                entity = self._ready.popleft()
+            else:
+                self.misses += 1
+                entity = None
+        self.refill()
+        if entity is None:
+            entity = self._create()
+        return entity
+
+    def refill(self):
+        """Start creating entities in the background until the pool is full.
+
+        """
+        with self._lock:
+            if (self._closed or len(self._ready) >= self.size or
+                    self._thread is not None):
+                return
+            self._thread = threading.Thread(target=self._fill)
+            self._thread.daemon = True
+            self._thread.start()
+
+    def _fill(self):
+        """Create entities until the pool is full or closed.
+
+        Creating entities stops on the first failure, the next checkout
+        starts a new attempt.
+
+        """
+        while True:
+            with self._lock:
+                if self._closed or len(self._ready) >= self.size:
+                    self._thread = None
+                    return
+            try:
+                entity = self._create()
+            except Exception as err:  # pylint:disable=broad-except
+                logger.warning(u'Failed to fill pool %r: %s', self, err)
+                with self._lock:
+                    self.failures += 1
+                    self._thread = None
+                return
+            with self._lock:
+                if not self._closed:
+                    self._ready.append(entity)
+                    continue
+                self._thread = None
+            # The pool was closed while the entity was being created
+            self._delete(entity)
+            return
+
+    def wait(self, timeout=None):
+        """Wait for the pool to be filled.
+
+        :param timeout: Seconds to wait. Wait forever if ``None``.
+
+        """
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def _delete(self, entity):
+        """Clean an entity up, if possible."""
+        if self.cleanup is None:
+            return
+        try:
+            self.cleanup(entity)
+        except Exception as err:  # pylint:disable=broad-except
+            logger.warning(
+                u'Failed to clean up %r entity %s: %s', self, entity, err)
+
+    def close(self):
+        """Stop filling the pool and clean up the entities left."""
+        with self._lock:
+            self._closed = True
+            entities = list(self._ready)
+            self._ready.clear()
+        self.wait()
+        for entity in entities:
+            self._delete(entity)
+
+    def stats(self):
+        """Return a dictionary with the pool statistics."""
+        with self._lock:
+            return {
+                u'failures': self.failures,
+                u'hits': self.hits,
+                u'misses': self.misses,
+                u'ready': len(self._ready),
+            }
+
+
+# Pools, keyed on (make, canonical options)
+_pools = {}
+_pools_lock = threading.Lock()
+_pools_pid = os.getpid()
+
+
+def get_pool(make, options=None, size=DEFAULT_SIZE, cleanup=None):
+    """Return the pool of the entities created by ``make`` with ``options``.
+
+    The pool is created and starts being filled the first time it is
+    requested. ``size`` and ``cleanup`` are only used then.
+
+    """
+    global _pools_pid  # pylint:disable=global-statement
+    key = (make, canonical_options(options))
+    with _pools_lock:
+        if _pools_pid != os.getpid():
+            # Entities of a parent process pools could be checked out twice
+            _pools.clear()
+            _pools_pid = os.getpid()
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = EntityPool(make, options, size, cleanup)
+    pool.refill()
+    return pool
+
+
+def checkout(make, options=None, size=DEFAULT_SIZE, cleanup=None):
+    """Take an entity created by ``make`` with ``options`` from its pool.
+
+    See :func:`get_pool` for the parameters.
+
+    """
+    return get_pool(make, options, size, cleanup).checkout()
+
+
+def close_pools():
+    """Close all the pools and log their statistics."""
+    with _pools_lock:
+        pools = list(_pools.values()) if _pools_pid == os.getpid() else []
+        _pools.clear()
+    for pool in pools:
+        pool.close()
+        stats = pool.stats()
+        logger.info(
+            u'Entity pool %r: %d hits, %d misses, %d failures',
+            pool, stats[u'hits'], stats[u'misses'], stats[u'failures'],
+        )
+
+
+atexit.register(close_pools)
@@ -30,5 +30,4 @@ class Environment(Base):
     @classmethod
     def sc_params(cls, options=None):
         """List all smart class parameters."""
-        cls.command_sub = 'sc-params'
-        return cls.execute(cls._construct_command(options))
+        return cls.execute(cls._construct_command('sc-params', options))
@@ -8,7 +8,12 @@ import json
 import logging
 import os
 import random
+import six
+import sys
+import time
 
+from collections import OrderedDict
+from functools import wraps
 from fauxfactory import (
     gen_alphanumeric,
     gen_integer,
@@ -18,11 +23,13 @@ from fauxfactory import (
     gen_string,
     gen_url,
 )
+from multiprocessing.pool import ThreadPool
 from os import chmod
 from robottelo import manifests, ssh
+from robottelo.cli import entity_pool, hammer
 from robottelo.cli.activationkey import ActivationKey
 from robottelo.cli.architecture import Architecture
-from robottelo.cli.base import CLIReturnCodeError
+from robottelo.cli.base import CLIError, CLIReturnCodeError
 from robottelo.cli.computeresource import ComputeResource
 from robottelo.cli.contenthost import ContentHost
 from robottelo.cli.contentview import ContentView
@@ -48,9 +55,11 @@ from robottelo.cli.role import Role
 from robottelo.cli.subnet import Subnet
 from robottelo.cli.subscription import Subscription
 from robottelo.cli.syncplan import SyncPlan
+from robottelo.cli.task import Task
 from robottelo.cli.template import Template
 from robottelo.cli.user import User
 from robottelo.cli.usergroup import UserGroup, UserGroupExternal
+from robottelo.config import settings
 from robottelo.constants import (
     DEFAULT_SUBSCRIPTION_NAME,
     FAKE_1_YUM_REPO,
@@ -62,6 +71,7 @@ from robottelo.constants import (
 from robottelo.decorators import cacheable
 from robottelo.helpers import update_dictionary
 from robottelo.ssh import upload_file
+from six.moves import queue
 from tempfile import mkstemp
 
 logger = logging.getLogger(__name__)
@@ -75,7 +85,188 @@ class CLIFactoryError(Exception):
     """Indicates an error occurred while creating an entity using hammer"""
 
 
-def create_object(cli_object, options, values):
+class EntityBuilder(object):
+    """Creates related entities, running the independent steps concurrently.
+
+    Each step is declared along with the names of the steps it depends on.
+    When running, a step is started on a pool of worker threads as soon as
+    all the steps it depends on are done::
+
+        builder = EntityBuilder()
+        builder.add('org', lambda done: make_org())
+        builder.add(
+            'product',
+            lambda done: make_product({
+                u'organization-id': done['org']['id']}),
+            requires=['org'],
+        )
+        builder.add(
+            'content-view',
+            lambda done: make_content_view({
+                u'organization-id': done['org']['id']}),
+            requires=['org'],
+        )
+        results = builder.run()
+
+    Here the product and the content view are created at the same time. The
+    time spent on every step is recorded in the ``timings`` attribute.
+
+    :param int max_workers: The maximum number of steps running at the same
+        time.
+
+    """
+
+    def __init__(self, max_workers=4):
+        self.max_workers = max_workers
+        self.results = {}
+        self.timings = OrderedDict()
+        self._steps = OrderedDict()
+
+    def add(self, name, function, requires=()):
+        """Declare a step.
+
+        :param str name: The step name. Its result is stored under that name.
+        :param function: A callable doing the step. It gets a dictionary
+            mapping the names of the steps already done to their results.
+        :param requires: The names of the steps which must be done first.
+
+        """
+        if name in self._steps:
+            raise CLIFactoryError(
+                u'Step "{0}" is already declared'.format(name))
+        self._steps[name] = (function, tuple(requires))
+
+    def _check(self):
+        """Check that all dependencies are declared and not circular."""
+        for name, (_, requires) in self._steps.items():
+            for required in requires:
+                if required not in self._steps:
+                    raise CLIFactoryError(
+                        u'Step "{0}" requires the unknown step "{1}"'
+                        .format(name, required)
+                    )
+        done = set()
+        pending = set(self._steps)
+        while pending:
+            ready = set(
+                name for name in pending
+                if done.issuperset(self._steps[name][1])
+            )
+            if not ready:
+                raise CLIFactoryError(
+                    u'Circular dependency between the steps {0}'
+                    .format(', '.join(sorted(pending)))
+                )
+            done.update(ready)
+            pending.difference_update(ready)
+
+    @staticmethod
+    def _run_step(name, function, done):
+        """Run a step on a worker thread and report its outcome.
+
+        Anything raised by the step is reported, ``SystemExit`` and
+        ``KeyboardInterrupt`` included, so that every step has an outcome.
+
+        """
+        start = time.time()
+        try:
+            result = function(done)
+        except BaseException:  # pylint:disable=broad-except
+            return (name, None, sys.exc_info(), time.time() - start)
+        return (name, result, None, time.time() - start)
+
+    @staticmethod
+    def _failed_step(name, async_result):
+        """Return the outcome of a step whose worker itself failed."""
+        try:
+            async_result.get()
+        except BaseException:  # pylint:disable=broad-except
+            return (name, None, sys.exc_info(), 0)
+
+    def run(self):
+        """Run all the steps.
+
+        Once a step fails, no other step is started and the error is raised
+        when the running steps are finished.
+
+        :return: A dictionary mapping the steps names to their results.
+        :raises CLIFactoryError: If the dependencies can't be satisfied.
+        :raises Exception: The first error raised by a step.
+
+        """
+        self._check()
+        pending = OrderedDict(self._steps)
+        outcomes = queue.Queue()
+        # The steps running, with their ``AsyncResult``. The callback only
+        # gets the outcome of the steps which did not fail in the pool
+        # machinery, the others are found by polling.
+        running = {}
+        error = None
+        pool = ThreadPool(self.max_workers)
+        try:
+            while running or (pending and error is None):
+                for name, (function, requires) in list(pending.items()):
+                    if error is None and all(
+                            required in self.results for required in requires):
+                        del pending[name]
+                        running[name] = pool.apply_async(
+                            self._run_step,
+                            (name, function, dict(self.results)),
+                            callback=outcomes.put,
+                        )
+                try:
+                    outcome = outcomes.get(timeout=1)
+                except queue.Empty:
+                    failed = [
+                        name for name, async_result in running.items()
+                        if async_result.ready() and
+                        not async_result.successful()
+                    ]
+                    if not failed:
+                        continue
+                    outcome = self._failed_step(
+                        failed[0], running[failed[0]])
+                name, result, exc_info, elapsed = outcome
+                del running[name]
+                self.timings[name] = elapsed
+                if exc_info is None:
+                    self.results[name] = result
+                elif error is None:
+                    error = exc_info
+        finally:
+            pool.close()
+            pool.join()
+        if error is not None:
+            six.reraise(*error)
+        return self.results
+
+
+def pooled(cli_object):
+    """Decorator serving the calls of a ``make_*`` function without options
+    from an entity pool.
+
+    Pools are only used when ``entity_pool_size`` is set in the
+    configuration, see :mod:`robottelo.cli.entity_pool`. The entities left in
+    the pools are deleted with the ``delete`` command of ``cli_object``.
+
+    """
+    def decorator(func):
+        """Wrap ``func``, a ``make_*`` function."""
+        @wraps(func)
+        def pooled_function(options=None, cached=False):
+            """Take the entity from its pool when it can be used."""
+            if options or cached or not settings.entity_pool_size:
+                return func(options, cached=cached)
+            return entity_pool.checkout(
+                func,
+                size=settings.entity_pool_size,
+                cleanup=entity_pool.deleter(cli_object),
+            )
+        return pooled_function
+    return decorator
+
+
+def create_object(cli_object, options, values, fetch_info=True):
     """
     Creates <object> with dictionary of arguments.
 
@@ -83,6 +274,8 @@ def create_object(cli_object, options, values):
     :param dict options: The default options accepted by the cli_object
         create
     :param dict values: Custom values to override default ones.
+    :param bool fetch_info: If ``False``, only the ``create`` output, which
+        includes the new object ID, is returned instead of the full object.
     :raise robottelo.cli.factory.CLIFactoryError: Raise an exception if object
         cannot be created.
     :rtype: dict
@@ -91,7 +284,7 @@ def create_object(cli_object, options, values):
     """
     update_dictionary(options, values)
     try:
-        result = cli_object.create(options)
+        result = cli_object.create(options, fetch_info=fetch_info)
     except CLIReturnCodeError as err:
         # If the object is not created, raise exception, stop the show.
         raise CLIFactoryError(
@@ -350,6 +543,7 @@ def make_gpg_key(options=None):
     return create_object(GPGKey, args, options)
 
 
+@pooled(Location)
 @cacheable
 def make_location(options=None):
     """Location CLI factory
@@ -1262,6 +1456,7 @@ def make_compute_resource(options=None):
     return create_object(ComputeResource, args, options)
 
 
+@pooled(Org)
 @cacheable
 def make_org(options=None):
     """
@@ -1758,6 +1953,186 @@ def activationkey_add_subscription_to_repo(options=None):
                 )
 
 
+def _publish_content_view_with_repository(org_id, cv_id, repo_id):
+    """Associate a repository with a content view, publish a new version of
+    the content view and fetch it.
+
+    The three commands only depend on the given IDs, so they are run in order
+    in a single round trip to the server. A command is run only if the
+    previous one succeeded, so no version is published if the repository
+    could not be added.
+
+    :return: A dictionary with the new content view version ``id`` and
+        ``name``.
+
+    """
+    commands = [
+        (ContentView._construct_command('add-repository', {
+            u'id': cv_id,
+            u'organization-id': org_id,
+            u'repository-id': repo_id,
+        }), 'csv'),
+        (ContentView._construct_command('publish', {u'id': cv_id}), None),
+        (ContentView._construct_command('info', {u'id': cv_id}), None),
+    ]
+    errors = (
+        u'Failed to add repository to content view',
+        u'Failed to publish new version of content view',
+        u'Failed to fetch content view info',
+    )
+    results = ContentView.execute_many(commands, stop_on_error=True)
+    for (command, _), result, error in zip(commands, results, errors):
+        try:
+            ContentView._handle_response(
+                result, ignore_stderr=True, command=command)
+        except CLIReturnCodeError as err:
+            raise CLIFactoryError(u'{0}\n{1}'.format(error, err.msg))
+    return hammer.parse_info(results[-1].stdout)['versions'][-1]
+
+
+def _add_org_steps(builder, options):
+    """Declare the steps giving the organization, lifecycle environment and
+    content view used by the ``setup_org_for_a_*`` helpers.
+
+    The entities given in ``options`` are used, the others are created. The
+    steps results are the entities IDs.
+
+    """
+    def given(key):
+        """Return a step function giving the ``key`` option"""
+        return lambda done: options[key]
+
+    if options.get('organization-id') is None:
+        builder.add(u'organization-id', lambda done: make_org()['id'])
+    else:
+        builder.add(u'organization-id', given('organization-id'))
+    for key, make in (
+            (u'lifecycle-environment-id', make_lifecycle_environment),
+            (u'content-view-id', make_content_view)):
+        if options.get(key) is None:
+            builder.add(
+                key,
+                lambda done, make=make: make({
+                    u'organization-id': done['organization-id']})['id'],
+                requires=[u'organization-id'],
+            )
+        else:
+            builder.add(key, given(key))
+
+
+def _promote_content_view_version(done):
+    """Promote the published content view version to the lifecycle
+    environment.
+
+    """
+    try:
+        Task.wait_for_tasks([ContentView.version_promote_async({
+            u'id': done['content-view-version']['id'],
+            u'organization-id': done['organization-id'],
+            u'to-lifecycle-environment-id': done['lifecycle-environment-id'],
+        })])
+    except (CLIError, CLIReturnCodeError) as err:
+        raise CLIFactoryError(
+            u'Failed to promote version to next environment\n{0}'
+            .format(err)
+        )
+
+
+def _setup_activation_key(options, done):
+    """Create the activation key if needed and associate the content view
+    with it.
+
+    :return: The activation key ID.
+
+    """
+    if options.get('activationkey-id') is None:
+        return make_activation_key({
+            u'content-view-id': done['content-view-id'],
+            u'lifecycle-environment-id': done['lifecycle-environment-id'],
+            u'organization-id': done['organization-id'],
+        })['id']
+    # Given activation key may have no (or different) CV associated.
+    # Associate activation key with CV just to be sure
+    try:
+        ActivationKey.update({
+            u'content-view-id': done['content-view-id'],
+            u'id': options['activationkey-id'],
+            u'organization-id': done['organization-id'],
+        })
+    except CLIReturnCodeError as err:
+        raise CLIFactoryError(
+            u'Failed to associate activation-key with CV\n{0}'
+            .format(err.msg)
+        )
+    return options['activationkey-id']
+
+
+def _add_content_steps(builder, options, subscription, requires=()):
+    """Declare the steps making the synchronized repository available
+    through an activation key, for the ``setup_org_for_a_*`` helpers.
+
+    The ``repository-id`` and ``synchronize`` steps must be declared too. The
+    content view is published with the repository and promoted to the
+    lifecycle environment, then the activation key is set up and gets the
+    repository subscription.
+
+    :param subscription: A callable returning the subscription name from the
+        results of the steps done.
+    :param requires: The steps ``subscription`` needs the result of.
+
+    """
+    builder.add(
+        u'content-view-version',
+        lambda done: _publish_content_view_with_repository(
+            done['organization-id'],
+            done['content-view-id'],
+            done['repository-id'],
+        ),
+        requires=[
+            u'organization-id',
+            u'content-view-id',
+            u'repository-id',
+            u'synchronize',
+        ],
+    )
+    builder.add(
+        u'promote',
+        _promote_content_view_version,
+        requires=[u'content-view-version', u'lifecycle-environment-id'],
+    )
+    builder.add(
+        u'activationkey-id',
+        lambda done: _setup_activation_key(options, done),
+        requires=[u'promote'],
+    )
+    builder.add(
+        u'subscription',
+        lambda done: activationkey_add_subscription_to_repo({
+            u'activationkey-id': done['activationkey-id'],
+            u'organization-id': done['organization-id'],
+            u'subscription': subscription(done),
+        }),
+        requires=[u'activationkey-id'] + list(requires),
+    )
+
+
+def _run_setup_steps(builder, keys):
+    """Run the steps of a ``setup_org_for_a_*`` helper.
+
+    :return: A dictionary with the results of the ``keys`` steps.
+
+    """
+    results = builder.run()
+    logger.debug(
+        u'Organization set up, time spent on each step: %s',
+        u', '.join(
+            u'{0} {1:.2f}s'.format(name, elapsed)
+            for name, elapsed in builder.timings.items()
+        )
+    )
+    return dict((key, results[key]) for key in keys)
+
+
 def setup_org_for_a_custom_repo(options=None):
     """Sets up Org for the given custom repo by:
 
@@ -1772,6 +2147,10 @@ def setup_org_for_a_custom_repo(options=None):
         associates it with the content view.
     5. Adds the custom repo subscription to the activation key
 
+    Steps which do not depend on each other, like creating the lifecycle
+    environment, the product and the content view, are run concurrently. See
+    :class:`EntityBuilder`.
+
     Options::
 
         url - URL to custom repository
@@ -1792,100 +2171,54 @@ def setup_org_for_a_custom_repo(options=None):
             not options or
             not options.get('url')):
         raise CLIFactoryError('Please provide valid custom repo URL.')
-    # Create new organization and lifecycle environment if needed
-    if options.get('organization-id') is None:
-        org_id = make_org()['id']
-    else:
-        org_id = options['organization-id']
-    if options.get('lifecycle-environment-id') is None:
-        env_id = make_lifecycle_environment({u'organization-id': org_id})['id']
-    else:
-        env_id = options['lifecycle-environment-id']
-    # Create custom product and repository
-    custom_product = make_product({u'organization-id': org_id})
-    custom_repo = make_repository({
-        u'content-type': 'yum',
-        u'product-id': custom_product['id'],
-        u'url': options.get('url'),
-    })
-    # Synchronize custom repository
-    try:
-        Repository.synchronize({'id': custom_repo['id']})
-    except CLIReturnCodeError as err:
-        raise CLIFactoryError(
-            u'Failed to synchronize repository\n{0}'.format(err.msg))
-    # Create CV if needed and associate repo with it
-    if options.get('content-view-id') is None:
-        cv_id = make_content_view({u'organization-id': org_id})['id']
-    else:
-        cv_id = options['content-view-id']
-    try:
-        ContentView.add_repository({
-            u'id': cv_id,
-            u'organization-id': org_id,
-            u'repository-id': custom_repo['id'],
-        })
-    except CLIReturnCodeError as err:
-        raise CLIFactoryError(
-            u'Failed to add repository to content view\n{0}'.format(err.msg))
-    # Publish a new version of CV
-    try:
-        ContentView.publish({u'id': cv_id})
-    except CLIReturnCodeError as err:
-        raise CLIFactoryError(
-            u'Failed to publish new version of content view\n{0}'
-            .format(err.msg)
-        )
-    # Get the version id
-    cvv = ContentView.info({u'id': cv_id})['versions'][-1]
-    # Promote version to next env
-    try:
-        ContentView.version_promote({
-            u'id': cvv['id'],
-            u'organization-id': org_id,
-            u'to-lifecycle-environment-id': env_id,
-        })
-    except CLIReturnCodeError as err:
-        raise CLIFactoryError(
-            u'Failed to promote version to next environment\n{0}'
-            .format(err.msg)
-        )
-    # Create activation key if needed and associate content view with it
-    if options.get('activationkey-id') is None:
-        activationkey_id = make_activation_key({
-            u'content-view-id': cv_id,
-            u'lifecycle-environment-id': env_id,
-            u'organization-id': org_id,
-        })['id']
-    else:
-        activationkey_id = options['activationkey-id']
-        # Given activation key may have no (or different) CV associated.
-        # Associate activation key with CV just to be sure
+
+    def synchronize(done):
+        """Synchronize custom repository"""
         try:
-            ActivationKey.update({
-                u'content-view-id': cv_id,
-                u'id': activationkey_id,
-                u'organization-id': org_id,
-            })
-        except CLIReturnCodeError as err:
+            Task.wait_for_tasks([Repository.synchronize_async({
+                u'id': done['repository-id']})])
+        except (CLIError, CLIReturnCodeError) as err:
             raise CLIFactoryError(
-                u'Failed to associate activation-key with CV\n{0}'
-                .format(err.msg)
-            )
-    # Add subscription to activation-key
-    activationkey_add_subscription_to_repo({
-        u'activationkey-id': activationkey_id,
-        u'organization-id': org_id,
-        u'subscription': custom_product['name'],
-    })
-    return {
-        u'activationkey-id': activationkey_id,
-        u'content-view-id': cv_id,
-        u'lifecycle-environment-id': env_id,
-        u'organization-id': org_id,
-        u'product-id': custom_product['id'],
-        u'repository-id': custom_repo['id'],
-    }
+                u'Failed to synchronize repository\n{0}'.format(err))
+
+    builder = EntityBuilder()
+    _add_org_steps(builder, options)
+    # Create custom product and repository
+    builder.add(
+        u'product',
+        lambda done: make_product({
+            u'organization-id': done['organization-id']}),
+        requires=[u'organization-id'],
+    )
+    builder.add(
+        u'repository-id',
+        lambda done: make_repository({
+            u'content-type': 'yum',
+            u'product-id': done['product']['id'],
+            u'url': options.get('url'),
+        })['id'],
+        requires=[u'product'],
+    )
+    builder.add(u'synchronize', synchronize, requires=[u'repository-id'])
+    _add_content_steps(
+        builder,
+        options,
+        lambda done: done['product']['name'],
+        requires=[u'product'],
+    )
+    builder.add(
+        u'product-id',
+        lambda done: done['product']['id'],
+        requires=[u'product'],
+    )
+    return _run_setup_steps(builder, (
+        u'activationkey-id',
+        u'content-view-id',
+        u'lifecycle-environment-id',
+        u'organization-id',
+        u'product-id',
+        u'repository-id',
+    ))
 
 
 def setup_org_for_a_rh_repo(options=None):
@@ -1903,6 +2236,10 @@ def setup_org_for_a_rh_repo(options=None):
         associates it with the content view.
     6. Adds the RH repo subscription to the activation key
 
+    Steps which do not depend on each other, like cloning the manifest and
+    creating the organization, are run concurrently. See
+    :class:`EntityBuilder`.
+
     Options::
 
         product - RH product name
@@ -1930,130 +2267,80 @@ def setup_org_for_a_rh_repo(options=None):
             not options.get('repository')):
         raise CLIFactoryError(
             'Please provide valid product, repository-set and repo.')
-    # Create new organization and lifecycle environment if needed
-    if options.get('organization-id') is None:
-        org_id = make_org()['id']
-    else:
-        org_id = options['organization-id']
-    if options.get('lifecycle-environment-id') is None:
-        env_id = make_lifecycle_environment({u'organization-id': org_id})['id']
-    else:
-        env_id = options['lifecycle-environment-id']
-    # Clone manifest and upload it
-    with manifests.clone() as manifest:
-        upload_file(manifest.content, manifest.filename)
-    try:
-        Subscription.upload({
-            u'file': manifest.filename,
-            u'organization-id': org_id,
-        })
-    except CLIReturnCodeError as err:
-        raise CLIFactoryError(
-            u'Failed to upload manifest\n{0}'.format(err.msg))
-    # Enable repo from Repository Set
-    try:
-        RepositorySet.enable({
-            u'basearch': 'x86_64',
-            u'name': options['repository-set'],
-            u'organization-id': org_id,
-            u'product': options['product'],
-            u'releasever': options.get('releasever'),
-        })
-    except CLIReturnCodeError as err:
-        raise CLIFactoryError(
-            u'Failed to enable repository set\n{0}'.format(err.msg))
-    # Fetch repository info
-    try:
-        rhel_repo = Repository.info({
-            u'name': options['repository'],
-            u'organization-id': org_id,
-            u'product': options['product'],
-        })
-    except CLIReturnCodeError as err:
-        raise CLIFactoryError(
-            u'Failed to fetch repository info\n{0}'.format(err.msg))
-    # Synchronize the RH repository
-    try:
-        Repository.synchronize({
-            u'name': options['repository'],
-            u'organization-id': org_id,
-            u'product': options['product'],
-        })
-    except CLIReturnCodeError as err:
-        raise CLIFactoryError(
-            u'Failed to synchronize repository\n{0}'.format(err.msg))
-    # Create CV if needed and associate repo with it
-    if options.get('content-view-id') is None:
-        cv_id = make_content_view({u'organization-id': org_id})['id']
-    else:
-        cv_id = options['content-view-id']
-    try:
-        ContentView.add_repository({
-            u'id': cv_id,
-            u'organization-id': org_id,
-            u'repository-id': rhel_repo['id'],
-        })
-    except CLIReturnCodeError as err:
-        raise CLIFactoryError(
-            u'Failed to add repository to content view\n{0}'.format(err.msg))
-    # Publish a new version of CV
-    try:
-        ContentView.publish({u'id': cv_id})
-    except CLIReturnCodeError as err:
-        raise CLIFactoryError(
-            u'Failed to publish new version of content view\n{0}'
-            .format(err.msg)
-        )
-    # Get the version id
-    try:
-        cvv = ContentView.info({u'id': cv_id})['versions'][-1]
-    except CLIReturnCodeError as err:
-        raise CLIFactoryError(
-            u'Failed to fetch content view info\n{0}'.format(err.msg))
-    # Promote version1 to next env
-    try:
-        ContentView.version_promote({
-            u'id': cvv['id'],
-            u'organization-id': org_id,
-            u'to-lifecycle-environment-id': env_id,
-        })
-    except CLIReturnCodeError as err:
-        raise CLIFactoryError(
-            u'Failed to promote version to next environment\n{0}'
-            .format(err.msg)
-        )
-    # Create activation key if needed and associate content view with it
-    if options.get('activationkey-id') is None:
-        activationkey_id = make_activation_key({
-            u'content-view-id': cv_id,
-            u'lifecycle-environment-id': env_id,
-            u'organization-id': org_id,
-        })['id']
-    else:
-        activationkey_id = options['activationkey-id']
-        # Given activation key may have no (or different) CV associated.
-        # Associate activation key with CV just to be sure
+
+    def clone_manifest(done):
+        """Clone manifest and upload it to the server"""
+        with manifests.clone() as manifest:
+            upload_file(manifest.content, manifest.filename)
+        return manifest.filename
+
+    def upload_manifest(done):
+        """Import the manifest in the organization"""
         try:
-            ActivationKey.update({
-                u'id': activationkey_id,
-                u'organization-id': org_id,
-                u'content-view-id': cv_id,
+            Subscription.upload({
+                u'file': done['manifest'],
+                u'organization-id': done['organization-id'],
             })
         except CLIReturnCodeError as err:
             raise CLIFactoryError(
-                u'Failed to associate activation-key with CV\n{0}'
-                .format(err.msg)
-            )
-    # Add subscription to activation-key
-    activationkey_add_subscription_to_repo({
-        u'organization-id': org_id,
-        u'activationkey-id': activationkey_id,
-        u'subscription': DEFAULT_SUBSCRIPTION_NAME,
-    })
-    return {
-        u'activationkey-id': activationkey_id,
-        u'content-view-id': cv_id,
-        u'lifecycle-environment-id': env_id,
-        u'organization-id': org_id,
-        u'repository-id': rhel_repo['id'],
-    }
+                u'Failed to upload manifest\n{0}'.format(err.msg))
+
+    def enable_repository_set(done):
+        """Enable repo from Repository Set"""
+        try:
+            RepositorySet.enable({
+                u'basearch': 'x86_64',
+                u'name': options['repository-set'],
+                u'organization-id': done['organization-id'],
+                u'product': options['product'],
+                u'releasever': options.get('releasever'),
+            })
+        except CLIReturnCodeError as err:
+            raise CLIFactoryError(
+                u'Failed to enable repository set\n{0}'.format(err.msg))
+
+    def repository_id(done):
+        """Fetch repository info"""
+        try:
+            return Repository.info({
+                u'name': options['repository'],
+                u'organization-id': done['organization-id'],
+                u'product': options['product'],
+            })['id']
+        except CLIReturnCodeError as err:
+            raise CLIFactoryError(
+                u'Failed to fetch repository info\n{0}'.format(err.msg))
+
+    def synchronize(done):
+        """Synchronize the RH repository"""
+        try:
+            Task.wait_for_tasks([Repository.synchronize_async({
+                u'id': done['repository-id']})])
+        except (CLIError, CLIReturnCodeError) as err:
+            raise CLIFactoryError(
+                u'Failed to synchronize repository\n{0}'.format(err))
+
+    builder = EntityBuilder()
+    _add_org_steps(builder, options)
+    builder.add(u'manifest', clone_manifest)
+    builder.add(
+        u'upload-manifest',
+        upload_manifest,
+        requires=[u'manifest', u'organization-id'],
+    )
+    builder.add(
+        u'repository-set',
+        enable_repository_set,
+        requires=[u'upload-manifest'],
+    )
+    builder.add(u'repository-id', repository_id, requires=[u'repository-set'])
+    builder.add(u'synchronize', synchronize, requires=[u'repository-id'])
+    _add_content_steps(
+        builder, options, lambda done: DEFAULT_SUBSCRIPTION_NAME)
+    return _run_setup_steps(builder, (
+        u'activationkey-id',
+        u'content-view-id',
+        u'lifecycle-environment-id',
+        u'organization-id',
+        u'repository-id',
+    ))
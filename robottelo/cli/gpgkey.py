@@ -28,17 +28,19 @@ class GPGKey(Base):
 
     command_base = 'gpg'
     command_requires_org = True
+    create_chains_info = False
 
     @classmethod
-    def info(cls, options=None):
+    def info(cls, options=None, json_output=None):
         """
         Gets information for GPG Key
         """
 
-        cls.command_sub = 'info'
-
         result = cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command('info', options),
+            output_format='csv',
+            json_output=json_output,
+        )
 
         # Need to rebuild the returned object
         # First check for content key
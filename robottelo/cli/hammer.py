@@ -3,8 +3,13 @@ import csv
 import re
 import six
 
+from collections import OrderedDict
 from six.moves import zip
-from six.moves import cStringIO as StringIO
+
+try:
+    from collections.abc import Mapping
+except ImportError:  # Python 2
+    from collections import Mapping
 
 
 def _csv_reader(output):
@@ -21,23 +26,101 @@ def _csv_reader(output):
     On Python 3 this generator is not needed because the default string type is
     unicode.
 
+    The lines are handed to the CSV parser one by one as they are read from
+    ``output``, nothing is buffered.
+
     :param output: can be any object which supports the iterator protocol and
     returns a unicode string each time its next() method is called.
     :return: generator that will yield a list of unicode string values.
 
     """
-    data = '\n'.join(output)
     if six.PY2:
-        data = data.encode('utf8')
-    handler = StringIO(data)
-
-    for row in csv.reader(handler):
-        if six.PY2:
+        for row in csv.reader(line.encode('utf8') + b'\n' for line in output):
             yield [value.decode('utf8') for value in row]
-        else:
+    else:
+        for row in csv.reader(line + '\n' for line in output):
             yield row
 
 
+class CSVRecord(Mapping):
+    """A read-only row of a hammer CSV output.
+
+    Rows only hold a tuple with their values, the mapping from the header keys
+    to the values positions being shared by all the rows of an output. They
+    behave like a dictionary and compare equal to the dictionary that
+    :func:`parse_csv` would return for the same row::
+
+        for record in iter_csv_records(lines):
+            record['name'], record.get('id')
+            record.as_dict()
+
+    """
+    __slots__ = ('_index', '_values')
+
+    def __init__(self, index, values):
+        self._index = index
+        self._values = values
+
+    def __getitem__(self, key):
+        position = self._index[key]
+        if position >= len(self._values):
+            raise KeyError(key)
+        return self._values[position]
+
+    def __iter__(self):
+        return (
+            key for key, position in self._index.items()
+            if position < len(self._values)
+        )
+
+    def __len__(self):
+        return min(len(self._index), len(self._values))
+
+    def __repr__(self):
+        return '{0}({1!r})'.format(type(self).__name__, self.as_dict())
+
+    def as_dict(self):
+        """Return a new dictionary mapping the keys to the values."""
+        return dict(
+            (key, self._values[position])
+            for key, position in self._index.items()
+            if position < len(self._values)
+        )
+
+
+def _csv_index(header):
+    """Map the key names generated from a CSV header to their positions.
+
+    Spaces are converted to dashes "-". When a key is repeated, the last
+    column wins, like when building a dictionary from the row.
+
+    """
+    return OrderedDict(
+        (key.replace(' ', '-').lower(), position)
+        for position, key in enumerate(header)
+    )
+
+
+def iter_csv_records(lines):
+    """Parse CSV output from Hammer CLI lazily into compact rows.
+
+    The lines are consumed as the rows are requested, so the output can come
+    straight from a stream like :class:`robottelo.ssh.SSHCommandStream`.
+
+    :param lines: An iterable of unicode lines, without line terminators.
+    :return: A generator yielding a :class:`CSVRecord` for each row.
+
+    """
+    reader = _csv_reader(lines)
+    try:
+        index = _csv_index(next(reader))
+    except StopIteration:
+        return
+    for values in reader:
+        if len(values) > 0:
+            yield CSVRecord(index, tuple(values))
+
+
 def parse_csv(output):
     """Parse CSV output from Hammer CLI and convert it to python dictionary."""
     reader = _csv_reader(output)
@@ -47,6 +130,63 @@ def parse_csv(output):
     return [dict(zip(keys, values)) for values in reader if len(values) > 0]
 
 
+def iter_csv(lines):
+    """Parse CSV output from Hammer CLI lazily.
+
+    Works like :func:`iter_csv_records`, but yields a new dictionary for each
+    row, like :func:`parse_csv` returns them.
+
+    :param lines: An iterable of unicode lines, without line terminators.
+    :return: A generator yielding a dictionary for each row.
+
+    """
+    for record in iter_csv_records(lines):
+        yield record.as_dict()
+
+
+def normalize_json(data):
+    """Normalize JSON output from Hammer CLI like the CSV and info outputs.
+
+    Key names are converted the same way :func:`parse_csv` and
+    :func:`parse_info` do: spaces are converted to dashes "-" and letters are
+    lowercased. Values are converted to unicode strings like hammer prints
+    them: booleans become ``yes`` or ``no`` and ``null`` an empty string.
+
+    :param data: The output parsed by ``json.loads``.
+    :return: A copy of ``data`` with all the key names and values normalized.
+
+    """
+    if isinstance(data, dict):
+        return dict(
+            (key.replace(' ', '-').lower(), normalize_json(value))
+            for key, value in data.items()
+        )
+    if isinstance(data, list):
+        return [normalize_json(value) for value in data]
+    if data is None:
+        return u''
+    if isinstance(data, bool):
+        return u'yes' if data else u'no'
+    return six.text_type(data)
+
+
+def normalize_json_list(data):
+    """Normalize JSON output from Hammer CLI into a list of records.
+
+    The result has the shape :func:`robottelo.ssh.command` gives to CSV
+    output: a single record, like the one printed by ``create``, is wrapped
+    in a list and an empty output gives an empty dictionary.
+
+    :param data: The output parsed by ``json.loads``.
+
+    """
+    if data is None:
+        return {}
+    if isinstance(data, dict):
+        data = [data]
+    return normalize_json(data)
+
+
 def parse_help(output):
     """Parse the help output from a hammer command and return a dictionary
     mapping the subcommands and options accepted by that command.
@@ -111,27 +251,38 @@ def parse_help(output):
     return contents
 
 
+# A value of a single attribute collection property, like " 1) template1"
+_INFO_NUMBERED_VALUE = re.compile(r'\d+\)\s+(.+)$')
+# The number of a numbered sub-property, like " 1) Repo Name: repo1"
+_INFO_NUMBER = re.compile(r'\d+\)')
+
+
 def parse_info(output):
-    """Parse the info output and returns a dict mapping the values."""
+    """Parse the info output and returns a dict mapping the values.
+
+    Each line is stripped and searched only once, the patterns are compiled
+    once for all and the key names, which repeat a lot in lists of
+    properties, are only normalized the first time they are seen.
+
+    """
     # info dictionary
     contents = {}
     sub_prop = None  # stores name of the last group of sub-properties
     sub_num = None  # is not None when list of properties
+    keys = {}  # maps the raw key names to the normalized ones
 
     for line in output:
         # skip empty lines
         if line == '':
             continue
-        if line.startswith(' '):  # sub-properties are indented
+        stripped = line.lstrip()
+        if line[0] == ' ':  # sub-properties are indented
             # values are separated by ':' or '=>'
-            if line.find(':') != -1:
-                key, value = line.lstrip().split(":", 1)
-            elif line.find('=>') != -1:
-                key, value = line.lstrip().split(" =>", 1)
+            if ':' in stripped:
+                key, value = stripped.split(':', 1)
+            elif '=>' in stripped:
+                key, value = stripped.split(' =>', 1)
             else:
-                key = value = None
-
-            if key is None and value is None:
                 # Parse single attribute collection properties
                 # Template
                 #  1) template1
@@ -141,51 +292,54 @@ def parse_info(output):
                 # Template
                 #  template1
                 #  template2
-                match = re.match(r'\d+\)\s+(.+)$', line.lstrip())
-
-                if match is None:
-                    match = re.match(r'(.*)$', line.lstrip())
-
-                value = match.group(1)
-
+                match = (
+                    stripped[:1].isdigit() and
+                    _INFO_NUMBERED_VALUE.match(stripped)
+                )
+                if match:
+                    stripped = match.group(1)
                 if isinstance(contents[sub_prop], dict):
                     contents[sub_prop] = []
+                contents[sub_prop].append(stripped)
+                continue
+
+            # some properties have many numbered values
+            # Example:
+            # Content:
+            #  1) Repo Name: repo1
+            #     URL:       /custom/4f84fc90-9ffa-...
+            #  2) Repo Name: puppet1
+            #     URL:       /custom/4f84fc90-9ffa-...
+            match = key[:1].isdigit() and _INFO_NUMBER.match(key)
+            if match:
+                sub_num = int(key[:match.end() - 1])
+                # no. 1) we need to change dict() to list()
+                if sub_num == 1:
+                    contents[sub_prop] = []
+                # remove number from key
+                key = _INFO_NUMBER.sub('', key)
+                # append empty dict to array
+                contents[sub_prop].append({})
+
+            normalized = keys.get(key)
+            if normalized is None:
+                normalized = keys[key] = key.lstrip().replace(' ', '-').lower()
+            key = normalized
 
-                contents[sub_prop].append(value)
+            # add value to dictionary
+            if sub_num is not None:
+                contents[sub_prop][-1][key] = value.lstrip()
             else:
-                # some properties have many numbered values
-                # Example:
-                # Content:
-                #  1) Repo Name: repo1
-                #     URL:       /custom/4f84fc90-9ffa-...
-                #  2) Repo Name: puppet1
-                #     URL:       /custom/4f84fc90-9ffa-...
-                starts_with_number = re.match(r'(\d+)\)', key)
-                if starts_with_number:
-                    sub_num = int(starts_with_number.group(1))
-                    # no. 1) we need to change dict() to list()
-                    if sub_num == 1:
-                        contents[sub_prop] = []
-                    # remove number from key
-                    key = re.sub(r'\d+\)', '', key)
-                    # append empty dict to array
-                    contents[sub_prop].append({})
-
-                key = key.lstrip().replace(' ', '-').lower()
-
-                # add value to dictionary
-                if sub_num is not None:
-                    contents[sub_prop][-1][key] = value.lstrip()
-                else:
-                    contents[sub_prop][key] = value.lstrip()
+                contents[sub_prop][key] = value.lstrip()
         else:
             sub_num = None  # new property implies no sub property
-            key, value = line.lstrip().split(":", 1)
+            key, value = stripped.split(':', 1)
             key = key.lstrip().replace(' ', '-').lower()
-            if value.lstrip() == '':  # 'key:' no value, new sub-property
+            value = value.lstrip()
+            if value == '':  # 'key:' no value, new sub-property
                 sub_prop = key
                 contents[sub_prop] = {}
             else:  # 'key: value' line
-                contents[key] = value.lstrip()
+                contents[key] = value
 
     return contents
@@ -0,0 +1,179 @@
+# -*- encoding: utf-8 -*-
+"""Server-side hammer sessions to run hammer commands without credentials.
+
+When hammer gets the username and password on its command line, it
+authenticates against the server from scratch on every invocation, and the
+cleartext password shows up in the server process list. Hammer can instead
+log in once with ``hammer auth login basic`` and keep the session in the
+``~/.hammer/sessions`` directory of the user running it, later commands being
+authenticated by that session.
+
+This module logs in once per credential pair. Hammer keeps a single session
+per server under the home directory of the user running it, so each pair gets
+its own home directory on the server and commands are run with ``HOME``
+pointing to it: several users can then be logged in at the same time. The
+hammer configuration of the SSH user is linked into that directory, so
+commands behave the same with or without sessions, and sessions are enabled by
+an additional configuration file given with ``-c``. Hammer reports an expired
+session like a wrong password; callers are expected to drop the session with
+:func:`invalidate` and try again, which logs in again.
+
+Sessions are logged out and their directories are removed when the process
+which logged them in exits.
+
+"""
+import atexit
+import hashlib
+import logging
+import os
+import threading
+
+from robottelo import ssh
+from robottelo.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Exit status of a hammer command which could not be authenticated
+EX_UNAUTHORIZED = 129
+# Directory holding the sessions home directories, relative to the home
+# directory of the SSH user
+SESSIONS_DIR = u'.robottelo/hammer-sessions'
+# Name of the hammer configuration file enabling the sessions, in the session
+# home directory
+SESSION_CONFIG = u'session.yml'
+# Hammer configuration of the SSH user, linked into the sessions home
+# directories
+HAMMER_CONFIG_PATHS = (u'.hammer/cli_config.yml', u'.hammer/cli.modules.d')
+# Seconds to wait for a session to be logged out
+LOGOUT_TIMEOUT = 60
+
+# Credential pairs logged in, keyed on (hostname, user, password), mapped to
+# the PID of the process which logged them in
+_logged_in = {}
+_logged_in_lock = threading.Lock()
+
+
+def session_home(user, password):
+    """Return the home directory used to run hammer for the given
+    credentials.
+
+    The directory name is derived from the credentials, so a new session is
+    started when the password of a user changes. It is relative to the SSH
+    user home directory, through the ``$HOME`` variable, and has to be used
+    unquoted or double quoted in shell commands.
+
+    """
+    digest = hashlib.sha1(
+        u'{0}:{1}'.format(user, password).encode('utf-8')).hexdigest()
+    return u'$HOME/{0}/{1}'.format(SESSIONS_DIR, digest[:16])
+
+
+def session_config(user, password):
+    """Return the hammer configuration file enabling the session of the
+    given credentials.
+
+    It is quoted like :func:`session_home` and is given to hammer with its
+    ``-c`` option, on top of the usual configuration files.
+
+    """
+    return u'{0}/{1}'.format(session_home(user, password), SESSION_CONFIG)
+
+
+def login(user, password, hostname=None):
+    """Log hammer in for the given credentials, unless already done.
+
+    :return: Whether a session is available. If logging in fails, for example
+        because the credentials are wrong, ``False`` is returned and hammer
+        has to get the credentials on its command line.
+    :rtype: bool
+
+    """
+    key = (hostname or settings.server.hostname, user, password)
+    with _logged_in_lock:
+        if key in _logged_in:
+            return True
+
+    home = session_home(user, password)
+    config = session_config(user, password)
+    script = [u'umask 077', u'mkdir -p "{0}/.hammer"'.format(home)]
+    for path in HAMMER_CONFIG_PATHS:
+        script.append(u'rm -rf "{0}/{1}"'.format(home, path))
+        script.append(u'ln -s "$HOME/{1}" "{0}/{1}"'.format(home, path))
+    script.extend((
+        u'printf \':foreman:\\n  :use_sessions: true\\n\' > '
+        u'"{0}"'.format(config),
+        u'LANG={0} HOME="{1}" hammer -c "{2}" auth login basic -u {3} '
+        u'-p {4} </dev/null'.format(
+            settings.locale, home, config, user, password),
+    ))
+    script = u' && '.join(script)
+    result = ssh.command(script.encode('utf-8'), hostname=key[0])
+    if result.return_code != 0:
+        logger.warning(
+            u'Failed to log hammer in as %s, falling back to the credentials '
+            u'on the command line: %s', user, result.stderr)
+        return False
+
+    with _logged_in_lock:
+        _logged_in[key] = os.getpid()
+    return True
+
+
+def invalidate(user, password, hostname=None):
+    """Forget the session of the given credentials.
+
+    The next :func:`login` call logs hammer in again.
+
+    :return: Whether the credentials were logged in.
+    :rtype: bool
+
+    """
+    key = (hostname or settings.server.hostname, user, password)
+    with _logged_in_lock:
+        if key not in _logged_in:
+            return False
+        del _logged_in[key]
+    return True
+
+
+def logout_all():
+    """Log out the sessions logged in by this process and remove their
+    home directories from the server.
+
+    Failures are logged and ignored, as this runs when the process exits.
+
+    """
+    pid = os.getpid()
+    with _logged_in_lock:
+        keys = [key for key, owner in _logged_in.items() if owner == pid]
+        for key in keys:
+            del _logged_in[key]
+    for hostname, user, password in keys:
+        home = session_home(user, password)
+        script = (
+            u'LANG={0} HOME="{1}" hammer -c "{2}" auth logout </dev/null; '
+            u'rm -rf "{1}"'.format(
+                settings.locale, home, session_config(user, password))
+        )
+        try:
+            ssh.command(
+                script.encode('utf-8'),
+                hostname=hostname,
+                timeout=LOGOUT_TIMEOUT,
+            )
+        except Exception as err:  # pylint:disable=broad-except
+            logger.warning(
+                u'Failed to log hammer out as %s: %s', user, err)
+
+
+def expired(response):
+    """Whether a command failed because its session is not valid anymore.
+
+    :param response: A ``SSHCommandResult``, or any object with a
+        ``return_code`` attribute like ``SSHCommandStream``.
+
+    """
+    return response.return_code == EX_UNAUTHORIZED
+
+
+atexit.register(logout_all)
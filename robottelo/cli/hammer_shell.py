@@ -0,0 +1,296 @@
+# -*- encoding: utf-8 -*-
+"""Long-lived ``hammer shell`` sessions to run hammer commands.
+
+Every hammer invocation starts a new Ruby interpreter which loads all hammer
+plugins and the API documentation before doing any real work. A ``hammer
+shell`` process pays that price only once and then runs any number of
+commands, so this module keeps shell processes alive on the server, one or
+more per credential pair, and streams the commands through them.
+
+Hammer does not report the end of a command nor its exit status when running
+as a shell. In order to frame the output of each command, an unknown
+sub-command with a unique name is sent right after it: hammer complains about
+it on stderr, and everything received before that complaint belongs to the
+command. Hammer is loaded by a short Ruby prelude which makes it print the
+exit status of every command on stderr, so the results get the same return
+codes as separate hammer processes.
+
+"""
+import atexit
+import logging
+import os
+import select
+import threading
+import time
+import uuid
+
+from contextlib import contextmanager
+from robottelo import ssh
+from robottelo.config import settings
+
+logger = logging.getLogger(__name__)
+
+# The prompt printed by hammer shell before reading a command
+PROMPT = b'hammer> '
+# Beginning of the stderr line giving the exit status of a command
+STATUS_PREFIX = b'__robottelo_status__ '
+# Ruby code loading hammer. The standard streams are made synchronous,
+# otherwise the output of a command could be held in Ruby buffers while
+# waiting for the next command, and the exit status of every command run by
+# the shell is printed on stderr.
+PRELUDE = (
+    u'STDOUT.sync = STDERR.sync = true; '
+    u'require "hammer_cli"; '
+    u'class HammerCLI::MainCommand; '
+    u'alias_method :robottelo_run, :run; '
+    u'def run(*args); '
+    u'code = robottelo_run(*args); '
+    u'STDERR.puts("{0}#{{code}}"); '
+    u'code; '
+    u'end; '
+    u'end; '
+    u'load ARGV.shift'
+).format(STATUS_PREFIX.decode('utf-8'))
+# Seconds to wait for late output once the frame marker has been received
+DRAIN_TIMEOUT = 0.1
+
+
+class HammerShellError(Exception):
+    """Indicates that a hammer shell session is not usable anymore."""
+
+
+class HammerShell(object):
+    """A ``hammer shell`` process running on the server.
+
+    The process is started through a channel opened on a pooled SSH
+    connection, hammer being loaded by ``PRELUDE``.
+
+    :param str user: The username used to authenticate hammer.
+    :param str password: The password used to authenticate hammer.
+    :param str hostname: The server hostname. ``server.hostname`` from the
+        configuration is used if not provided.
+
+    """
+
+    def __init__(self, user, password, hostname=None):
+        self.user = user
+        self.password = password
+        self.hostname = hostname or settings.server.hostname
+        self._channel = None
+        self._client = None
+
+    def start(self):
+        """Start the ``hammer shell`` process."""
+        self._client = ssh._connection_pool.acquire(hostname=self.hostname)
+        try:
+            self._channel = self._client.get_transport().open_session()
+            self._channel.exec_command(
+                u'LANG={0} ruby -e \'{1}\' '
+                u'"$(command -v hammer)" -v -u {2} -p {3} shell'
+                .format(settings.locale, PRELUDE, self.user, self.password)
+                .encode('utf-8')
+            )
+        except Exception:
+            self.close()
+            raise
+        logger.info(
+            'Started hammer shell session {0} on {1}'
+            .format(hex(id(self)), self.hostname)
+        )
+
+    @property
+    def alive(self):
+        """Whether the ``hammer shell`` process is still running."""
+        return (
+            self._channel is not None and
+            not self._channel.closed and
+            not self._channel.exit_status_ready()
+        )
+
+    def close(self):
+        """Stop the ``hammer shell`` process."""
+        if self._channel is not None:
+            self._channel.close()
+            self._channel = None
+        if self._client is not None:
+            ssh._connection_pool.release(self._client)
+            self._client = None
+
+    def _drain(self, timeout=0):
+        """Read whatever is available on stdout and stderr.
+
+        :param timeout: Stop once nothing has been received for that many
+            seconds.
+        :return: A tuple with the data received on stdout and stderr.
+
+        """
+        stdout = stderr = b''
+        while True:
+            if self._channel.recv_stderr_ready():
+                stderr += self._channel.recv_stderr(65536)
+            elif self._channel.recv_ready():
+                stdout += self._channel.recv(65536)
+            elif not timeout or not select.select(
+                    [self._channel], [], [], timeout)[0]:
+                return (stdout, stderr)
+
+    def _read_frame(self, marker, timeout):
+        """Read stdout and stderr until ``marker`` is found on stderr.
+
+        :raises robottelo.cli.hammer_shell.HammerShellError: If the process
+            dies or ``timeout`` is reached before receiving the marker.
+
+        """
+        stdout = stderr = b''
+        deadline = None if timeout is None else time.time() + timeout
+        while marker not in stderr:
+            remaining = 1 if deadline is None else deadline - time.time()
+            if remaining <= 0:
+                raise HammerShellError(
+                    'Timed out waiting for hammer shell output')
+            if self._channel.recv_stderr_ready():
+                stderr += self._channel.recv_stderr(65536)
+            elif self._channel.recv_ready():
+                stdout += self._channel.recv(65536)
+            elif self._channel.closed or self._channel.exit_status_ready():
+                raise HammerShellError('hammer shell process has exited')
+            else:
+                select.select([self._channel], [], [], min(remaining, 1))
+        # The marker complaint may span several lines and output written to
+        # stdout right before it may still be in flight.
+        late_stdout, late_stderr = self._drain(DRAIN_TIMEOUT)
+        return (stdout + late_stdout, stderr + late_stderr)
+
+    def run(self, command, output_format=None, timeout=None):
+        """Run a hammer command in the shell.
+
+        :param str command: The hammer command without the ``hammer`` prefix,
+            for example ``organization list``.
+        :param str output_format: The hammer output format, if any.
+        :param int timeout: Seconds to wait for the command to finish, wait
+            forever if ``None`` like :func:`robottelo.ssh.command`.
+        :return: The command result, like :func:`robottelo.ssh.command`
+            returns it.
+        :rtype: robottelo.ssh.SSHCommandResult
+        :raises robottelo.cli.hammer_shell.HammerShellError: If the session is
+            broken or the exit status of the command is not reported. The
+            session must not be used anymore.
+
+        """
+        if not self.alive:
+            raise HammerShellError('hammer shell process is not running')
+        line = u'{0} {1}'.format(
+            u'--output={0}'.format(output_format) if output_format else u'',
+            command,
+        ).strip().encode('utf-8')
+        marker = u'__robottelo_frame_{0}__'.format(
+            uuid.uuid4().hex).encode('utf-8')
+        logger.debug('>>> [%s] hammer shell: %s', self.hostname, line)
+
+        # Anything still pending belongs to a previous command
+        self._drain()
+        self._channel.sendall(line + b'\n' + marker + b'\n')
+        stdout, stderr = self._read_frame(marker, timeout)
+
+        # Everything from the line mentioning the marker on is the complaint
+        # about the marker itself.
+        stderr = stderr[:stderr.rfind(b'\n', 0, stderr.find(marker)) + 1]
+        return_code = None
+        err_lines = []
+        for err_line in stderr.splitlines(True):
+            if err_line.startswith(STATUS_PREFIX):
+                return_code = int(err_line[len(STATUS_PREFIX):])
+            else:
+                err_lines.append(err_line)
+        if return_code is None:
+            raise HammerShellError(
+                'hammer shell did not report the exit status of the command')
+        stderr = b''.join(err_lines)
+
+        # Remove prompts and echoed input from the output
+        lines = []
+        for out_line in stdout.split(b'\n'):
+            while out_line.startswith(PROMPT):
+                out_line = out_line[len(PROMPT):]
+            if out_line.rstrip(b'\r') not in (line, marker):
+                lines.append(out_line)
+        stdout = b'\n'.join(lines)
+
+        return ssh.build_command_result(
+            stdout, stderr, return_code, output_format)
+
+
+# Idle sessions, keyed on (hostname, user, password)
+_sessions = {}
+_sessions_lock = threading.Lock()
+_sessions_pid = os.getpid()
+
+
+def _checkout(key):
+    """Return an idle session for ``key`` or start a new one."""
+    global _sessions_pid  # pylint:disable=global-statement
+    with _sessions_lock:
+        if _sessions_pid != os.getpid():
+            # Sessions inherited from a parent process can't be shared
+            _sessions.clear()
+            _sessions_pid = os.getpid()
+        idle = _sessions.setdefault(key, [])
+        while idle:
+            shell = idle.pop()
+            if shell.alive:
+                return shell
+            shell.close()
+    hostname, user, password = key
+    shell = HammerShell(user, password, hostname)
+    shell.start()
+    return shell
+
+
+@contextmanager
+def session(user, password, hostname=None):
+    """Yield a ``HammerShell`` for the given credentials.
+
+    Sessions are reused across calls and threads but a session is never used
+    by more than one caller at a time: concurrent callers get their own
+    session::
+
+        with session('admin', 'changeme') as shell:
+            shell.run('organization list', output_format='csv')
+
+    A session is discarded if any error happens while it is in use, as its
+    state can't be trusted anymore.
+
+    """
+    key = (hostname or settings.server.hostname, user, password)
+    shell = _checkout(key)
+    try:
+        yield shell
+    except Exception:
+        shell.close()
+        raise
+    with _sessions_lock:
+        if _sessions_pid == os.getpid():
+            _sessions.setdefault(key, []).append(shell)
+
+
+def execute(command, user, password, output_format=None, timeout=None):
+    """Run a hammer command on a pooled ``hammer shell`` session.
+
+    :return: The command result.
+    :rtype: robottelo.ssh.SSHCommandResult
+
+    """
+    with session(user, password) as shell:
+        return shell.run(command, output_format, timeout)
+
+
+def close_sessions():
+    """Stop all idle ``hammer shell`` sessions."""
+    with _sessions_lock:
+        shells = [shell for idle in _sessions.values() for shell in idle]
+        _sessions.clear()
+    for shell in shells:
+        shell.close()
+
+
+atexit.register(close_sessions)
@@ -36,11 +36,14 @@ Subcommands::
     user                          Import Users (from spacewalk-report users).
 
 """
-import csv
 import os
 from robottelo import manifests, ssh
+from robottelo.cli import hammer
 from robottelo.cli.base import Base
-import tempfile
+from six.moves import shlex_quote
+
+# Directory where hammer-cli-import keeps the transition data
+TRANSITION_DATA_DIR = u'${HOME}/.transition_data'
 
 
 class Import(Base):
@@ -55,8 +58,8 @@ class Import(Base):
         u'RHN Tools for Red Hat Enterprise Linux 7 Server RPMs x86_64 7Server',
     }
 
-    @staticmethod
-    def csv_to_dataset(csv_files):
+    @classmethod
+    def csv_to_dataset(cls, csv_files):
         """Process and return remote CSV files.
 
         Read the remote CSV files, and return a list of dictionaries for them
@@ -67,22 +70,60 @@ class Import(Base):
             file.
 
         """
+        files = ssh.read_files([shlex_quote(path) for path in csv_files])
         result = []
-        for file in csv_files:
-            temp_file = tempfile.mkstemp()[1]
-            ssh.download_file(file, temp_file)
-            with open(temp_file, 'rb') as file:
-                reader = csv.DictReader(file)
-                result.extend([{
-                    key.decode('utf8'): val.decode('utf8')
-                    for key, val in row.items()}
-                    for row in reader
-                ])
-            os.remove(temp_file)
+        for path in csv_files:
+            if path not in files:
+                raise IOError(u'No such remote file: {0}'.format(path))
+            result.extend(cls._csv_records(files[path]))
         return result
 
     @staticmethod
-    def read_transition_csv(csv_files, key='sat5'):
+    def _csv_records(content):
+        """Parse the contents of a CSV file.
+
+        :param bytes content: The contents of the file.
+        :return: A generator yielding a dictionary for each row, mapping the
+            header names to the row values.
+
+        """
+        reader = hammer._csv_reader(  # pylint:disable=protected-access
+            content.decode('utf-8').split(u'\n'))
+        keys = next(reader, None)
+        if keys is None:
+            return
+        for values in reader:
+            if values:
+                yield dict(zip(keys, values))
+
+    @staticmethod
+    def merge_transition_records(tables, key='sat5'):
+        """Merge the records of several transition tables.
+
+        Records are merged on their ``key`` value: a record updates the
+        record with the same key read before, if any, or is added after all
+        the records read before.
+
+        :param tables: An iterable of tables, each table being an iterable of
+            records.
+        :param key: The name of the field identifying an entity.
+        :returns: A list with the merged records.
+
+        """
+        result = []
+        index = {}
+        for records in tables:
+            for record in records:
+                entity = index.get(record[key])
+                if entity is None:
+                    index[record[key]] = record
+                    result.append(record)
+                else:
+                    entity.update(record)
+        return result
+
+    @classmethod
+    def read_transition_csv(cls, csv_files, key='sat5'):
         """Process remote CSV files and transition them to Dictionary
 
         The result depends on the order of the processed files. This script
@@ -90,7 +131,8 @@ class Import(Base):
         `load_persistent_maps()`_ method.
 
         :param csv_files: A list of Strings containing absolute paths of the
-            remote CSV files
+            remote CSV files. Glob patterns are expanded, the matching files
+            being processed in version order like ``ls -v`` sorts them.
         :param key: (Optional) key to be used to uniquely identify an entity
             ('sat5' by default)
         :returns: A Dictionary object holding the key-value pairs of
@@ -101,22 +143,36 @@ class Import(Base):
             /hammer_cli_import/persistentmap.rb#L113
 
         """
-        result = []
-        for csv_file in csv_files:
-            ssh_cat = ssh.command(u'cat {0}'.format(csv_file))
-            if ssh_cat.return_code != 0:
-                raise AssertionError(ssh_cat.stderr)
-            csv = ssh_cat.stdout[:-1]
-            keys = csv[0].split(',')
-            for val in csv[1:]:
-                record = dict(zip(keys, val.split(',')))
-                for entity in result:
-                    if entity[key] == record[key]:
-                        entity.update(record)
-                        break
-                else:
-                    result.append(record)
-        return result
+        files = ssh.read_files(csv_files)
+        return cls.merge_transition_records(
+            (cls._csv_records(content) for content in files.values()), key)
+
+    @classmethod
+    def read_transition_data(cls, specs):
+        """Read several kinds of transition data in a single round trip.
+
+        :param specs: A list of ``(name, key)`` tuples, where ``name`` is the
+            prefix of the transition data files, like ``organizations``, and
+            ``key`` identifies an entity like in :meth:`read_transition_csv`.
+        :returns: A list holding the transition data of each kind, in the
+            order of ``specs``.
+
+        """
+        files = ssh.read_files([
+            u'{0}/{1}*'.format(TRANSITION_DATA_DIR, name)
+            for name, _ in specs
+        ])
+        return [
+            cls.merge_transition_records(
+                (
+                    cls._csv_records(content)
+                    for path, content in files.items()
+                    if os.path.basename(path).startswith(name)
+                ),
+                key,
+            )
+            for name, key in specs
+        ]
 
     @classmethod
     def activation_key(cls, options=None):
@@ -124,36 +180,32 @@ class Import(Base):
         Requires organization.
 
         """
-        cls.command_sub = 'activation-key'
         return cls.execute(
-            cls._construct_command(options),
+            cls._construct_command('activation-key', options),
             output_format='csv',
         )
 
     @classmethod
     def organization(cls, options=None):
         """Import Organizations (from spacewalk-report users)."""
-        cls.command_sub = 'organization'
         return cls.execute(
-            cls._construct_command(options),
+            cls._construct_command('organization', options),
             output_format='',
         )
 
     @classmethod
     def user(cls, options=None):
         """Import Users (from spacewalk-report users)."""
-        cls.command_sub = 'user'
         return cls.execute(
-            cls._construct_command(options),
+            cls._construct_command('user', options),
             output_format='',
         )
 
     @classmethod
     def host_collection(cls, options=None):
         """Import Host Collections (from spacewalk-report system-groups)."""
-        cls.command_sub = 'host-collection'
         return cls.execute(
-            cls._construct_command(options),
+            cls._construct_command('host-collection', options),
             output_format='',
         )
 
@@ -163,18 +215,16 @@ class Import(Base):
         spacewalk-report config-files-latest).
 
         """
-        cls.command_sub = 'config-file'
         return cls.execute(
-            cls._construct_command(options),
+            cls._construct_command('config-file', options),
             output_format='',
         )
 
     @classmethod
     def content_host(cls, options=None):
         """Import Content Hosts (from spacewalk-report system-profiles)."""
-        cls.command_sub = 'content-host'
         return cls.execute(
-            cls._construct_command(options),
+            cls._construct_command('content-host', options),
             output_format='',
         )
 
@@ -184,18 +234,16 @@ class Import(Base):
         spacewalk-export-channels).
 
         """
-        cls.command_sub = 'content-view'
         return cls.execute(
-            cls._construct_command(options),
+            cls._construct_command('content-view', options),
             output_format='',
         )
 
     @classmethod
     def repository(cls, options=None):
         """Import repositories (from spacewalk-report repositories)."""
-        cls.command_sub = 'repository'
         return cls.execute(
-            cls._construct_command(options),
+            cls._construct_command('repository', options),
             output_format='',
         )
 
@@ -205,9 +253,8 @@ class Import(Base):
         (from spacewalk-report channels).
 
         """
-        cls.command_sub = 'repository-enable'
         return cls.execute(
-            cls._construct_command(options),
+            cls._construct_command('repository-enable', options),
             output_format='',
         )
 
@@ -217,9 +264,8 @@ class Import(Base):
         kickstart-scripts).
 
         """
-        cls.command_sub = 'template-snippet'
         return cls.execute(
-            cls._construct_command(options),
+            cls._construct_command('template-snippet', options),
             output_format='',
         )
 
@@ -229,9 +275,8 @@ class Import(Base):
         format.
 
         """
-        cls.command_sub = 'all'
         return cls.execute(
-            cls._construct_command(options),
+            cls._construct_command('all', options),
             output_format='',
         )
 
@@ -245,12 +290,9 @@ class Import(Base):
 
         """
         result = cls.activation_key(options)
-        transition_data = cls.read_transition_csv(
-            ssh.command(
-                u'ls -v ${HOME}/.transition_data/activation_keys*'
-            ).stdout[:-1],
-            'org_id'
-        )
+        transition_data = cls.read_transition_data([
+            (u'activation_keys', u'org_id'),
+        ])[0]
         return (result, transition_data)
 
     @classmethod
@@ -262,11 +304,9 @@ class Import(Base):
 
         """
         result = cls.organization(options)
-        transition_data = cls.read_transition_csv(
-            ssh.command(
-                u'ls -v ${HOME}/.transition_data/organizations*'
-            ).stdout[:-1]
-        )
+        transition_data = cls.read_transition_data([
+            (u'organizations', u'sat5'),
+        ])[0]
         return (result, transition_data)
 
     @classmethod
@@ -294,11 +334,9 @@ class Import(Base):
 
         result = cls.organization(options)
         ssh.command(u'rm -rf {0}'.format(man_dir))
-        transition_data = cls.read_transition_csv(
-            ssh.command(
-                u'ls -v ${HOME}/.transition_data/organizations*'
-            ).stdout[:-1]
-        )
+        transition_data = cls.read_transition_data([
+            (u'organizations', u'sat5'),
+        ])[0]
         return (result, transition_data)
 
     @classmethod
@@ -310,11 +348,9 @@ class Import(Base):
 
         """
         result = cls.user(options)
-        transition_data = cls.read_transition_csv(
-            ssh.command(
-                u'ls -v ${HOME}/.transition_data/users*'
-            ).stdout[:-1]
-        )
+        transition_data = cls.read_transition_data([
+            (u'users', u'sat5'),
+        ])[0]
         return (result, transition_data)
 
     @classmethod
@@ -326,11 +362,9 @@ class Import(Base):
 
         """
         result = cls.host_collection(options)
-        transition_data = cls.read_transition_csv(
-            ssh.command(
-                u'ls -v ${HOME}/.transition_data/host_collections*'
-            ).stdout[:-1]
-        )
+        transition_data = cls.read_transition_data([
+            (u'host_collections', u'sat5'),
+        ])[0]
         return (result, transition_data)
 
     @classmethod
@@ -343,17 +377,10 @@ class Import(Base):
 
         """
         result = cls.config_file(options)
-        transition_data = [
-            cls.read_transition_csv(ssh.command(cmd).stdout[:-1], key)
-            for cmd, key
-            in (
-                (u'ls -v ${HOME}/.transition_data/products*', u'label'),
-                (
-                    u'ls -v ${HOME}/.transition_data/puppet_repositories*',
-                    u'org_id'
-                ),
-            )
-        ]
+        transition_data = cls.read_transition_data([
+            (u'products', u'label'),
+            (u'puppet_repositories', u'org_id'),
+        ])
         return (result, transition_data)
 
     @classmethod
@@ -366,11 +393,9 @@ class Import(Base):
 
         """
         result = cls.content_view(options)
-        transition_data = cls.read_transition_csv(
-            ssh.command(
-                u'ls -v ${HOME}/.transition_data/content_views*'
-            ).stdout[:-1]
-        )
+        transition_data = cls.read_transition_data([
+            (u'content_views', u'sat5'),
+        ])[0]
         return (result, transition_data)
 
     @classmethod
@@ -382,17 +407,10 @@ class Import(Base):
 
         """
         result = cls.content_host(options)
-        transition_data = [
-            cls.read_transition_csv(
-                ssh.command(cmd).stdout[:-1], key
-            )
-            for cmd, key
-            in (
-                (u'ls -v ${HOME}/.transition_data/system_content_views*',
-                    u'ch_seq'),
-                (u'ls -v ${HOME}/.transition_data/systems*', u'sat5'),
-            )
-        ]
+        transition_data = cls.read_transition_data([
+            (u'system_content_views', u'ch_seq'),
+            (u'systems', u'sat5'),
+        ])
         return (result, transition_data)
 
     @classmethod
@@ -404,16 +422,10 @@ class Import(Base):
 
         """
         result = cls.repository(options)
-        transition_data = [
-            cls.read_transition_csv(
-                ssh.command(cmd).stdout[:-1], key
-            )
-            for cmd, key
-            in (
-                (u'ls -v ${HOME}/.transition_data/products*', u'org_id'),
-                (u'ls -v ${HOME}/.transition_data/repositories*', u'sat5'),
-            )
-        ]
+        transition_data = cls.read_transition_data([
+            (u'products', u'org_id'),
+            (u'repositories', u'sat5'),
+        ])
         return (result, transition_data)
 
     @classmethod
@@ -426,22 +438,10 @@ class Import(Base):
 
         """
         result = cls.repository_enable(options)
-        transition_data = [
-            cls.read_transition_csv(
-                ssh.command(cmd).stdout[:-1], key
-            )
-            for cmd, key
-            in (
-                (
-                    u'ls -v ${HOME}/.transition_data/redhat_content_view*',
-                    u'org_id'
-                ),
-                (
-                    u'ls -v ${HOME}/.transition_data/redhat_repositories*',
-                    u'org_id'
-                ),
-            )
-        ]
+        transition_data = cls.read_transition_data([
+            (u'redhat_content_view', u'org_id'),
+            (u'redhat_repositories', u'org_id'),
+        ])
         return (result, transition_data)
 
     @classmethod
@@ -453,12 +453,7 @@ class Import(Base):
 
         """
         result = cls.template_snippet(options)
-        transition_data = [
-            cls.read_transition_csv(
-                ssh.command(
-                    u'ls -v ${HOME}/.transition_data/template_snippets*'
-                ).stdout[:-1],
-                u'id',
-            )
-        ]
+        transition_data = cls.read_transition_data([
+            (u'template_snippets', u'id'),
+        ])
         return (result, transition_data)
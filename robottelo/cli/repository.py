@@ -29,46 +29,33 @@ class Repository(Base):
 
     command_base = 'repository'
     command_requires_org = True
+    org_optional_subcommands = ('create', 'info')
 
     @classmethod
-    def create(cls, options=None):
-        cls.command_requires_org = False
-
-        try:
-            result = super(Repository, cls).create(options)
-        finally:
-            cls.command_requires_org = True
-
-        return result
-
-    @classmethod
-    def info(cls, options=None):
-        cls.command_requires_org = False
-
-        try:
-            result = super(Repository, cls).info(options)
-        finally:
-            cls.command_requires_org = True
-
-        return result
-
-    @classmethod
-    def synchronize(cls, options, return_raw_response=None):
+    def synchronize(cls, options, return_raw_response=None, timed=None):
         """Synchronizes a repository."""
-        cls.command_sub = 'synchronize'
         return cls.execute(
-            cls._construct_command(options),
+            cls._construct_command('synchronize', options),
             output_format='csv',
             ignore_stderr=True,
             return_raw_response=return_raw_response,
+            timed=timed,
         )
 
+    @classmethod
+    def synchronize_async(cls, options):
+        """Starts synchronizing a repository.
+
+        :return: The synchronization task UUID, see
+            :meth:`robottelo.cli.task.Task.wait_for_tasks`.
+        """
+        return cls._execute_async('synchronize', options)
+
     @classmethod
     def upload_content(cls, options):
         """Upload content to repository."""
-        cls.command_sub = 'upload-content'
         return cls.execute(
-            cls._construct_command(options),
+            cls._construct_command('upload-content', options),
             output_format='csv',
             ignore_stderr=True,
         )
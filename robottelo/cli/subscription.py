@@ -33,32 +33,28 @@ class Subscription(Base):
     @classmethod
     def upload(cls, options=None):
         """Upload a subscription manifest."""
-        cls.command_sub = 'upload'
         return cls.execute(
-            cls._construct_command(options),
+            cls._construct_command('upload', options),
             ignore_stderr=True,
         )
 
     @classmethod
     def delete_manifest(cls, options=None):
         """Deletes a subscription manifest."""
-        cls.command_sub = 'delete-manifest'
         return cls.execute(
-            cls._construct_command(options),
+            cls._construct_command('delete-manifest', options),
             ignore_stderr=True,
         )
 
     @classmethod
     def refresh_manifest(cls, options=None):
         """Refreshes a subscription manifest."""
-        cls.command_sub = 'refresh-manifest'
         return cls.execute(
-            cls._construct_command(options),
+            cls._construct_command('refresh-manifest', options),
             ignore_stderr=True,
         )
 
     @classmethod
     def manifest_history(cls, options=None):
         """Provided history for subscription manifest"""
-        cls.command_sub = 'manifest-history'
-        return cls.execute(cls._construct_command(options))
+        return cls.execute(cls._construct_command('manifest-history', options))
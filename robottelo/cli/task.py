@@ -16,7 +16,22 @@ Subcommands::
     resume                        Resume all tasks paused in error state
 """
 
-from robottelo.cli.base import Base
+import time
+
+from robottelo.cli.base import Base, CLIError
+
+# States of tasks which will not go on by themselves. Failing tasks are
+# usually paused, waiting to be resumed or cancelled.
+TASK_END_STATES = ('paused', 'stopped')
+# Results of tasks which failed, even if they are still running
+TASK_FAILED_RESULTS = ('error',)
+# Results of tasks which succeeded. Like hammer, which exits with 0 for them,
+# tasks with warnings are considered successful.
+TASK_SUCCEEDED_RESULTS = ('success', 'warning')
+
+
+class TaskError(CLIError):
+    """Indicates that a task failed or did not finish in time."""
 
 
 class Task(Base):
@@ -36,8 +51,66 @@ class Task(Base):
             --id ID                       UUID of the task
             --name NAME                   Name to search by
         """
-        cls.command_sub = 'progress'
-        return cls.execute(cls._construct_command(options))
+        return cls.execute(cls._construct_command('progress', options))
+
+    @classmethod
+    def wait_for_tasks(cls, task_ids, timeout=3600, poll_interval=1,
+                       max_poll_interval=30):
+        """Wait for several tasks to finish.
+
+        The state of all the tasks not finished yet is fetched at once, with
+        a single ``list`` command. The time between two polls doubles after
+        every poll, up to ``max_poll_interval``, so short tasks are noticed
+        quickly and long ones do not keep the server busy. Waiting stops as
+        soon as a task fails, see ``TASK_END_STATES`` and
+        ``TASK_FAILED_RESULTS``.
+
+        :param task_ids: The UUIDs of the tasks, like returned by the
+            ``*_async`` methods.
+        :param timeout: Seconds to wait for all the tasks to finish.
+        :param poll_interval: Seconds to wait before the second poll.
+        :param max_poll_interval: Maximum seconds between two polls.
+        :return: A dictionary mapping every task UUID to its ``list`` record.
+        :raises robottelo.cli.task.TaskError: If a task does not succeed,
+            with its state and result, or the tasks do not finish in time.
+        """
+        pending = set(task_ids)
+        finished = {}
+        deadline = time.time() + timeout
+        while pending:
+            tasks = cls.list({u'search': u' or '.join(
+                u'id = {0}'.format(task_id) for task_id in sorted(pending))})
+            for task in tasks:
+                if task['id'] in pending and (
+                        task['state'] in TASK_END_STATES or
+                        task['result'] in TASK_FAILED_RESULTS):
+                    pending.remove(task['id'])
+                    finished[task['id']] = task
+            failed = sorted(
+                task_id for task_id, task in finished.items()
+                if task['result'] not in TASK_SUCCEEDED_RESULTS
+            )
+            if failed:
+                raise TaskError(u'Tasks did not succeed: {0}'.format(
+                    ', '.join(
+                        u'{0} ({1}, {2})'.format(
+                            task_id,
+                            finished[task_id]['state'],
+                            finished[task_id]['result'],
+                        )
+                        for task_id in failed
+                    )
+                ))
+            if not pending:
+                break
+            if time.time() + poll_interval > deadline:
+                raise TaskError(
+                    u'Tasks {0} did not finish in {1} seconds'
+                    .format(u', '.join(sorted(pending)), timeout)
+                )
+            time.sleep(poll_interval)
+            poll_interval = min(poll_interval * 2, max_poll_interval)
+        return finished
 
     @classmethod
     def resume(cls, options=None):
@@ -51,5 +124,4 @@ class Task(Base):
             --task-ids TASK_IDS           Comma separated list of values.
             --tasks TASK_NAMES            Comma separated list of values.
         """
-        cls.command_sub = 'resume'
-        return cls.execute(cls._construct_command(options))
+        return cls.execute(cls._construct_command('resume', options))
@@ -38,10 +38,8 @@ class Template(Base):
         Returns list of types of templates.
         """
 
-        cls.command_sub = 'kinds'
-
         result = cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command('kinds', options), output_format='csv')
 
         kinds = []
 
@@ -56,10 +54,10 @@ class Template(Base):
         Adds operating system, requires "id" and "operatingsystem-id".
         """
 
-        cls.command_sub = 'add-operatingsystem'
-
         result = cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command('add-operatingsystem', options),
+            output_format='csv',
+        )
 
         return result
 
@@ -69,9 +67,9 @@ class Template(Base):
         Remove operating system, requires "id" and "operatingsystem-id".
         """
 
-        cls.command_sub = 'remove-operatingsystem'
-
         result = cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command('remove-operatingsystem', options),
+            output_format='csv',
+        )
 
         return result
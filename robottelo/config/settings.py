@@ -282,23 +282,32 @@ class FakeManifestSettings(FeatureSettings):
     """Fake manifest settings defintitions."""
     def __init__(self, *args, **kwargs):
         super(FakeManifestSettings, self).__init__(*args, **kwargs)
+        self.cache_dir = None
         self.cert_url = None
         self.key_url = None
+        self.offline = None
+        self.pool_size = None
         self.url = None
 
     def read(self, reader):
         """Read fake manifest settings."""
+        self.cache_dir = reader.get(
+            'fake_manifest', 'cache_dir')
         self.cert_url = reader.get(
             'fake_manifest', 'cert_url')
         self.key_url = reader.get(
             'fake_manifest', 'key_url')
+        self.offline = reader.get(
+            'fake_manifest', 'offline', False, bool)
+        self.pool_size = reader.get(
+            'fake_manifest', 'pool_size', 0, int)
         self.url = reader.get(
             'fake_manifest', 'url')
 
     def validate(self):
         """Validate fake manifest settings."""
         validation_errors = []
-        if not all(vars(self).values()):
+        if not all((self.cert_url, self.key_url, self.url)):
             validation_errors.append(
                 'All [fake_manifest] cert_url, key_url, url options must '
                 'be provided.'
@@ -525,7 +534,14 @@ class Settings(object):
         self._configured = False
         self._validation_errors = []
         self.docker_browser = None
+        self.entity_pool_size = None
+        self.hammer_json = None
+        self.hammer_sessions = None
+        self.hammer_shell = None
         self.locale = None
+        self.object_cache_dir = None
+        self.object_cache_size = None
+        self.object_cache_ttl = None
         self.project = None
         self.reader = None
         self.rhel6_repo = None
@@ -622,7 +638,21 @@ class Settings(object):
         """Read Robottelo's general settings."""
         self.docker_browser = self.reader.get(
             'robottelo', 'docker_browser', False, bool)
+        self.entity_pool_size = self.reader.get(
+            'robottelo', 'entity_pool_size', 0, int)
+        self.hammer_json = self.reader.get(
+            'robottelo', 'hammer_json', False, bool)
+        self.hammer_sessions = self.reader.get(
+            'robottelo', 'hammer_sessions', False, bool)
+        self.hammer_shell = self.reader.get(
+            'robottelo', 'hammer_shell', False, bool)
         self.locale = self.reader.get('robottelo', 'locale', 'en_US.UTF-8')
+        self.object_cache_dir = self.reader.get(
+            'robottelo', 'object_cache_dir', None)
+        self.object_cache_size = self.reader.get(
+            'robottelo', 'object_cache_size', 128, int)
+        self.object_cache_ttl = self.reader.get(
+            'robottelo', 'object_cache_ttl', None, int)
         self.project = self.reader.get('robottelo', 'project', 'sat')
         self.rhel6_repo = self.reader.get('robottelo', 'rhel6_repo', None)
         self.rhel7_repo = self.reader.get('robottelo', 'rhel7_repo', None)
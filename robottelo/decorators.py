@@ -7,6 +7,7 @@ import requests
 import unittest2
 
 from functools import wraps
+from robottelo.cache import ObjectCache
 from robottelo.config import settings
 from robottelo.constants import BZ_OPEN_STATUSES, NOT_IMPLEMENTED
 from six.moves.xmlrpc_client import Fault
@@ -14,7 +15,7 @@ from xml.parsers.expat import ExpatError, ErrorString
 
 BUGZILLA_URL = "https://bugzilla.redhat.com/xmlrpc.cgi"
 LOGGER = logging.getLogger(__name__)
-OBJECT_CACHE = {}
+OBJECT_CACHE = ObjectCache()
 REDMINE_URL = 'http://projects.theforeman.org'
 
 # Test Tier Decorators
@@ -138,7 +139,13 @@ def stubbed(reason=None):
 
 
 def cacheable(func):
-    """Decorator that makes an optional object cache available"""
+    """Decorator that makes an optional object cache available
+
+    Objects are cached in ``OBJECT_CACHE`` under the name of the function and
+    the options given, see :class:`robottelo.cache.ObjectCache`.
+
+    """
+    name = func.__name__.replace('make_', '')
 
     @wraps(func)
     def cacheable_function(options=None, cached=False):
@@ -146,13 +153,12 @@ def cacheable(func):
         This is the function being returned.
         Requires input function's name start with 'make_'
         """
-        object_key = func.__name__.replace('make_', '')
-        if cached is True and object_key in OBJECT_CACHE:
-            return OBJECT_CACHE[object_key]
-        new_object = func(options)
-        if cached is True:
-            OBJECT_CACHE[object_key] = new_object
-        return new_object
+        if cached is not True:
+            return func(options)
+        # The function may update the options, build the key first
+        object_key = OBJECT_CACHE.make_key(name, options)
+        return OBJECT_CACHE.get_or_create(
+            object_key, lambda: func(options))
 
     return cacheable_function
 
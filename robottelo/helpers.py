@@ -1,8 +1,10 @@
 # -*- encoding: utf-8 -*-
 """Several helper methods and functions."""
+import json
 import logging
 import os
 import re
+import six
 
 from nailgun.config import ServerConfig
 from robottelo import ssh
@@ -104,6 +106,22 @@ def escape_search(term):
     return u'"%s"' % strip_term.replace('\\', '\\\\').replace('"', '\\"')
 
 
+def canonical_options(options):
+    """Return a text form of ``options`` usable as a key.
+
+    Dictionaries of options which are equal give the same text, whatever the
+    order their items were added in. Values which are not JSON types are
+    converted to text.
+
+    :param options: A dictionary of options, or ``None`` which is the same as
+        an empty dictionary.
+    :rtype: str
+
+    """
+    return json.dumps(
+        options or {}, sort_keys=True, default=six.text_type)
+
+
 def update_dictionary(default, updates):
     """
     Updates default dictionary with elements from
@@ -1,15 +1,274 @@
-"""Manifest clonning tools.."""
+"""Manifest clonning tools..
+
+Cloning a manifest rebuilds its archives and signs it, which takes a while.
+When the ``[fake_manifest] pool_size`` setting is greater than zero, manifests
+are cloned ahead of time by a background thread and :func:`clone` hands them
+out as soon as they are ready.
+
+The template manifest and the signing key are downloaded once per process.
+When the ``[fake_manifest] cache_dir`` setting is set, they are also kept on
+disk, stored under the SHA-256 digest of their contents, so other processes
+only ask the server whether they changed, using the ``ETag`` and
+``Last-Modified`` headers it sent. With the ``offline`` setting, the cached
+files are used without contacting the server at all.
+
+"""
+import copy
+import errno
+import hashlib
 import json
+import logging
+import os
 import requests
 import six
+import struct
+import tempfile
+import threading
 import time
 import uuid
 import zipfile
+import zlib
 
 from Crypto.Hash import SHA256
 from Crypto.PublicKey import RSA
 from Crypto.Signature import PKCS1_v1_5
 from robottelo.config import settings
+from six.moves import queue
+
+logger = logging.getLogger(__name__)
+
+
+def _write_file(path, data):
+    """Write ``data`` to ``path`` under a temporary name and rename it, so
+    other processes never read a partial file.
+
+    """
+    directory = os.path.dirname(path)
+    try:
+        os.makedirs(directory)
+    except OSError as err:
+        if err.errno != errno.EEXIST:
+            raise
+    handle, temp_name = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    with os.fdopen(handle, 'wb') as handler:
+        handler.write(data)
+    os.rename(temp_name, path)
+
+
+class DownloadCache(object):
+    """Content-addressed cache of downloaded files.
+
+    The contents of the files are stored in ``blobs/<sha256>`` and, for each
+    URL, ``urls/<sha1 of the URL>.json`` holds the digest of its contents
+    along with the validators sent by the server.
+
+    :param str path: The cache directory.
+
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def _meta_file(self, url):
+        """Return the path of the file describing ``url``."""
+        return os.path.join(self.path, u'urls', u'{0}.json'.format(
+            hashlib.sha1(url.encode('utf-8')).hexdigest()))
+
+    def _blob_file(self, digest):
+        """Return the path of the file holding the contents ``digest``."""
+        return os.path.join(self.path, u'blobs', digest)
+
+    def load(self, url):
+        """Return the cached contents of ``url`` and their metadata.
+
+        :return: A tuple with the contents and a dictionary with the
+            ``etag`` and ``last_modified`` validators, or ``(None, None)``
+            if ``url`` is not cached or its contents are corrupted.
+
+        """
+        try:
+            with open(self._meta_file(url)) as handler:
+                meta = json.load(handler)
+            with open(self._blob_file(meta['sha256']), 'rb') as handler:
+                content = handler.read()
+        except (IOError, OSError, KeyError, ValueError):
+            return (None, None)
+        if hashlib.sha256(content).hexdigest() != meta['sha256']:
+            logger.warning(u'Cached contents of %s are corrupted', url)
+            return (None, None)
+        return (content, meta)
+
+    def store(self, url, content, etag=None, last_modified=None):
+        """Cache the contents of ``url`` and their validators."""
+        digest = hashlib.sha256(content).hexdigest()
+        _write_file(self._blob_file(digest), content)
+        meta = {
+            u'etag': etag,
+            u'last_modified': last_modified,
+            u'sha256': digest,
+            u'url': url,
+        }
+        _write_file(self._meta_file(url), json.dumps(meta).encode('utf-8'))
+
+    def fetch(self, url, offline=False):
+        """Return the contents of ``url``, downloading them only if they are
+        not cached or changed on the server.
+
+        If the server can not be reached, the cached contents are used.
+
+        :param bool offline: Use the cached contents without contacting the
+            server.
+        :raises IOError: If ``url`` is not cached in offline mode.
+
+        """
+        content, meta = self.load(url)
+        if content is not None and offline:
+            return content
+        if offline:
+            raise IOError(u'{0} is not cached in {1}'.format(url, self.path))
+
+        headers = {}
+        if content is not None:
+            if meta.get(u'etag'):
+                headers['If-None-Match'] = meta[u'etag']
+            if meta.get(u'last_modified'):
+                headers['If-Modified-Since'] = meta[u'last_modified']
+        try:
+            response = requests.get(url, headers=headers)
+        except requests.RequestException as err:
+            if content is None:
+                raise
+            logger.warning(
+                u'Failed to revalidate %s, using the cached file: %s',
+                url, err)
+            return content
+        if response.status_code == 304 and content is not None:
+            return content
+        response.raise_for_status()
+        self.store(
+            url,
+            response.content,
+            response.headers.get('ETag'),
+            response.headers.get('Last-Modified'),
+        )
+        return response.content
+
+
+def download(url):
+    """Download ``url``, through the cache directory if one is configured.
+
+    :return: The contents of ``url`` as bytes.
+
+    """
+    if not settings.fake_manifest.cache_dir:
+        return requests.get(url).content
+    return DownloadCache(settings.fake_manifest.cache_dir).fetch(
+        url, settings.fake_manifest.offline)
+
+
+class _ZipWriter(object):
+    """A minimal ZIP archive writer able to copy compressed members as is.
+
+    ``zipfile`` can only add a member by compressing it again, this writer
+    also takes members already compressed, like the ones read by
+    :func:`_read_raw_members`, so cloning a manifest does not have to inflate
+    and deflate the members it does not change.
+
+    """
+
+    def __init__(self):
+        self._data = six.BytesIO()
+        self._central_dir = []
+
+    def add_raw(self, info, raw):
+        """Add a member given its compressed bytes.
+
+        :param info: The ``zipfile.ZipInfo`` describing the member. Its CRC,
+            sizes and compression type must match ``raw``.
+        :param bytes raw: The compressed contents of the member.
+
+        """
+        try:
+            name = info.filename.encode('ascii')
+            flags = 0
+        except UnicodeError:
+            name = info.filename.encode('utf-8')
+            flags = 0x800
+        # Keep the compression option bits, sizes and CRC are always
+        # written in the headers so no data descriptor is needed
+        flags |= info.flag_bits & 0x06
+        year, month, day, hour, minute, second = info.date_time
+        dos_date = (year - 1980) << 9 | month << 5 | day
+        dos_time = hour << 11 | minute << 5 | second // 2
+        offset = self._data.tell()
+        common = (
+            flags, info.compress_type, dos_time, dos_date,
+            info.CRC, len(raw), info.file_size, len(name),
+        )
+        self._data.write(struct.pack(
+            zipfile.structFileHeader, zipfile.stringFileHeader,
+            20, 0, *(common + (0,))))
+        self._data.write(name)
+        self._data.write(raw)
+        self._central_dir.append(struct.pack(
+            zipfile.structCentralDir, zipfile.stringCentralDir,
+            20, info.create_system, 20, 0,
+            *(common + (0, 0, 0, 0, info.external_attr, offset))
+        ) + name)
+
+    def add(self, info, data):
+        """Add a member compressing ``data`` like ``info`` tells.
+
+        Members which are neither stored nor deflated are stored.
+
+        """
+        info = copy.copy(info)
+        info.CRC = zlib.crc32(data) & 0xffffffff
+        info.file_size = len(data)
+        if info.compress_type == zipfile.ZIP_DEFLATED:
+            compressor = zlib.compressobj(
+                zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, -15)
+            raw = compressor.compress(data) + compressor.flush()
+        else:
+            info.compress_type = zipfile.ZIP_STORED
+            raw = data
+        self.add_raw(info, raw)
+
+    def getvalue(self):
+        """Finish the archive and return its contents."""
+        offset = self._data.tell()
+        central_dir = b''.join(self._central_dir)
+        self._data.write(central_dir)
+        self._data.write(struct.pack(
+            zipfile.structEndArchive, zipfile.stringEndArchive, 0, 0,
+            len(self._central_dir), len(self._central_dir),
+            len(central_dir), offset, 0,
+        ))
+        return self._data.getvalue()
+
+
+def _read_raw_members(data):
+    """Read the members of a ZIP archive without decompressing them.
+
+    :param bytes data: The contents of the archive.
+    :return: A list of ``(info, raw)`` tuples, where ``info`` is the
+        ``zipfile.ZipInfo`` of a member and ``raw`` its compressed bytes.
+
+    """
+    result = []
+    for info in zipfile.ZipFile(six.BytesIO(data)).infolist():
+        header = struct.unpack(
+            zipfile.structFileHeader,
+            data[info.header_offset:
+                 info.header_offset + zipfile.sizeFileHeader]
+        )
+        start = (
+            info.header_offset + zipfile.sizeFileHeader +
+            header[zipfile._FH_FILENAME_LENGTH] +  # noqa pylint:disable=W0212
+            header[zipfile._FH_EXTRA_FIELD_LENGTH]  # noqa pylint:disable=W0212
+        )
+        result.append((info, data[start:start + info.compress_size]))
+    return result
 
 
 class ManifestCloner(object):
@@ -17,12 +276,38 @@ class ManifestCloner(object):
     def __init__(self, template=None, signing_key=None):
         self.template = template
         self.signing_key = signing_key
+        if signing_key is not None:
+            self.signature = PKCS1_v1_5.new(RSA.importKey(signing_key))
+        self._lock = threading.Lock()
+        self._parsed = None
 
     def _download_manifest_info(self):
         """Download and cache the manifest information."""
-        self.template = requests.get(settings.fake_manifest.url).content
-        self.signing_key = requests.get(settings.fake_manifest.key_url).content
-        self.signature = PKCS1_v1_5.new(RSA.importKey(self.signing_key))
+        with self._lock:
+            if self.signing_key is not None and self.template is not None:
+                # Downloaded by another thread meanwhile
+                return
+            self.template = download(settings.fake_manifest.url)
+            self.signing_key = download(settings.fake_manifest.key_url)
+            self.signature = PKCS1_v1_5.new(RSA.importKey(self.signing_key))
+
+    def _parse_template(self):
+        """Read the ``consumer_export.zip`` members of the template once.
+
+        :return: A tuple with the list of the ``(info, raw)`` members, as
+            :func:`_read_raw_members` returns them, and the consumer data.
+
+        """
+        with self._lock:
+            if self._parsed is None or self._parsed[0] is not self.template:
+                consumer_export = zipfile.ZipFile(
+                    six.BytesIO(self.template)).read('consumer_export.zip')
+                members = _read_raw_members(consumer_export)
+                consumer_data = json.loads(zipfile.ZipFile(
+                    six.BytesIO(consumer_export)
+                ).read('export/consumer.json').decode('utf-8'))
+                self._parsed = (self.template, members, consumer_data)
+            return self._parsed[1:]
 
     def clone(self):
         """Clones a RedHat-manifest file.
@@ -32,56 +317,44 @@ class ManifestCloner(object):
         candlepin server in order to accept uploading the cloned
         manifest.
 
+        Only the consumer data is rewritten, the other members of
+        ``consumer_export.zip`` are copied without being decompressed, and
+        the new ``consumer_export.zip``, already compressed, is stored in the
+        manifest without being compressed again.
+
         :return: A file-like object (``BytesIO`` on Python 3 and
             ``StringIO`` on Python 2) with the contents of the cloned
             manifest.
         """
         if self.signing_key is None or self.template is None:
             self._download_manifest_info()
-
-        template_zip = zipfile.ZipFile(six.BytesIO(self.template))
-        # Extract the consumer_export.zip from the template manifest.
-        consumer_export_zip = zipfile.ZipFile(
-            six.BytesIO(template_zip.read('consumer_export.zip')))
+        members, consumer_data = self._parse_template()
 
         # Generate a new consumer_export.zip file changing the consumer
         # uuid.
-        consumer_export = six.BytesIO()
-        with zipfile.ZipFile(consumer_export, 'w') as new_consumer_export_zip:
-            for name in consumer_export_zip.namelist():
-                if name == 'export/consumer.json':
-                    consumer_data = json.loads(
-                        consumer_export_zip.read(name).decode('utf-8'))
-                    consumer_data['uuid'] = six.text_type(uuid.uuid1())
-                    new_consumer_export_zip.writestr(
-                        name,
-                        json.dumps(consumer_data)
-                    )
-                else:
-                    new_consumer_export_zip.writestr(
-                        name,
-                        consumer_export_zip.read(name)
-                    )
+        consumer_export = _ZipWriter()
+        for info, raw in members:
+            if info.filename == 'export/consumer.json':
+                consumer_export.add(info, json.dumps(dict(
+                    consumer_data, uuid=six.text_type(uuid.uuid1())
+                )).encode('utf-8'))
+            else:
+                consumer_export.add_raw(info, raw)
+        consumer_export = consumer_export.getvalue()
 
         # Generate a new manifest.zip file with the generated
         # consumer_export.zip and new signature.
-        manifest = six.BytesIO()
-        with zipfile.ZipFile(
-                manifest, 'w', zipfile.ZIP_DEFLATED) as manifest_zip:
-            consumer_export.seek(0)
-            manifest_zip.writestr(
-                'consumer_export.zip',
-                consumer_export.read()
-            )
-            consumer_export.seek(0)
-            manifest_zip.writestr(
-                'signature',
-                self.signature.sign(SHA256.new(consumer_export.read()))
-            )
-        # Make sure that the file-like object is at the beginning and
-        # ready to be read.
-        manifest.seek(0)
-        return manifest
+        date_time = time.localtime(time.time())[:6]
+        manifest = _ZipWriter()
+        manifest.add(
+            zipfile.ZipInfo('consumer_export.zip', date_time),
+            consumer_export
+        )
+        manifest.add(
+            zipfile.ZipInfo('signature', date_time),
+            self.signature.sign(SHA256.new(consumer_export))
+        )
+        return six.BytesIO(manifest.getvalue())
 
     def original(self):
         """Returns the original manifest as a file-like object.
@@ -102,6 +375,110 @@ class ManifestCloner(object):
 _manifest_cloner = ManifestCloner()
 
 
+class ManifestPool(object):
+    """Manifests cloned ahead of time by a background thread.
+
+    The thread clones manifests until ``size`` of them are ready, and waits
+    for one to be taken to clone the next one.
+
+    :param cloner: The ``ManifestCloner`` used to clone the manifests.
+    :param int size: The number of manifests to keep ready.
+
+    """
+
+    def __init__(self, cloner, size):
+        self.cloner = cloner
+        self.size = size
+        self.hits = 0
+        self.misses = 0
+        self._ready = queue.Queue(maxsize=size)
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def _clone(self):
+        """Clone a manifest and return its contents."""
+        return self.cloner.clone().getvalue()
+
+    def get(self):
+        """Take a cloned manifest, or clone one if none is ready.
+
+        :return: A file-like object with the contents of the cloned manifest,
+            like ``ManifestCloner.clone`` returns.
+
+        """
+        try:
+            content = self._ready.get_nowait()
+        except queue.Empty:
+            content = None
+        with self._lock:
+            if content is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        self.start()
+        if content is None:
+            content = self._clone()
+        return six.BytesIO(content)
+
+    def start(self):
+        """Start cloning manifests in the background, unless already done."""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._fill)
+            self._thread.daemon = True
+            self._thread.start()
+
+    def _fill(self):
+        """Clone manifests forever, blocking while the pool is full.
+
+        Cloning stops on the first failure, the next :meth:`get` starts a new
+        attempt.
+
+        """
+        while True:
+            try:
+                content = self._clone()
+            except Exception as err:  # pylint:disable=broad-except
+                logger.warning(u'Failed to clone a manifest: %s', err)
+                with self._lock:
+                    self._thread = None
+                return
+            self._ready.put(content)
+
+    def stats(self):
+        """Return a dictionary with the pool statistics."""
+        with self._lock:
+            return {
+                u'hits': self.hits,
+                u'misses': self.misses,
+                u'ready': self._ready.qsize(),
+            }
+
+
+_manifest_pool = None
+_manifest_pool_lock = threading.Lock()
+_manifest_pool_pid = None
+
+
+def _get_manifest_pool():
+    """Return the manifest pool, or ``None`` if it is disabled.
+
+    A forked process gets a pool of its own, the cloning thread of its parent
+    not being copied along.
+
+    """
+    global _manifest_pool, _manifest_pool_pid  # noqa pylint:disable=global-statement
+    size = settings.fake_manifest.pool_size
+    if not size:
+        return None
+    with _manifest_pool_lock:
+        if _manifest_pool is None or _manifest_pool_pid != os.getpid():
+            _manifest_pool = ManifestPool(_manifest_cloner, size)
+            _manifest_pool_pid = os.getpid()
+        return _manifest_pool
+
+
 class Manifest(object):
     """Class that holds the contents of a manifest with a generated filename
     based on ``time.time``.
@@ -117,7 +494,11 @@ class Manifest(object):
         self.filename = filename
 
         if self._content is None:
-            self._content = _manifest_cloner.clone()
+            pool = _get_manifest_pool()
+            if pool is None:
+                self._content = _manifest_cloner.clone()
+            else:
+                self._content = pool.get()
         if self.filename is None:
             self.filename = u'/tmp/manifest-{0}.zip'.format(int(time.time()))
 
@@ -22,19 +22,14 @@ class Candlepin(object):
     Candlepin Subscription functionality
     """
     @staticmethod
-    def get_real_time(result):
-        """Parse stderr and extract out real time value
+    def timed_command(cmd, vm_ip):
+        """Run ``cmd`` on the client ``vm_ip`` and time it
 
-        :param str result: Standard Error
-        :return: The real timing value
+        :return: The ``SSHCommandResult`` of the command, with its
+            ``timing`` attribute set, see :func:`robottelo.ssh.timed_command`
 
         """
-        real_time = [
-            real
-            for real in result.split('\n')
-            if real.startswith('real')
-        ]
-        return float(real_time[0].split(' ')[1])
+        return ssh.timed_command(cmd, hostname=vm_ip, server_timing=True)
 
     @classmethod
     def single_register_activation_key(cls, ak_name, default_org, vm_ip):
@@ -42,17 +37,17 @@ class Candlepin(object):
 
         # note: must create ssh keys for vm if running on local
         result = ssh.command('subscription-manager clean', hostname=vm_ip)
-        result = ssh.command(
-            'time -p subscription-manager register --activationkey={0} '
+        result = cls.timed_command(
+            'subscription-manager register --activationkey={0} '
             '--org={1}'.format(ak_name, default_org),
-            hostname=vm_ip
+            vm_ip
         )
 
         if result.return_code != 0:
             LOGGER.error('Fail to subscribe {0} by ak!'.format(vm_ip))
         else:
             LOGGER.info('Subscribe client {0} successfully'.format(vm_ip))
-        return cls.get_real_time(result.stderr)
+        return result.timing.elapsed
 
     @classmethod
     def single_register_attach(cls, sub_id, default_org, environment, vm_ip):
@@ -68,8 +63,8 @@ class Candlepin(object):
     @classmethod
     def sub_mgr_register_authentication(cls, default_org, environment, vm_ip):
         """subscription-manager register -u -p --org --environment"""
-        result = ssh.command(
-            'time -p subscription-manager register --username={0} '
+        result = cls.timed_command(
+            'subscription-manager register --username={0} '
             '--password={1} '
             '--org={2} '
             '--environment={3}'
@@ -79,7 +74,7 @@ class Candlepin(object):
                 default_org,
                 environment
             ),
-            hostname=vm_ip
+            vm_ip
         )
 
         if result.return_code != 0:
@@ -88,21 +83,21 @@ class Candlepin(object):
             )
         else:
             LOGGER.info('Register client {0} successfully'.format(vm_ip))
-        return cls.get_real_time(result.stderr)
+        return result.timing.elapsed
 
     @classmethod
     def sub_mgr_attach(cls, pool_id, vm_ip):
         """subscription-manager attach --pool=pool_id"""
-        result = ssh.command(
-            'time -p subscription-manager attach --pool={0}'.format(pool_id),
-            hostname=vm_ip
+        result = cls.timed_command(
+            'subscription-manager attach --pool={0}'.format(pool_id),
+            vm_ip
         )
 
         if result.return_code != 0:
             LOGGER.error('Fail to attach client {0}'.format(vm_ip))
         else:
             LOGGER.info('Attach client {0} successfully'.format(vm_ip))
-        return cls.get_real_time(result.stderr)
+        return result.timing.elapsed
 
     @classmethod
     def single_delete(cls, uuid, thread_id):
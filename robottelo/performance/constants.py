@@ -31,3 +31,12 @@ STAT_SYNC_FILE_NAME = 'perf-statistics-sync.csv'
 
 # parameters for number of threads/clients
 NUM_THREADS = '1,2,4,6,8,10'
+
+# parameters for open-loop registrations: arrival rate (per second) and
+# duration (seconds)
+OPEN_LOOP_RATE = 5
+OPEN_LOOP_DURATION = 600
+
+# duration (seconds) of soak registrations, whose timings are recorded into
+# histograms
+SOAK_DURATION = 3600
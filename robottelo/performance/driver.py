@@ -0,0 +1,356 @@
+"""Load driver running a scenario concurrently for several clients.
+
+A scenario is a callable taking a client and an iteration number and
+returning the measure of that iteration, usually a timing. The driver runs
+one worker per client on a thread pool, every worker calling the scenario
+with its client over and over::
+
+    def register(vm_ip, iteration):
+        return Candlepin.single_register_activation_key(
+            ak_name, default_org, vm_ip)
+
+    driver = LoadDriver(register, vm_list, iterations=500)
+    results = driver.run()  # one list of timings per client
+
+The workers are started together once all of them are ready, optionally
+spread over a ramp-up period, and stop after a number of iterations, after a
+duration or when the driver is cancelled.
+
+For long runs, the workers can record the timings into histograms instead of
+keeping them all, see :mod:`robottelo.performance.histogram`.
+
+:class:`LoadDriver` is closed-loop: a worker starts an iteration only once
+the previous one is done, so a slow server slows the load down and the time
+requests would have waited is never measured. :class:`OpenLoopDriver`
+instead schedules the requests at a target arrival rate, whatever the
+completions, and measures their latency from the time they were scheduled
+at::
+
+    driver = OpenLoopDriver(register, vm_list, rate=5, duration=600)
+    samples = driver.run()
+    latencies = [sample.latency for sample in samples]
+    driver.missed  # requests started late because all clients were busy
+
+"""
+import collections
+import logging
+import random
+import threading
+import time
+
+from multiprocessing.pool import ThreadPool
+from robottelo.performance.histogram import LatencyHistogram
+
+LOGGER = logging.getLogger(__name__)
+
+
+class _StartBarrier(object):
+    """Release the workers together once all of them are waiting.
+
+    ``threading.Barrier`` is not available on Python 2.
+
+    """
+
+    def __init__(self, parties):
+        self.parties = parties
+        self.started = None
+        self._waiting = 0
+        self._condition = threading.Condition()
+
+    def wait(self):
+        """Wait for all the workers and return the time they were released.
+        """
+        with self._condition:
+            self._waiting += 1
+            if self._waiting == self.parties:
+                self.started = time.time()
+                self._condition.notify_all()
+            while self.started is None:
+                self._condition.wait()
+            return self.started
+
+
+class _Driver(object):
+    """Common behavior of the load drivers.
+
+    :param scenario: A callable taking a client and a sequence number and
+        returning the measure of the call.
+    :param clients: A list of clients, each one given to its own worker.
+
+    """
+
+    def __init__(self, scenario, clients):
+        self.scenario = scenario
+        self.clients = list(clients)
+        self.errors = []
+        self._cancelled = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def cancelled(self):
+        """Whether the run was cancelled."""
+        return self._cancelled.is_set()
+
+    def cancel(self):
+        """Stop the workers once their current call is done."""
+        self._cancelled.set()
+
+    def _call(self, index, client, number):
+        """Call the scenario, recording the error if it fails.
+
+        :return: A tuple with whether the call succeeded and its measure.
+
+        """
+        try:
+            return (True, self.scenario(client, number))
+        except Exception as err:  # pylint:disable=broad-except
+            LOGGER.exception('Call %d of client %d failed', number, index)
+            with self._lock:
+                self.errors.append((index, number, err))
+            return (False, None)
+
+    def _run_workers(self, worker):
+        """Run ``worker`` for every client on a thread pool.
+
+        :param worker: A callable taking the client index, the client and
+            the start barrier.
+        :return: The list of the values returned by the workers.
+
+        """
+        self.errors = []
+        barrier = _StartBarrier(len(self.clients))
+        pool = ThreadPool(len(self.clients))
+        try:
+            tasks = [
+                pool.apply_async(worker, (index, client, barrier))
+                for index, client in enumerate(self.clients)
+            ]
+            return [task.get() for task in tasks]
+        except BaseException:
+            self.cancel()
+            raise
+        finally:
+            pool.close()
+            pool.join()
+
+
+class LoadDriver(_Driver):
+    """Run a scenario concurrently, one worker per client.
+
+    :param scenario: A callable taking a client and the iteration number and
+        returning the measure of the iteration. When it returns ``None``,
+        nothing is recorded for the iteration.
+    :param clients: A list of clients, each one given to its own worker.
+    :param int iterations: The number of iterations run by each worker.
+    :param float duration: The number of seconds after which the workers
+        stop starting new iterations, counted from the start of the run.
+    :param float ramp_up: The number of seconds over which the workers
+        starts are spread. All the workers start together by default.
+    :param bool histogram: Record the measures, which must be timings, into
+        one :class:`LatencyHistogram` per worker instead of keeping them.
+
+    At least one of ``iterations`` and ``duration`` must be given, the
+    workers stop on the first limit reached. Iterations raising an exception
+    are logged and recorded in :attr:`errors` and the worker goes on with
+    the next one.
+
+    """
+
+    def __init__(self, scenario, clients, iterations=None, duration=None,
+                 ramp_up=0, histogram=False):
+        if iterations is None and duration is None:
+            raise ValueError('Either iterations or duration must be given')
+        super(LoadDriver, self).__init__(scenario, clients)
+        self.iterations = iterations
+        self.duration = duration
+        self.ramp_up = ramp_up
+        self.histogram = histogram
+        self._buffers = []
+
+    def _worker(self, index, client, barrier):
+        """Run the scenario for ``client`` until a limit is reached.
+
+        :return: The number of measures written to the worker buffer, or
+            recorded into its histogram.
+
+        """
+        buffer_ = self._buffers[index]
+        started = barrier.wait()
+        delay = index * self.ramp_up / float(len(self.clients))
+        if delay > 0 and self._cancelled.wait(delay):
+            return 0
+        deadline = None
+        if self.duration is not None:
+            deadline = started + self.duration
+        count = 0
+        iteration = 0
+        while not self._cancelled.is_set():
+            if self.iterations is not None and iteration >= self.iterations:
+                break
+            if deadline is not None and time.time() >= deadline:
+                break
+            success, value = self._call(index, client, iteration)
+            if success and value is not None:
+                if self.histogram:
+                    # the histogram is only written by this worker
+                    buffer_.record(value)
+                elif count < len(buffer_):
+                    buffer_[count] = value
+                else:
+                    buffer_.append(value)
+                count += 1
+            iteration += 1
+        return count
+
+    def run(self):
+        """Run the scenario for all the clients and wait for the workers.
+
+        :return: A list holding, for each client in order, the list of the
+            measures returned by the scenario, or its histogram when
+            ``histogram`` is set.
+
+        """
+        if not self.clients:
+            return []
+        if self.histogram:
+            self._buffers = [LatencyHistogram() for _ in self.clients]
+            self._run_workers(self._worker)
+            return self._buffers
+        # Each worker writes its measures to its own buffer, allocated
+        # upfront when the number of iterations is known
+        self._buffers = [
+            [None] * (self.iterations or 0) for _ in self.clients]
+        counts = self._run_workers(self._worker)
+        return [
+            buffer_[:count] for buffer_, count in zip(self._buffers, counts)]
+
+
+#: A request run by :class:`OpenLoopDriver`. ``scheduled``, ``started`` and
+#: ``finished`` are timestamps, ``lag`` is the time the request waited for a
+#: free client and ``latency`` is measured from the time it was scheduled at,
+#: so it includes ``lag``. ``value`` is the scenario measure, ``None`` if it
+#: failed.
+Sample = collections.namedtuple('Sample', (
+    'number', 'client', 'scheduled', 'started', 'finished', 'lag', 'latency',
+    'value',
+))
+
+
+class OpenLoopDriver(_Driver):
+    """Run a scenario at a target arrival rate, whatever the completions.
+
+    Requests are scheduled ``1 / rate`` seconds apart, or at the times of a
+    Poisson process of the same rate, and each one is run by the first free
+    client. When all the clients are busy, a request starts late: it is
+    counted as missed and the delay is part of its latency.
+
+    :param scenario: A callable taking a client and the request number and
+        returning the measure of the request.
+    :param clients: A list of clients. A client runs one request at a time,
+        so the number of clients bounds the requests in flight.
+    :param float rate: The number of requests scheduled per second.
+    :param float duration: The number of seconds over which requests are
+        scheduled.
+    :param int requests: The number of requests to schedule.
+    :param str arrival: ``constant`` or ``poisson``.
+    :param float slack: The number of seconds a request may start late
+        without being counted as missed.
+    :param seed: The seed of the Poisson arrivals, for reproducible runs.
+
+    At least one of ``duration`` and ``requests`` must be given, scheduling
+    stops on the first limit reached.
+
+    """
+
+    def __init__(self, scenario, clients, rate, duration=None, requests=None,
+                 arrival='constant', slack=0.01, seed=None):
+        if duration is None and requests is None:
+            raise ValueError('Either duration or requests must be given')
+        if rate <= 0:
+            raise ValueError('The rate must be positive')
+        if arrival not in ('constant', 'poisson'):
+            raise ValueError('Unknown arrival: {0}'.format(arrival))
+        super(OpenLoopDriver, self).__init__(scenario, clients)
+        self.rate = rate
+        self.duration = duration
+        self.requests = requests
+        self.arrival = arrival
+        self.slack = slack
+        self.seed = seed
+        self.missed = 0
+        self._random = None
+        self._next_number = 0
+        self._next_offset = 0.0
+
+    def _schedule(self):
+        """Take the next request to run.
+
+        :return: A tuple with the request number and its offset from the
+            start of the run, or ``None`` once all requests are scheduled.
+
+        """
+        with self._lock:
+            number = self._next_number
+            offset = self._next_offset
+            if self.requests is not None and number >= self.requests:
+                return None
+            if self.duration is not None and offset >= self.duration:
+                return None
+            self._next_number += 1
+            if self.arrival == 'poisson':
+                self._next_offset += self._random.expovariate(self.rate)
+            else:
+                self._next_offset = self._next_number / float(self.rate)
+            return (number, offset)
+
+    def _worker(self, index, client, barrier):
+        """Run the scheduled requests while ``client`` is free.
+
+        :return: The list of the samples of the requests run by the client.
+
+        """
+        samples = []
+        started = barrier.wait()
+        while not self._cancelled.is_set():
+            request = self._schedule()
+            if request is None:
+                break
+            number, offset = request
+            scheduled = started + offset
+            delay = scheduled - time.time()
+            if delay > 0 and self._cancelled.wait(delay):
+                break
+            request_started = time.time()
+            lag = max(request_started - scheduled, 0.0)
+            if lag > self.slack:
+                with self._lock:
+                    self.missed += 1
+            _, value = self._call(index, client, number)
+            finished = time.time()
+            samples.append(Sample(
+                number, index, scheduled, request_started, finished, lag,
+                finished - scheduled, value,
+            ))
+        return samples
+
+    def run(self):
+        """Run the scheduled requests and wait for them to finish.
+
+        :return: The list of the samples of all the requests, in the order
+            they were scheduled.
+
+        """
+        if not self.clients:
+            return []
+        self.missed = 0
+        self._random = random.Random(self.seed)
+        self._next_number = 0
+        self._next_offset = 0.0
+        if self.arrival == 'poisson':
+            # The first request comes after an interarrival time as well
+            self._next_offset = self._random.expovariate(self.rate)
+        samples = []
+        for client_samples in self._run_workers(self._worker):
+            samples.extend(client_samples)
+        samples.sort(key=lambda sample: sample.number)
+        return samples
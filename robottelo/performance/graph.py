@@ -125,23 +125,30 @@ def generate_line_chart_stat_bucketized_candlepin(
         head,
         filename,
         bucket_size,
-        num_buckets):
+        num_values=None):
     """Generate Normal Line chart for stat data of ak/att/del/reg by buckets
 
+    There is a label for every bucket of ``stat_dict``, as returned by
+    :func:`robottelo.performance.stat.generate_stat_for_concurrent_thread`.
+
     :param dict stat_dict: The dictionary containing min/median/max/std
     :param str head: Title of charts
     :param str filename: The name of output svg chart
     :param int bucket_size: The number of timing values grouped by a bucket
-    :param int num_buckets: The number of buckets to slice a client
+    :param int num_values: The number of timing values split in buckets,
+        the last bucket may hold fewer values than ``bucket_size``. All the
+        buckets are full if ``None``.
 
     """
     if bucket_size == 0:
         return
 
-    buckets = [
-        '{0}-{1}'.format(bucket_size * i + 1, bucket_size * (i + 1))
-        for i in range(num_buckets)
-    ]
+    buckets = []
+    for i in sorted(stat_dict):
+        end = bucket_size * (i + 1)
+        if num_values is not None:
+            end = min(end, num_values)
+        buckets.append('{0}-{1}'.format(bucket_size * i + 1, end))
     line_chart = pygal.Line()
     line_chart.title = head
     line_chart.x_labels = buckets
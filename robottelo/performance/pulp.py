@@ -37,7 +37,8 @@ class Pulp(object):
 
         result = Repository.synchronize(
             {'id': repo_id},
-            return_raw_response=True
+            return_raw_response=True,
+            timed=True,
         )
 
         if result.return_code != 0:
@@ -50,17 +51,7 @@ class Pulp(object):
             'Sync repository {0} by thread-{1} successful!'
             .format(repo_name, thread_id)
         )
-        return cls.get_elapsed_time(result.stderr)
-
-    @staticmethod
-    def get_elapsed_time(stderr):
-        """retrieve time from stderr"""
-        # should return only one time point as a single sync
-        real_time = ''
-        for line in stderr.split('\n'):
-            if line.startswith('real'):
-                real_time = line
-        return 0 if real_time == '' else float(real_time.split(' ')[1])
+        return result.timing.elapsed
 
     @staticmethod
     def get_enabled_repos(org_id):
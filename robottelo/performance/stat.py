@@ -2,67 +2,123 @@
 import csv
 import numpy
 
+#: Percentiles reported for each bucket, after the min, median, mean, max and
+#: standard deviation
+PERCENTILES = (90, 95, 99, 99.9)
+
+#: Header of the statistics rows
+STAT_HEADER = [
+    'bucket', 'min', 'median', 'mean', 'max', 'std',
+    '90%', '95%', '99%', '99.9%',
+]
+
+
+def histogram_stat(histogram):
+    """Compute the statistics of a histogram.
+
+    :param histogram: A
+        :class:`robottelo.performance.histogram.LatencyHistogram`.
+    :return: A tuple with the min, median, mean, max, standard deviation
+        and the values at :data:`PERCENTILES`.
+
+    """
+    median, p90, p95, p99, p999 = histogram.percentiles(
+        (50,) + PERCENTILES)
+    return (histogram.min, median, histogram.mean, histogram.max,
+            histogram.std, p90, p95, p99, p999)
+
+
+def generate_stat_for_histogram(name, histogram, stat_file_name):
+    """Write the statistics of a histogram, as recorded by the load drivers
+    of long runs.
+
+    :param str name: The name of the histogram, used as the bucket name.
+    :param histogram: A
+        :class:`robottelo.performance.histogram.LatencyHistogram`.
+    :param str stat_file_name: The csv file the statistics are appended to.
+    :return: A tuple with the min, median, max and standard deviation, as
+        expected by the charts.
+
+    """
+    stat = histogram_stat(histogram)
+    with open(stat_file_name, 'a') as handler:
+        writer = csv.writer(handler)
+        writer.writerow([])
+        writer.writerow(STAT_HEADER)
+        writer.writerow([name] + list(stat))
+    return (stat[0], stat[1], stat[3], stat[4])
+
+
+def _bucket_stat(samples):
+    """Compute the statistics of each row of the 2-D array ``samples``.
+
+    :return: An array with a row per bucket and a column per statistic,
+        ordered as in :data:`STAT_HEADER`.
+
+    """
+    median, p90, p95, p99, p999 = numpy.percentile(
+        samples, (50,) + PERCENTILES, axis=1)
+    return numpy.column_stack((
+        samples.min(axis=1),
+        median,
+        samples.mean(axis=1),
+        samples.max(axis=1),
+        samples.std(axis=1),
+        p90,
+        p95,
+        p99,
+        p999,
+    ))
+
 
 def generate_stat_for_concurrent_thread(
         thread_name,
         time_list,
         stat_file_name,
-        bucket_size,
-        num_buckets):
-    """statistics computing utility for Candlepin tests"""
+        bucket_size):
+    """statistics computing utility for Candlepin tests
+
+    ``time_list`` is split into buckets of ``bucket_size`` timings, the last
+    one holding the remaining timings if there are not enough to fill it, so
+    there are ``ceil(len(time_list) / bucket_size)`` buckets. The statistics
+    of all the full buckets are computed at once on an array of a row per
+    bucket.
+
+    """
     # check empty case: empty bucket has no need to compute stat
     if bucket_size == 0:
         return
-    else:
-        num_buckets = len(time_list)/bucket_size
 
-    return_stat = {}
+    samples = numpy.asarray(time_list, dtype=float)
+    num_full = len(samples) // bucket_size
+    stats = []
+    if num_full:
+        stats.append(_bucket_stat(
+            samples[:num_full * bucket_size].reshape(num_full, bucket_size)))
+    if len(samples) % bucket_size:
+        stats.append(_bucket_stat(
+            samples[num_full * bucket_size:].reshape(1, -1)))
+    rows = numpy.concatenate(stats).tolist() if stats else []
 
     # create list of bucket series
-    buckets = ['{0}-{1}'.format(bucket_size * i + 1, bucket_size * (i + 1))
-               for i in range(num_buckets)]
+    buckets = [
+        '{0}-{1}'.format(start + 1, min(start + bucket_size, len(samples)))
+        for start in range(0, len(samples), bucket_size)
+    ]
 
     with open(stat_file_name, 'a') as handler:
         writer = csv.writer(handler)
         writer.writerow([])
         writer.writerow(['{0}'.format(thread_name)])
-        writer.writerow([
-            'bucket',
-            'min',
-            'median',
-            'mean',
-            'max',
-            'std',
-            '90%',
-            '95%',
-            '99%'
-        ])
-        for i, bucket in enumerate(buckets):
-            # slice the given time-list into buckets
-            time_list_slice = time_list[bucket_size * i:bucket_size * (i + 1)]
-
-            # variables for generating graphs only
-            gmin = numpy.amin(time_list_slice)
-            gmean = numpy.mean(time_list_slice)
-            gmedian = numpy.median(time_list_slice)
-            gmax = numpy.amax(time_list_slice)
-            gstd = numpy.std(time_list_slice)
-
-            writer.writerow([
-                bucket,
-                gmin,
-                gmedian,
-                gmean,
-                gmax,
-                gstd,
-                numpy.percentile(time_list_slice, 90),
-                numpy.percentile(time_list_slice, 95),
-                numpy.percentile(time_list_slice, 99)
-            ])
-
-            # update a dictionary with key as each bucket and values as stat
-            return_stat.update({i: (gmin, gmedian, gmax, gstd)})
-        return return_stat
+        writer.writerow(STAT_HEADER)
+        writer.writerows(
+            [bucket] + row for bucket, row in zip(buckets, rows))
+
+    # a dictionary with key as each bucket and values as min, median, max
+    # and std, for generating graphs only
+    return {
+        i: (row[0], row[1], row[3], row[4]) for i, row in enumerate(rows)
+    }
 
 
 def generate_stat_for_pulp_sync(index, time_list, stat_file_name):
@@ -1,6 +1,18 @@
 """Utility module to handle the shared ssh connection."""
+import atexit
+import codecs
+import io
 import json
 import logging
+import os
+import select
+import socket
+import sys
+import tarfile
+import threading
+import time
+import uuid
+from collections import OrderedDict, namedtuple
 from contextlib import contextmanager
 
 import paramiko
@@ -11,6 +23,48 @@ from robottelo.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Seconds between keepalive packets sent on pooled transports
+KEEPALIVE_INTERVAL = 30
+# Seconds a pooled connection may stay unused before it is closed
+MAX_IDLE_TIME = 300
+# Size of the chunks read from a channel when streaming a command output
+STREAM_CHUNK_SIZE = 65536
+# Seconds between checks for stderr output while waiting for a command
+POLL_INTERVAL = 1
+
+# Escape codes for colors displayed in the output
+_COLOR_REGEX = re.compile(r'\x1b\[\d\d?m')
+
+# Clock used to time the commands, monotonic when available (Python 3)
+_clock = getattr(time, 'monotonic', time.time)
+
+
+class CommandTiming(namedtuple(
+        'CommandTiming',
+        ('connect', 'execute', 'transfer', 'total', 'server'))):
+    """Durations, in seconds, of the phases of a command run by
+    :func:`timed_command`.
+
+    ``connect`` is the time spent getting a connection and opening a
+    channel, ``execute`` the time until the command exit status is received,
+    ``transfer`` the time reading its remaining output and ``total`` the
+    whole call, all measured on our side with a monotonic clock. ``server``
+    is the time the command took on the remote host according to its wall
+    clock, ``None`` if it was not collected.
+
+    """
+    __slots__ = ()
+
+    @property
+    def elapsed(self):
+        """The time the command took until its exit status was received.
+
+        It is always measured on our side, so it is not affected by the
+        remote clock being adjusted. See ``server`` for the remote figure.
+
+        """
+        return self.execute
+
 
 class SSHCommandResult(object):
     """Structure that returns in all ssh commands results."""
@@ -21,6 +75,8 @@ class SSHCommandResult(object):
         self.stderr = stderr
         self.return_code = return_code
         self.output_format = output_format
+        #: The :class:`CommandTiming` of the command, if it was timed
+        self.timing = None
         #  Does not make sense to return suspicious output if ($? <> 0)
         if output_format and self.return_code == 0:
             if output_format == 'csv':
@@ -40,6 +96,243 @@ def _call_paramiko_sshclient():
     return paramiko.SSHClient()
 
 
+def _get_connection_params(hostname=None, username=None, key_filename=None):
+    """Fill the missing connection parameters from the configuration.
+
+    :return: A tuple with the hostname, username and key filename.
+    :rtype: tuple
+
+    """
+    if hostname is None:
+        hostname = settings.server.hostname
+    if username is None:
+        username = settings.server.ssh_username
+    if key_filename is None:
+        key_filename = settings.server.ssh_key
+    return (hostname, username, key_filename)
+
+
+def _connect(hostname, username, key_filename, timeout=10):
+    """Create a new ``paramiko.SSHClient`` connected to ``hostname``."""
+    client = _call_paramiko_sshclient()
+    client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+    client.connect(
+        hostname=hostname,
+        username=username,
+        key_filename=key_filename,
+        timeout=timeout
+    )
+    return client
+
+
+class _PooledConnection(object):
+    """Bookkeeping for a single connection held by ``SSHConnectionPool``."""
+
+    def __init__(self, key, client):
+        self.key = key
+        self.client = client
+        self.discarded = False
+        self.last_used = time.time()
+        self.users = 0
+
+    def is_alive(self):
+        """Check whether the underlying transport is still usable."""
+        transport = self.client.get_transport()
+        return transport is not None and transport.is_active()
+
+
+class SSHConnectionPool(object):
+    """Thread-safe pool of persistent SSH connections.
+
+    One ``paramiko.SSHClient`` is kept per ``(hostname, username,
+    key_filename)`` and shared by all threads: every caller opens its own
+    channel on the pooled transport, which paramiko multiplexes over the same
+    TCP connection. Dead transports are transparently replaced and
+    connections unused for more than ``max_idle_time`` seconds are closed.
+
+    Connections are never shared across processes: if the pool is used after a
+    ``fork`` (e.g. ``py.test --boxed``) the inherited connections are dropped
+    without being closed so the parent process can keep using them.
+
+    """
+
+    def __init__(self, keepalive_interval=KEEPALIVE_INTERVAL,
+                 max_idle_time=MAX_IDLE_TIME):
+        self.keepalive_interval = keepalive_interval
+        self.max_idle_time = max_idle_time
+        # Maps connection parameters to the connection to be handed out
+        self._connections = {}
+        # Maps ``id(client)`` to every connection still in use, including the
+        # discarded ones which will be closed by their last user.
+        self._clients = {}
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+
+    def _check_pid(self):
+        """Forget the connections inherited from a parent process.
+
+        Must be called with ``self._lock`` acquired.
+
+        """
+        if self._pid != os.getpid():
+            self._connections = {}
+            self._clients = {}
+            self._pid = os.getpid()
+
+    def _discard(self, connection):
+        """Remove a connection from the pool, closing it if unused.
+
+        Must be called with ``self._lock`` acquired.
+
+        """
+        connection.discarded = True
+        if self._connections.get(connection.key) is connection:
+            del self._connections[connection.key]
+        if connection.users <= 0:
+            self._clients.pop(id(connection.client), None)
+            connection.client.close()
+
+    def _evict_idle(self):
+        """Close connections that have been idle for too long.
+
+        Must be called with ``self._lock`` acquired.
+
+        """
+        now = time.time()
+        for connection in list(self._connections.values()):
+            if (connection.users == 0 and
+                    now - connection.last_used > self.max_idle_time):
+                logger.info(
+                    'Closing idle pooled Paramiko client {0}'
+                    .format(hex(id(connection.client)))
+                )
+                self._discard(connection)
+
+    def acquire(self, hostname=None, username=None, key_filename=None,
+                timeout=10):
+        """Return a connected ``paramiko.SSHClient`` from the pool.
+
+        A new connection is established if there is none for the given
+        parameters or if the pooled one is not alive anymore. Every call must
+        be paired with a call to :meth:`release`.
+
+        """
+        key = _get_connection_params(hostname, username, key_filename)
+        with self._lock:
+            self._check_pid()
+            self._evict_idle()
+            connection = self._get_alive(key)
+            if connection is not None:
+                connection.users += 1
+                connection.last_used = time.time()
+                return connection.client
+
+        # Do the handshake without holding the lock so connecting to a slow
+        # host does not block the callers of other hosts.
+        client = _connect(*key, timeout=timeout)
+        transport = client.get_transport()
+        if transport is not None:
+            transport.set_keepalive(self.keepalive_interval)
+
+        with self._lock:
+            self._check_pid()
+            connection = self._get_alive(key)
+            if connection is None:
+                connection = _PooledConnection(key, client)
+                self._connections[key] = connection
+                self._clients[id(client)] = connection
+                logger.info(
+                    'Instantiated pooled Paramiko client {0}'
+                    .format(hex(id(client)))
+                )
+            else:
+                # Another thread connected in the meantime, use its client
+                client.close()
+            connection.users += 1
+            connection.last_used = time.time()
+            return connection.client
+
+    def _get_alive(self, key):
+        """Return the pooled connection for ``key`` if it is alive.
+
+        Dead connections are discarded. Must be called with ``self._lock``
+        acquired.
+
+        """
+        connection = self._connections.get(key)
+        if connection is not None and not connection.is_alive():
+            logger.info(
+                'Pooled Paramiko client {0} is not alive, reconnecting'
+                .format(hex(id(connection.client)))
+            )
+            self._discard(connection)
+            connection = None
+        return connection
+
+    def release(self, client, discard=False):
+        """Give back a client obtained through :meth:`acquire`.
+
+        :param client: The ``paramiko.SSHClient`` being released.
+        :param bool discard: Remove the client from the pool, it will be
+            closed as soon as no other caller is using it. Useful when the
+            connection is suspected to be broken.
+
+        """
+        with self._lock:
+            connection = self._clients.get(id(client))
+            if connection is None:
+                return
+            connection.users -= 1
+            connection.last_used = time.time()
+            if discard or connection.discarded:
+                self._discard(connection)
+
+    def close_all(self):
+        """Close all the pooled connections."""
+        with self._lock:
+            self._check_pid()
+            connections = list(self._clients.values())
+            self._connections = {}
+            self._clients = {}
+        for connection in connections:
+            connection.client.close()
+
+
+_connection_pool = SSHConnectionPool()
+atexit.register(_connection_pool.close_all)
+
+
+@contextmanager
+def _get_pooled_connection(hostname=None, timeout=10):
+    """Yield a pooled ssh connection object.
+
+    Works like :func:`_get_connection` but the connection is taken from (and
+    given back to) the module connection pool instead of being closed::
+
+        with _get_pooled_connection() as connection:
+            ...
+
+    If an ``paramiko.SSHException`` or ``socket.error`` is raised while the
+    connection is in use, it is discarded from the pool so the next caller
+    gets a fresh one.
+
+    """
+    client = _connection_pool.acquire(hostname=hostname, timeout=timeout)
+    discard = False
+    try:
+        yield client
+    except (paramiko.SSHException, socket.error):
+        discard = True
+        raise
+    finally:
+        _connection_pool.release(client, discard=discard)
+
+
+def close_connections():
+    """Close all the connections kept by the connection pool."""
+    _connection_pool.close_all()
+
+
 @contextmanager
 def _get_connection(
         hostname=None, username=None, key_filename=None, timeout=10):
@@ -69,21 +362,9 @@ def _get_connection(
     :rtype: paramiko.SSHClient
 
     """
-    if hostname is None:
-        hostname = settings.server.hostname
-    if username is None:
-        username = settings.server.ssh_username
-    if key_filename is None:
-        key_filename = settings.server.ssh_key
-
-    client = _call_paramiko_sshclient()
-    client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-    client.connect(
-        hostname=hostname,
-        username=username,
-        key_filename=key_filename,
-        timeout=timeout
-    )
+    hostname, username, key_filename = _get_connection_params(
+        hostname, username, key_filename)
+    client = _connect(hostname, username, key_filename, timeout)
 
     client_id = hex(id(client))
     try:
@@ -104,7 +385,7 @@ def upload_file(local_file, remote_file, hostname=None):
     :param hostname: target machine hostname. If not provided will be used the
         ``server.hostname`` from the configuration.
     """
-    with _get_connection(hostname=hostname) as connection:
+    with _get_pooled_connection(hostname=hostname) as connection:
         try:
             sftp = connection.open_sftp()
             # Check if local_file is a file-like object and use the proper
@@ -124,7 +405,7 @@ def download_file(remote_file, local_file=None, hostname=None):
     """
     if local_file is None:
         local_file = remote_file
-    with _get_connection(hostname=hostname) as connection:
+    with _get_pooled_connection(hostname=hostname) as connection:
         try:
             sftp = connection.open_sftp()
             sftp.get(remote_file, local_file)
@@ -132,39 +413,115 @@ def download_file(remote_file, local_file=None, hostname=None):
             sftp.close()
 
 
-def command(cmd, hostname=None, output_format=None, timeout=None):
-    """
-    Executes SSH command(s) on remote hostname.
-    Defaults to main.server.hostname.
-    """
-
-    # Set a default timeout of 120 seconds
-    if timeout is None:
-        timeout = 120
+def _read_channel(channel, timeout, timings=None):
+    """Read the whole output of the command running on ``channel``.
 
-    # Variable to hold results returned from the command
-    stdout = stderr = errorcode = None
+    stdout and stderr are read while the command runs, so it never blocks on
+    a full channel window, whatever the size of its output.
 
-    # Remove escape code for colors displayed in the output
-    regex = re.compile(r'\x1b\[\d\d?m')
+    :param int timeout: Seconds to wait for some output, or for the command
+        to end, before giving up with ``socket.timeout``. Wait forever if
+        ``None``.
+    :param dict timings: If given, it is updated with the ``execute`` and
+        ``transfer`` durations of the command, see :class:`CommandTiming`.
+    :return: A tuple with the exit status and the raw stdout and stderr
+        contents.
+    :rtype: tuple
 
-    hostname = hostname or settings.server.hostname
-
-    logger.debug('>>> [%s] %s', hostname, cmd)
+    """
+    channel.settimeout(timeout)
+    stdout = []
+    stderr = []
+    opened = last_read = _clock()
+    while True:
+        if channel.recv_stderr_ready():
+            stderr.append(channel.recv_stderr(STREAM_CHUNK_SIZE))
+            last_read = _clock()
+        elif channel.recv_ready():
+            stdout.append(channel.recv(STREAM_CHUNK_SIZE))
+            last_read = _clock()
+        elif channel.eof_received or channel.exit_status_ready():
+            break
+        # stderr alone does not wake select up, so poll it regularly
+        elif (not select.select([channel], [], [], POLL_INTERVAL)[0] and
+                timeout is not None and _clock() - last_read > timeout):
+            raise socket.timeout(
+                'No output received in {0} seconds'.format(timeout))
+    errorcode = channel.recv_exit_status()
+    exited = _clock()
+    # Remaining output, until the channel is closed
+    for recv, chunks in ((channel.recv, stdout),
+                         (channel.recv_stderr, stderr)):
+        chunk = recv(STREAM_CHUNK_SIZE)
+        while chunk:
+            chunks.append(chunk)
+            chunk = recv(STREAM_CHUNK_SIZE)
+    if timings is not None:
+        timings.update(execute=exited - opened, transfer=_clock() - exited)
+    return (errorcode, b''.join(stdout), b''.join(stderr))
+
+
+def _exec_command(cmd, hostname, timeout, timings=None):
+    """Execute ``cmd`` over a pooled connection to ``hostname``.
+
+    The command runs on its own channel opened on the pooled transport. If the
+    channel can not be opened because the pooled connection is broken, the
+    connection is discarded and the command is sent again over a new one.
+
+    :param int timeout: Seconds to wait for some output before giving up, see
+        :func:`_read_channel`.
+    :param dict timings: If given, it is updated with the ``connect``,
+        ``execute`` and ``transfer`` durations of the command, see
+        :class:`CommandTiming`.
+    :return: A tuple with the exit status and the raw stdout and stderr
+        contents.
+    :rtype: tuple
 
-    with _get_connection(hostname=hostname) as connection:
-        _, stdout, stderr = connection.exec_command(cmd, timeout)
-        errorcode = stdout.channel.recv_exit_status()
-        stdout = stdout.read()
-        stderr = stderr.read()
+    """
+    begin = _clock()
+    for retry in (True, False):
+        started = False
+        try:
+            with _get_pooled_connection(hostname=hostname) as connection:
+                channel = connection.get_transport().open_session()
+                try:
+                    channel.exec_command(cmd)
+                    started = True
+                    if timings is not None:
+                        timings.update(connect=_clock() - begin)
+                    return _read_channel(channel, timeout, timings)
+                finally:
+                    channel.close()
+        except (paramiko.SSHException, socket.error) as err:
+            if started or not retry:
+                raise
+            logger.info(
+                'Failed to open a channel to {0} ({1}), retrying with a new '
+                'connection'.format(hostname, err)
+            )
+
+
+def build_command_result(stdout, stderr, return_code, output_format=None):
+    """Build a ``SSHCommandResult`` from the raw output of a command.
+
+    The output is decoded, color codes are removed and, unless
+    ``output_format`` is ``json``, stdout is split in lines filtering out the
+    Rails traffic information.
+
+    :param bytes stdout: The raw contents of the command stdout.
+    :param bytes stderr: The raw contents of the command stderr.
+    :param int return_code: The command exit status.
+    :param str output_format: The hammer output format requested, if any.
+    :rtype: robottelo.ssh.SSHCommandResult
 
+    """
     if stdout:
         # Convert to unicode string
         stdout = stdout.decode('utf-8')
         logger.debug('<<< stdout\n%s', stdout)
     if stderr:
         # Convert to unicode string and remove all color codes characters
-        stderr = regex.sub('', stderr.decode('utf-8'))
+        stderr = _COLOR_REGEX.sub('', stderr.decode('utf-8'))
         logger.debug('<<< stderr\n%s', stderr)
 
     if stdout and output_format != 'json':
@@ -174,8 +531,350 @@ def command(cmd, hostname=None, output_format=None, timeout=None):
         stdout = stdout.replace('""', '')
         stdout = u''.join(stdout).split('\n')
         stdout = [
-            regex.sub('', line) for line in stdout if not line.startswith('[')
+            _COLOR_REGEX.sub('', line)
+            for line in stdout if not line.startswith('[')
         ]
 
     return SSHCommandResult(
-        stdout, stderr, errorcode, output_format)
+        stdout, stderr, return_code, output_format)
+
+
+class SSHCommandStream(object):
+    """The output of a command, streamed line by line as it arrives.
+
+    Iterating over the object runs the command and yields its stdout lines,
+    decoded and cleaned up like :func:`build_command_result` does, without
+    ever holding the whole output in memory. ``return_code`` and ``stderr``
+    are available once all the lines have been consumed::
+
+        with command_stream('hammer --output=csv host list') as result:
+            for row in hammer.iter_csv(result):
+                ...
+        if result.return_code != 0:
+            ...
+
+    Stopping the iteration early, or leaving the ``with`` block, closes the
+    channel and kills the command.
+
+    :param str cmd: The command to run.
+    :param str hostname: The host to run the command on.
+    :param int timeout: Seconds to wait for some output before giving up
+        with ``socket.timeout``. Wait forever if ``None``.
+
+    """
+
+    def __init__(self, cmd, hostname, timeout=None):
+        self.cmd = cmd
+        self.hostname = hostname
+        self.timeout = timeout
+        self.return_code = None
+        self.stderr = None
+        self._lines = self._read_lines()
+
+    def __iter__(self):
+        return self._lines
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Stop reading the output, killing the command if still running."""
+        self._lines.close()
+
+    def _read_chunks(self):
+        """Yield the raw chunks of stdout as they are received.
+
+        stderr is collected meanwhile, so the command does not block on a
+        full stderr window.
+
+        """
+        stderr = []
+        with _get_pooled_connection(hostname=self.hostname) as connection:
+            channel = connection.get_transport().open_session()
+            try:
+                channel.exec_command(self.cmd)
+                while True:
+                    if channel.recv_stderr_ready():
+                        stderr.append(channel.recv_stderr(STREAM_CHUNK_SIZE))
+                    elif channel.recv_ready() or channel.eof_received:
+                        chunk = channel.recv(STREAM_CHUNK_SIZE)
+                        if not chunk:
+                            break
+                        yield chunk
+                    elif not select.select(
+                            [channel], [], [], self.timeout)[0]:
+                        raise socket.timeout(
+                            'No output received from {0} in {1} seconds'
+                            .format(self.hostname, self.timeout)
+                        )
+                # Remaining stderr, until the channel is closed
+                chunk = channel.recv_stderr(STREAM_CHUNK_SIZE)
+                while chunk:
+                    stderr.append(chunk)
+                    chunk = channel.recv_stderr(STREAM_CHUNK_SIZE)
+                self.return_code = channel.recv_exit_status()
+            finally:
+                channel.close()
+        stderr = b''.join(stderr)
+        if stderr:
+            self.stderr = _COLOR_REGEX.sub('', stderr.decode('utf-8'))
+            logger.debug('<<< stderr\n%s', self.stderr)
+        else:
+            self.stderr = stderr
+
+    def _read_lines(self):
+        """Yield the cleaned up lines of stdout as they are received."""
+        decoder = codecs.getincrementaldecoder('utf-8')()
+        pending = u''
+        for chunk in self._read_chunks():
+            lines = (pending + decoder.decode(chunk)).split('\n')
+            pending = lines.pop()
+            for line in lines:
+                line = line.replace('""', '')
+                if not line.startswith('['):
+                    yield _COLOR_REGEX.sub('', line)
+        pending += decoder.decode(b'', final=True)
+        if pending:
+            pending = pending.replace('""', '')
+            if not pending.startswith('['):
+                yield _COLOR_REGEX.sub('', pending)
+
+
+def command_stream(cmd, hostname=None, timeout=None):
+    """Executes a SSH command on remote hostname, streaming its output.
+
+    Defaults to main.server.hostname. The command starts running only when
+    the returned object is iterated.
+
+    :rtype: robottelo.ssh.SSHCommandStream
+
+    """
+    hostname = hostname or settings.server.hostname
+    logger.debug('>>> [%s] %s', hostname, cmd)
+    return SSHCommandStream(cmd, hostname, timeout)
+
+
+def command(cmd, hostname=None, output_format=None, timeout=None):
+    """
+    Executes SSH command(s) on remote hostname.
+    Defaults to main.server.hostname.
+
+    :param int timeout: Seconds to wait for some output, or for the command
+        to end, before giving up with ``socket.timeout``. Wait forever if
+        ``None``.
+    """
+
+    hostname = hostname or settings.server.hostname
+
+    logger.debug('>>> [%s] %s', hostname, cmd)
+
+    errorcode, stdout, stderr = _exec_command(cmd, hostname, timeout)
+
+    return build_command_result(stdout, stderr, errorcode, output_format)
+
+
+def _pop_server_timing(stderr, marker):
+    """Remove the server timing written by :func:`timed_command` from
+    ``stderr``.
+
+    :return: A tuple with the rest of ``stderr`` and the number of seconds
+        the command took on the server, or ``None`` if it was not found.
+
+    """
+    head, found, tail = stderr.rpartition(b'\n' + marker + b' ')
+    if not found:
+        return (stderr, None)
+    line, _, rest = tail.partition(b'\n')
+    try:
+        data = json.loads(line.decode('utf-8'))
+        server = float(data['end']) - float(data['start'])
+    except (KeyError, TypeError, ValueError):
+        return (stderr, None)
+    return (head + rest, server)
+
+
+def timed_command(cmd, hostname=None, output_format=None, timeout=None,
+                  server_timing=False):
+    """Execute a command like :func:`command` does and time it.
+
+    The durations are measured on our side with a monotonic clock and split
+    into phases, see :class:`CommandTiming`.
+
+    :param bool server_timing: Also measure how long the command takes on the
+        remote host. The shell there writes the start and end times as a JSON
+        line to stderr, which is removed from the command stderr. The
+        command runs in a subshell and the remote host needs GNU ``date``.
+    :return: The ``SSHCommandResult`` of the command, with its ``timing``
+        attribute set.
+    :rtype: robottelo.ssh.SSHCommandResult
+
+    """
+    hostname = hostname or settings.server.hostname
+    if isinstance(cmd, bytes):
+        cmd = cmd.decode('utf-8')
+    marker = None
+    if server_timing:
+        marker = u'__robottelo_timing_{0}__'.format(uuid.uuid4().hex)
+        cmd = (
+            u'__start=$(date +%s.%N)\n(\n{0}\n)\n__status=$?\n'
+            u'printf \'\\n{1} {{"start": %s, "end": %s}}\\n\' '
+            u'"$__start" "$(date +%s.%N)" >&2\n'
+            u'exit $__status'.format(cmd, marker)
+        )
+
+    logger.debug('>>> [%s] %s', hostname, cmd)
+
+    timings = {}
+    begin = _clock()
+    errorcode, stdout, stderr = _exec_command(
+        cmd.encode('utf-8'), hostname, timeout, timings)
+    total = _clock() - begin
+
+    server = None
+    if marker is not None:
+        stderr, server = _pop_server_timing(stderr, marker.encode('utf-8'))
+    result = build_command_result(stdout, stderr, errorcode, output_format)
+    result.timing = CommandTiming(
+        timings['connect'], timings['execute'], timings['transfer'], total,
+        server,
+    )
+    return result
+
+
+def _split_frames(data, marker, count):
+    """Split the output of a script run by :func:`command_many`.
+
+    :param bytes data: The script stdout or stderr.
+    :param bytes marker: The line prefix written after each command.
+    :param int count: The number of commands in the script.
+    :return: A tuple with the list of the commands outputs and the list of
+        the trailing values written after the marker of every command.
+
+    """
+    parts = data.split(b'\n' + marker)
+    outputs = [parts[0]]
+    trailers = []
+    for part in parts[1:]:
+        trailer, _, output = part.partition(b'\n')
+        trailers.append(trailer.strip())
+        outputs.append(output)
+    # Once all the commands are done, nothing is left after the last marker
+    if len(outputs) > count:
+        outputs.pop()
+    return (outputs, trailers)
+
+
+def command_many(cmds, hostname=None, timeout=None, stop_on_error=False):
+    """Executes several commands on remote hostname in a single round trip.
+
+    The commands are sent as one shell script over one channel and run one
+    after the other, whatever their exit status unless ``stop_on_error`` is
+    set. A marker line is written to stdout and stderr after every command,
+    along with its exit status, so the output of each command can be told
+    apart.
+
+    :param cmds: A list of ``(command, output_format)`` tuples. The output
+        format is used to parse the command output, like the
+        ``output_format`` parameter of :func:`command` does.
+    :param str hostname: The host to run the commands on. Defaults to
+        ``server.hostname`` from the configuration.
+    :param int timeout: Seconds to wait for some output before giving up,
+        like for :func:`command`.
+    :param bool stop_on_error: Do not run the commands following a command
+        which failed.
+    :return: A list of ``SSHCommandResult``, one for each command, in order.
+        Commands that were not run because the script was interrupted get
+        the script exit status and empty output.
+
+    """
+    hostname = hostname or settings.server.hostname
+    marker = u'__robottelo_batch_{0}__'.format(uuid.uuid4().hex)
+
+    script = []
+    for cmd, _ in cmds:
+        if isinstance(cmd, bytes):
+            cmd = cmd.decode('utf-8')
+        script.append(cmd)
+        script.append(u'__status=$?')
+        script.append(
+            u"printf '\\n{0} %d\\n' \"$__status\"".format(marker))
+        script.append(u"printf '\\n{0}\\n' >&2".format(marker))
+        if stop_on_error:
+            script.append(u'[ "$__status" -eq 0 ] || exit "$__status"')
+    script = u'\n'.join(script)
+
+    logger.debug('>>> [%s] %s', hostname, script)
+
+    errorcode, stdout, stderr = _exec_command(
+        script.encode('utf-8'), hostname, timeout)
+
+    marker = marker.encode('utf-8')
+    stdouts, return_codes = _split_frames(stdout, marker, len(cmds))
+    stderrs, _ = _split_frames(stderr, marker, len(cmds))
+
+    results = []
+    for index, (_, output_format) in enumerate(cmds):
+        if index < len(return_codes):
+            return_code = int(return_codes[index])
+        else:
+            return_code = errorcode or -1
+        results.append(build_command_result(
+            stdouts[index] if index < len(stdouts) else b'',
+            stderrs[index] if index < len(stderrs) else b'',
+            return_code,
+            output_format,
+        ))
+    return results
+
+
+def read_files(paths, hostname=None, timeout=None):
+    """Read remote files into memory in a single round trip.
+
+    The files are packed by ``tar`` on the remote host as one compressed
+    stream, read over a single channel and unpacked in memory, so no
+    temporary file is written on either side::
+
+        for path, content in ssh.read_files([u'${HOME}/data/*.csv']).items():
+            ...
+
+    :param paths: A list of remote paths. They are expanded by the remote
+        shell, so they may contain variables and glob patterns but must be
+        quoted by the caller if they contain special characters.
+    :param str hostname: The host to read the files from. Defaults to
+        ``server.hostname`` from the configuration.
+    :param int timeout: Seconds to wait for some output before giving up,
+        like for :func:`command`.
+    :return: An ``OrderedDict`` mapping the path of each file read to its
+        contents as bytes, sorted like ``ls -v`` sorts them. Paths matching
+        no file are left out.
+    :raises IOError: If the files could not be packed.
+
+    """
+    hostname = hostname or settings.server.hostname
+    cmd = (
+        u'ls -dv -- {0} 2>/dev/null | '
+        u'tar -czPf - --no-recursion -T -'.format(u' '.join(paths))
+    )
+
+    logger.debug('>>> [%s] %s', hostname, cmd)
+
+    errorcode, stdout, stderr = _exec_command(
+        cmd.encode('utf-8'), hostname, timeout)
+    if errorcode != 0:
+        raise IOError(u'Failed to read {0}: {1}'.format(
+            u' '.join(paths), stderr.decode('utf-8', 'replace')))
+
+    result = OrderedDict()
+    with tarfile.open(fileobj=io.BytesIO(stdout), mode='r:gz') as archive:
+        for member in archive:
+            if member.isfile():
+                result[member.name] = archive.extractfile(member).read()
+    return result
+
+
+if sys.version_info >= (3, 5):
+    # The asyncio engine needs the async/await syntax
+    from robottelo.ssh_async import acommand, afanout  # noqa pylint:disable=C0413
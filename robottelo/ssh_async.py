@@ -0,0 +1,213 @@
+"""Asyncio based engine to run commands on remote hosts.
+
+This module requires Python 3.5 or later: it uses the ``async``/``await``
+syntax, so older interpreters can not even parse it. Its public functions are
+available from :mod:`robottelo.ssh` when it can be used::
+
+    results = loop.run_until_complete(
+        ssh.afanout('subscription-manager identity', hosts))
+
+Commands run on channels opened on the connections of the
+:mod:`robottelo.ssh` pool. Instead of blocking a thread per command, the
+channels are watched by the event loop, so a single thread can keep hundreds
+of commands in flight across many hosts. The number of concurrent commands on
+each host is bounded: OpenSSH refuses more than ``MaxSessions`` (10 by
+default) channels on a single connection.
+
+Only connecting to a host and opening a channel, which wait for the server to
+answer, are done on the event loop executor.
+
+"""
+import asyncio
+import functools
+import logging
+import socket
+import weakref
+
+import paramiko
+
+import robottelo.ssh
+from robottelo.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Maximum number of commands running at the same time on a host
+MAX_COMMANDS_PER_HOST = 10
+
+# Per host semaphores, for every event loop
+_semaphores = weakref.WeakKeyDictionary()
+
+
+def _get_semaphore(loop, hostname):
+    """Return the semaphore bounding the commands run on ``hostname``."""
+    semaphores = _semaphores.setdefault(loop, {})
+    if hostname not in semaphores:
+        semaphores[hostname] = asyncio.Semaphore(MAX_COMMANDS_PER_HOST)
+    return semaphores[hostname]
+
+
+def _open_channel(client, cmd):
+    """Open a channel on ``client`` and start running ``cmd`` on it."""
+    channel = client.get_transport().open_session()
+    try:
+        channel.exec_command(cmd)
+    except Exception:
+        channel.close()
+        raise
+    return channel
+
+
+def _wait_channel(channel, loop):
+    """Collect the output of ``channel`` until it is closed.
+
+    The channel file descriptor becomes readable whenever data is received on
+    stdout or stderr, or when the channel is closed.
+
+    :return: A future resolving to a tuple with the raw stdout and stderr
+        contents.
+
+    """
+    future = loop.create_future()
+    stdout = []
+    stderr = []
+    fileno = channel.fileno()
+
+    def on_readable():
+        """Read everything available and check whether the command ended."""
+        try:
+            while channel.recv_stderr_ready():
+                stderr.append(channel.recv_stderr(65536))
+            while channel.recv_ready():
+                stdout.append(channel.recv(65536))
+            done = channel.closed or (
+                channel.eof_received and channel.exit_status_ready() and
+                not channel.recv_ready() and
+                not channel.recv_stderr_ready()
+            )
+        except Exception as err:  # pylint:disable=broad-except
+            loop.remove_reader(fileno)
+            if not future.done():
+                future.set_exception(err)
+            return
+        if done:
+            loop.remove_reader(fileno)
+            if not future.done():
+                future.set_result((b''.join(stdout), b''.join(stderr)))
+
+    loop.add_reader(fileno, on_readable)
+    # Data may have been received before the reader was added
+    loop.call_soon(on_readable)
+    return future
+
+
+def _start(pool, hostname, cmd):
+    """Get a pooled client for ``hostname`` and start ``cmd`` on it.
+
+    Both steps wait for the server, so they are run together on the event
+    loop executor.
+
+    :return: A tuple with the client and the channel running ``cmd``.
+
+    """
+    client = pool.acquire(hostname=hostname)
+    try:
+        return (client, _open_channel(client, cmd))
+    except (paramiko.SSHException, socket.error):
+        pool.release(client, discard=True)
+        raise
+    except Exception:
+        pool.release(client)
+        raise
+
+
+def _abandon(pool, started):
+    """Close the channel and release the client of a command whose caller
+    is gone, once the executor is done starting it.
+
+    """
+    if started.cancelled() or started.exception() is not None:
+        return
+    client, channel = started.result()
+    channel.close()
+    pool.release(client)
+
+
+async def _run(cmd, hostname, loop):
+    """Run ``cmd`` on ``hostname`` and return its exit status and output."""
+    pool = robottelo.ssh._connection_pool  # pylint:disable=protected-access
+    started = loop.run_in_executor(None, _start, pool, hostname, cmd)
+    try:
+        # The executor can not be interrupted, clean up once it is done
+        client, channel = await asyncio.shield(started)
+    except asyncio.CancelledError:
+        started.add_done_callback(functools.partial(_abandon, pool))
+        raise
+    discard = False
+    try:
+        stdout, stderr = await _wait_channel(channel, loop)
+        return (channel.recv_exit_status(), stdout, stderr)
+    except (paramiko.SSHException, socket.error):
+        discard = True
+        raise
+    finally:
+        # The reader is still there if the command has been cancelled
+        loop.remove_reader(channel.fileno())
+        channel.close()
+        pool.release(client, discard=discard)
+
+
+async def acommand(cmd, hostname=None, output_format=None, timeout=None):
+    """Execute a command on a remote host without blocking the event loop.
+
+    Work like :func:`robottelo.ssh.command`, but is a coroutine. At most
+    ``MAX_COMMANDS_PER_HOST`` commands run at the same time on a host, the
+    others wait for their turn.
+
+    :param str cmd: The command to run.
+    :param str hostname: The host to run the command on. Defaults to
+        ``server.hostname`` from the configuration.
+    :param str output_format: The hammer output format, used to parse the
+        command output.
+    :param int timeout: Seconds to wait for the command to finish, including
+        the time spent waiting for its turn. Wait forever if ``None``.
+    :rtype: robottelo.ssh.SSHCommandResult
+    :raises asyncio.TimeoutError: If the command does not finish in time.
+
+    """
+    loop = asyncio.get_event_loop()
+    hostname = hostname or settings.server.hostname
+    if isinstance(cmd, bytes):
+        cmd = cmd.decode('utf-8')
+
+    async def run():
+        """Run the command when the host has a free slot."""
+        async with _get_semaphore(loop, hostname):
+            logger.debug('>>> [%s] %s', hostname, cmd)
+            return await _run(cmd, hostname, loop)
+
+    return_code, stdout, stderr = await asyncio.wait_for(run(), timeout)
+    return robottelo.ssh.build_command_result(
+        stdout, stderr, return_code, output_format)
+
+
+async def afanout(cmd, hosts, output_format=None, timeout=None):
+    """Execute the same command on several hosts at once.
+
+    :param str cmd: The command to run.
+    :param hosts: The hostnames to run the command on.
+    :param str output_format: The hammer output format, used to parse the
+        commands output.
+    :param int timeout: Seconds to wait for the command to finish on each
+        host.
+    :return: A dictionary mapping every host to its
+        ``robottelo.ssh.SSHCommandResult``, or to the exception raised while
+        running the command on it.
+    :rtype: dict
+
+    """
+    hosts = list(hosts)
+    results = await asyncio.gather(
+        *[acommand(cmd, host, output_format, timeout) for host in hosts],
+        return_exceptions=True
+    )
+    return dict(zip(hosts, results))
@@ -16,21 +16,22 @@ from robottelo.cli.base import CLIReturnCodeError
 from robottelo.cli.org import Org as OrgCli
 from robottelo.cli.subscription import Subscription
 from robottelo.config import settings
+from robottelo.performance.candlepin import Candlepin
 from robottelo.performance.constants import(
     DEFAULT_ORG,
     NUM_THREADS,
 )
+from robottelo.performance.driver import LoadDriver, OpenLoopDriver
+from robottelo.performance.histogram import LatencyHistogram
 from robottelo.performance.graph import(
     generate_bar_chart_stat,
     generate_line_chart_raw_candlepin,
     generate_line_chart_stat_bucketized_candlepin,
 )
-from robottelo.performance.stat import generate_stat_for_concurrent_thread
-from robottelo.performance.thread import (
-    DeleteThread,
-    SyncThread,
-    SubscribeAKThread,
-    SubscribeAttachThread
+from robottelo.performance.pulp import Pulp
+from robottelo.performance.stat import (
+    generate_stat_for_concurrent_thread,
+    generate_stat_for_histogram,
 )
 from robottelo.ui.browser import browser, DockerBrowser
 from robottelo.ui.activationkey import ActivationKey
@@ -244,7 +245,13 @@ class ConcurrentTestCase(TestCase):
     2. concurrent subscription by register and attach,
     3. concurrent subscription deletion.
 
+    The clients of a test case run concurrently on a
+    :class:`robottelo.performance.driver.LoadDriver`, their starts being
+    spread over ``ramp_up`` seconds.
+
     """
+    #: Seconds over which the clients starts are spread
+    ramp_up = 0
 
     @classmethod
     def setUpClass(cls):
@@ -369,11 +376,11 @@ class ConcurrentTestCase(TestCase):
            1000 iterations concurrently;
 
         """
-        self.num_iterations = total_iterations / current_num_threads
+        self.num_iterations = total_iterations // current_num_threads
 
     def _set_bucket_size(self):
         """Set size for each bucket"""
-        bucket = self.num_iterations / self.num_buckets
+        bucket = self.num_iterations // self.num_buckets
 
         # check if num_iterations for each client is smaller than 10
         if bucket > 0:
@@ -381,10 +388,16 @@ class ConcurrentTestCase(TestCase):
         else:
             self.bucket_size = 1
 
-    def _join_all_threads(self, thread_list):
-        """Wait for all threads to complete"""
-        for thread in thread_list:
-            thread.join()
+    @staticmethod
+    def _results_dict(results):
+        """Map the per-client results of a load driver run to ``thread-<i>``
+        keys, like the raw and stat writers expect them.
+
+        """
+        return dict(
+            ('thread-{0}'.format(i), timings)
+            for i, timings in enumerate(results)
+        )
 
     def _get_output_filename(self, file_name):
         """Get type of test: ak/att/del/reg as output file name
@@ -541,7 +554,6 @@ class ConcurrentTestCase(TestCase):
                 time_list,
                 stat_file_name,
                 self.bucket_size,
-                self.num_buckets
             )
 
             # create line chart with each client being grouped by buckets
@@ -553,7 +565,7 @@ class ConcurrentTestCase(TestCase):
                 '{0}-client-{1}-bucketized-{2}-clients.svg'
                 .format(test_category, i, current_num_threads),
                 self.bucket_size,
-                self.num_buckets
+                len(time_list),
             )
 
     def _write_stat_per_test_bucketized(
@@ -599,7 +611,6 @@ class ConcurrentTestCase(TestCase):
                 chunks_bucket_i,
                 stat_file_name,
                 len(chunks_bucket_i),
-                1
             )
 
             # for each chunk i, add stat into final return_dict
@@ -614,7 +625,6 @@ class ConcurrentTestCase(TestCase):
             '{0}-test-bucketized-{1}-clients.svg'
             .format(test_category, current_num_threads),
             self.bucket_size,
-            self.num_buckets
         )
 
     def _write_stat_per_client(
@@ -643,7 +653,6 @@ class ConcurrentTestCase(TestCase):
                 time_list,
                 stat_file_name,
                 len(time_list),
-                1
             )
 
             # for each chunk i, add stat into final return_dict
@@ -679,7 +688,6 @@ class ConcurrentTestCase(TestCase):
             full_list,
             stat_file_name,
             len(full_list),
-            1
         )
 
         generate_bar_chart_stat(
@@ -692,6 +700,70 @@ class ConcurrentTestCase(TestCase):
             'test'
         )
 
+    def _write_stat_histogram_csv_chart(
+            self,
+            stat_file_name,
+            histograms,
+            test_case_name):
+        """Write stat of the histograms of a long run and generate charts
+
+        Long runs record the timings of each client into a histogram instead
+        of keeping them, see :mod:`robottelo.performance.histogram`, so only
+        the stat per client and per test can be computed. For example::
+
+            Input: # of clients = 10
+            [histogram of client-0, ..., histogram of client-9]
+            Output:
+            stat of each client, then stat of the merged histograms;
+            bar charts of statistics per client and per test.
+
+        :param str stat_file_name: The name of output csv file
+        :param list histograms: The histogram of each client, as returned
+            by ``LoadDriver(..., histogram=True).run()``
+        :param str test_case_name: The name of the test case, written
+            before the stat
+
+        """
+        current_num_threads = len(histograms)
+        test_category = self._get_output_filename(stat_file_name)
+        with open(stat_file_name, 'a') as handler:
+            writer = csv.writer(handler)
+            writer.writerow([test_case_name])
+
+        # stat-per-client, computed from each client histogram
+        stat_dict = {}
+        for i, histogram in enumerate(histograms):
+            stat_dict[i] = generate_stat_for_histogram(
+                'client-{0}'.format(i), histogram, stat_file_name)
+        generate_bar_chart_stat(
+            stat_dict,
+            'Concurrent Subscription Statistics - per client: '
+            '({0}-{1}-clients)'
+            .format(test_category, current_num_threads),
+            '{0}-per-client-{1}-clients.svg'
+            .format(test_category, current_num_threads),
+            'client'
+        )
+
+        # stat-per-test, computed from the merged histograms
+        stat = generate_stat_for_histogram(
+            'test-{0}'.format(current_num_threads),
+            LatencyHistogram.merged(histograms),
+            stat_file_name
+        )
+        generate_bar_chart_stat(
+            {0: stat},
+            'Concurrent Subscription Statistics - per test: '
+            '({0}-{1}-clients)'
+            .format(test_category, current_num_threads),
+            '{0}-per-test-{1}-clients.svg'
+            .format(test_category, current_num_threads),
+            'test'
+        )
+        with open(stat_file_name, 'a') as handler:
+            writer = csv.writer(handler)
+            writer.writerow([])
+
     def kick_off_ak_test(self, current_num_threads, total_iterations):
         """Refactor out concurrent register by ak test case
 
@@ -707,29 +779,21 @@ class ConcurrentTestCase(TestCase):
         self._set_num_iterations(total_iterations, current_num_threads)
         self._set_bucket_size()
 
-        # Create a list to store all threads
-        thread_list = []
-        # Create a dictionary to store all timing results from each client
-        time_result_dict_ak = {}
-
-        # Create new threads and start each thread mapped with a vm
-        for i in range(current_num_threads):
-            thread_name = 'thread-{0}'.format(i)
-            time_result_dict_ak[thread_name] = []
-            thread = SubscribeAKThread(
-                i,
-                thread_name,
-                time_result_dict_ak,
-                self.num_iterations,
-                self.ak_name,
-                self.default_org,
-                current_vm_list[i]
-            )
-            thread.start()
-            thread_list.append(thread)
-
-        # wait all threads in thread list
-        self._join_all_threads(thread_list)
+        def register(vm_ip, iteration):
+            """Register ``vm_ip`` with the activation key"""
+            self.logger.debug(
+                'register with ak {0} on {1} attempt {2}'
+                .format(self.ak_name, vm_ip, iteration))
+            return Candlepin.single_register_activation_key(
+                self.ak_name, self.default_org, vm_ip)
+
+        # Run the registrations concurrently, one client per vm
+        time_result_dict_ak = self._results_dict(LoadDriver(
+            register,
+            current_vm_list,
+            iterations=self.num_iterations,
+            ramp_up=self.ramp_up,
+        ).run())
 
         # write raw result of activation-key
         self._write_raw_csv_file(
@@ -747,6 +811,125 @@ class ConcurrentTestCase(TestCase):
             'stat-ak-{0}-clients'.format(current_num_threads)
         )
 
+    def kick_off_ak_soak_test(self, current_num_threads, duration):
+        """Register by activation key for a long duration
+
+        Unlike :meth:`kick_off_ak_test`, each client registers over and
+        over until ``duration`` is elapsed and the timings are recorded
+        into a histogram per client instead of being kept, so only their
+        stat is written.
+
+        :param int current_num_threads: number of clients
+        :param float duration: number of seconds registrations are run
+
+        """
+        # check if number of threads are mapped with number of vms
+        current_vm_list = self.vm_list[:current_num_threads]
+        self.assertEqual(len(current_vm_list), current_num_threads)
+
+        def register(vm_ip, iteration):
+            """Register ``vm_ip`` with the activation key"""
+            self.logger.debug(
+                'register with ak {0} on {1} attempt {2}'
+                .format(self.ak_name, vm_ip, iteration))
+            return Candlepin.single_register_activation_key(
+                self.ak_name, self.default_org, vm_ip)
+
+        # Run the registrations concurrently, one histogram per vm
+        histograms = LoadDriver(
+            register,
+            current_vm_list,
+            duration=duration,
+            ramp_up=self.ramp_up,
+            histogram=True,
+        ).run()
+        self.logger.info(
+            '{0} registrations in {1}s'
+            .format(sum(len(histogram) for histogram in histograms),
+                    duration))
+
+        # write stat result of ak and generate charts
+        self._write_stat_histogram_csv_chart(
+            self.stat_file_name,
+            histograms,
+            'stat-soak-ak-{0}-clients'.format(current_num_threads)
+        )
+
+    def kick_off_ak_open_loop_test(
+            self, current_num_threads, rate, duration, arrival='constant'):
+        """Register by activation key at a target arrival rate
+
+        Unlike :meth:`kick_off_ak_test`, registrations are scheduled at
+        ``rate`` per second whatever their completions, each one being run
+        by the first free client, and their latency is measured from the
+        time they were scheduled at. Registrations which had to wait for a
+        free client are counted as missed.
+
+        :param int current_num_threads: number of clients
+        :param float rate: number of registrations per second
+        :param float duration: number of seconds registrations are scheduled
+        :param str arrival: ``constant`` or ``poisson`` arrivals
+        :return: The samples of the registrations, see
+            :class:`robottelo.performance.driver.Sample`
+
+        """
+        # check if number of threads are mapped with number of vms
+        current_vm_list = self.vm_list[:current_num_threads]
+        self.assertEqual(len(current_vm_list), current_num_threads)
+
+        # Parameter for statistics files
+        self._set_num_iterations(int(rate * duration), current_num_threads)
+        self._set_bucket_size()
+
+        def register(vm_ip, number):
+            """Register ``vm_ip`` with the activation key"""
+            self.logger.debug(
+                'register with ak {0} on {1} request {2}'
+                .format(self.ak_name, vm_ip, number))
+            return Candlepin.single_register_activation_key(
+                self.ak_name, self.default_org, vm_ip)
+
+        driver = OpenLoopDriver(
+            register,
+            current_vm_list,
+            rate,
+            duration=duration,
+            arrival=arrival,
+        )
+        samples = driver.run()
+        self.logger.info(
+            '{0} registrations at {1}/s, {2} missed their schedule'
+            .format(len(samples), rate, driver.missed))
+
+        # latencies of each client, measured from the scheduled times
+        time_result_dict_ak = self._results_dict([
+            [sample.latency for sample in samples if sample.client == i]
+            for i in range(current_num_threads)
+        ])
+        test_case_name = 'open-loop-ak-{0}-per-second-{1}-clients'.format(
+            rate, current_num_threads)
+
+        # write raw result of activation-key
+        self._write_raw_csv_file(
+            self.raw_file_name,
+            time_result_dict_ak,
+            current_num_threads,
+            'raw-{0}'.format(test_case_name)
+        )
+        with open(self.raw_file_name, 'a') as handler:
+            writer = csv.writer(handler)
+            writer.writerow(['missed-schedules', driver.missed])
+            writer.writerow([])
+
+        # write stat result of ak and generate charts
+        self._write_stat_csv_chart(
+            self.stat_file_name,
+            time_result_dict_ak,
+            current_num_threads,
+            'stat-{0}'.format(test_case_name)
+        )
+        return samples
+
     def kick_off_att_test(self, current_num_threads, total_iterations):
         """Refactor out concurrent register and attach test case
 
@@ -762,36 +945,26 @@ class ConcurrentTestCase(TestCase):
         self._set_num_iterations(total_iterations, current_num_threads)
         self._set_bucket_size()
 
-        # Create a list to store all threads
-        thread_list = []
-        # Create a dictionary to store register timings from each client
-        time_result_dict_register = {}
-        # Create a dictionary to store attach timings from each client
-        time_result_dict_attach = {}
-
-        # Create new threads and start each thread mapped with a vm
-        for i in range(current_num_threads):
-            thread_name = 'thread-{0}'.format(i)
-            time_result_dict_register[thread_name] = []
-            time_result_dict_attach[thread_name] = []
-
-            thread = SubscribeAttachThread(
-                i,
-                thread_name,
-                {},
-                time_result_dict_register,
-                time_result_dict_attach,
-                self.num_iterations,
-                self.sub_id,
-                self.default_org,
-                self.environment,
-                current_vm_list[i]
-            )
-            thread.start()
-            thread_list.append(thread)
-
-        # wait all threads in thread list
-        self._join_all_threads(thread_list)
+        def register_attach(vm_ip, iteration):
+            """Register ``vm_ip`` and attach the subscription"""
+            self.logger.debug(
+                'register with subscription {0} on vm {1} attempt {2}'
+                .format(self.sub_id, vm_ip, iteration))
+            return Candlepin.single_register_attach(
+                self.sub_id, self.default_org, self.environment, vm_ip)
+
+        # Run the registrations concurrently, one client per vm
+        results = LoadDriver(
+            register_attach,
+            current_vm_list,
+            iterations=self.num_iterations,
+            ramp_up=self.ramp_up,
+        ).run()
+        # Split the timings of the register and attach steps
+        time_result_dict_register = self._results_dict(
+            [[timings[0] for timings in client] for client in results])
+        time_result_dict_attach = self._results_dict(
+            [[timings[1] for timings in client] for client in results])
 
         # write raw result of register
         self._write_raw_csv_file(
@@ -842,27 +1015,28 @@ class ConcurrentTestCase(TestCase):
         self._set_num_iterations(total_iterations, current_num_threads)
         self._set_bucket_size()
 
-        # Create a list to store all threads
-        thread_list = []
-        # Create a dictionary to store all timing results from each thread
-        time_result_dict_del = {}
-
-        # Create new threads and start the thread which has sublist of uuids
-        for i in range(current_num_threads):
-            time_result_dict_del['thread-{0}'.format(i)] = []
-            thread = DeleteThread(
-                i,
-                'thread-{0}'.format(i),
-                uuid_list[
+        def delete(sublist, iteration):
+            """Delete the system of the iteration from ``sublist``"""
+            thread_id, uuids = sublist
+            if iteration >= len(uuids) or uuids[iteration] == '':
+                return None
+            self.logger.debug(
+                'deletion attempt # {0} in thread {1}-uuid: {2}'
+                .format(iteration, thread_id, uuids[iteration]))
+            return Candlepin.single_delete(uuids[iteration], thread_id)
+
+        # Run the deletions concurrently, each client with a sublist of uuids
+        time_result_dict_del = self._results_dict(LoadDriver(
+            delete,
+            [
+                (i, uuid_list[
                     self.num_iterations * i: self.num_iterations * (i + 1)
-                ],
-                time_result_dict_del
-            )
-            thread.start()
-            thread_list.append(thread)
-
-        # wait all threads in thread list
-        self._join_all_threads(thread_list)
+                ])
+                for i in range(current_num_threads)
+            ],
+            iterations=self.num_iterations,
+            ramp_up=self.ramp_up,
+        ).run())
 
         # write raw result of del
         self._write_raw_csv_file(
@@ -903,48 +1077,45 @@ class ConcurrentTestCase(TestCase):
             .format(repo_names_list)
         )
 
-        # Create a list to store all threads
-        thread_list = []
+        def synchronize(repository, _):
+            """Synchronize ``repository``, a ``(tid, id, name)`` tuple"""
+            tid, repo_id, repo_name = repository
+            self.logger.debug('synchronize repository {0}'.format(repo_name))
+            return Pulp.repository_single_sync(repo_id, repo_name, tid)
+
         # Create a dictionary to store all timing results from each thread
         time_result_dict = {}
         for thread_id in range(current_num_threads):
             time_result_dict['thread-{0}'.format(thread_id)] = []
 
+        repositories = []
+        for tid in range(current_num_threads):
+            repo_name = repo_names_list[tid]
+            repo_id = self.map_repo_name_id.get(repo_name, None)
+            if repo_id is None:
+                self.logger.warning('Invalid repository name!')
+                continue
+            repositories.append((tid, repo_id, repo_name))
+
         # sync all specified repositories and repeate X times
         for iteration in range(self.sync_iterations):
-            # for each thread, sync a single repository
-            for tid in range(current_num_threads):
-                repo_name = repo_names_list[tid]
-                repo_id = self.map_repo_name_id.get(repo_name, None)
-
-                if repo_id is None:
-                    self.logger.warning('Invalid repository name!')
-                    continue
-
-                self.logger.debug(
-                    '{0} repository {1} attempt {2} '
-                    'on {3}-repo test case starts:'
-                    .format(
-                        'Initially sync' if is_initial_sync else 'Resync',
-                        repo_name,
-                        iteration,
-                        current_num_threads
-                    )
-                )
-
-                thread = SyncThread(
-                    tid,
-                    "thread-{0}".format(tid),
-                    time_result_dict,
-                    repo_id,
-                    repo_name,
+            self.logger.debug(
+                '{0} repositories {1} attempt {2} '
+                'on {3}-repo test case starts:'
+                .format(
+                    'Initially sync' if is_initial_sync else 'Resync',
+                    [repository[2] for repository in repositories],
                     iteration,
+                    current_num_threads
                 )
-                thread.start()
-                thread_list.append(thread)
+            )
 
-            # wait all threads in thread list
-            self._join_all_threads(thread_list)
+            # sync every repository concurrently, each on its own client
+            results = LoadDriver(
+                synchronize, repositories, iterations=1).run()
+            for repository, timings in zip(repositories, results):
+                time_result_dict['thread-{0}'.format(repository[0])].extend(
+                    timings)
 
             # Once all threads have completed syncs,
             # reset database before next iteration, if initial sync test
@@ -0,0 +1,186 @@
+#!/usr/bin/env python
+"""Benchmark ``robottelo.manifests.ManifestCloner.clone``.
+
+Compare the current cloner with the previous implementation, kept below, on a
+generated manifest shaped like a Red Hat manifest with many subscriptions:
+entitlements, entitlement certificates, products and rules. Both cloners must
+produce manifests with the same members. Run it from any directory, robottelo
+is imported from the repository the script belongs to::
+
+    python scripts/benchmark_manifest_clone.py
+
+"""
+from __future__ import print_function
+import base64
+import json
+import os
+import random
+import six
+import sys
+import textwrap
+import timeit
+import uuid
+import zipfile
+
+from Crypto.Hash import SHA256
+from Crypto.PublicKey import RSA
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+from robottelo.manifests import ManifestCloner  # noqa pylint:disable=wrong-import-position
+
+ENTITLEMENTS = 150
+PRODUCTS = 60
+REPEAT = 3
+NUMBER = 10
+
+
+def legacy_clone(cloner):
+    """The cloning replaced by the current ``ManifestCloner.clone``."""
+    template_zip = zipfile.ZipFile(six.BytesIO(cloner.template))
+    # Extract the consumer_export.zip from the template manifest.
+    consumer_export_zip = zipfile.ZipFile(
+        six.BytesIO(template_zip.read('consumer_export.zip')))
+
+    # Generate a new consumer_export.zip file changing the consumer
+    # uuid.
+    consumer_export = six.BytesIO()
+    with zipfile.ZipFile(consumer_export, 'w') as new_consumer_export_zip:
+        for name in consumer_export_zip.namelist():
+            if name == 'export/consumer.json':
+                consumer_data = json.loads(
+                    consumer_export_zip.read(name).decode('utf-8'))
+                consumer_data['uuid'] = six.text_type(uuid.uuid1())
+                new_consumer_export_zip.writestr(
+                    name,
+                    json.dumps(consumer_data)
+                )
+            else:
+                new_consumer_export_zip.writestr(
+                    name,
+                    consumer_export_zip.read(name)
+                )
+
+    # Generate a new manifest.zip file with the generated
+    # consumer_export.zip and new signature.
+    manifest = six.BytesIO()
+    with zipfile.ZipFile(
+            manifest, 'w', zipfile.ZIP_DEFLATED) as manifest_zip:
+        consumer_export.seek(0)
+        manifest_zip.writestr(
+            'consumer_export.zip',
+            consumer_export.read()
+        )
+        consumer_export.seek(0)
+        manifest_zip.writestr(
+            'signature',
+            cloner.signature.sign(SHA256.new(consumer_export.read()))
+        )
+    manifest.seek(0)
+    return manifest
+
+
+def pem(rand, size):
+    """Return a fake PEM block with ``size`` random bytes."""
+    data = bytearray(rand.getrandbits(8) for _ in range(size))
+    body = base64.b64encode(bytes(data)).decode('ascii')
+    return u'-----BEGIN CERTIFICATE-----\n{0}\n-----END CERTIFICATE-----\n' \
+        .format(u'\n'.join(textwrap.wrap(body, 64)))
+
+
+def make_template():
+    """Generate a template manifest of a bit more than 1 MB."""
+    rand = random.Random(0)
+    consumer_export = six.BytesIO()
+    with zipfile.ZipFile(
+            consumer_export, 'w', zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr('export/meta.json', json.dumps({
+            'version': '0.3.1', 'principalName': 'admin'}))
+        archive.writestr('export/consumer.json', json.dumps({
+            'uuid': six.text_type(uuid.uuid4()),
+            'name': 'benchmark',
+            'type': {'label': 'satellite'},
+        }))
+        archive.writestr('export/rules/rules.js', u'\n'.join(
+            u'function rule_{0}(pool) {{ return pool.quantity > {0}; }}'
+            .format(index) for index in range(4000)))
+        for index in range(ENTITLEMENTS):
+            entitlement_id = uuid.UUID(int=rand.getrandbits(128)).hex
+            archive.writestr(
+                'export/entitlements/{0}.json'.format(entitlement_id),
+                json.dumps({
+                    'id': entitlement_id,
+                    'quantity': index,
+                    'pool': {
+                        'productId': 'RH{0:05d}'.format(index % PRODUCTS),
+                        'attributes': [
+                            {'name': 'attribute-{0}'.format(attribute),
+                             'value': '{0}'.format(rand.random())}
+                            for attribute in range(40)
+                        ],
+                    },
+                })
+            )
+            archive.writestr(
+                'export/entitlement_certificates/{0}.pem'.format(
+                    entitlement_id),
+                pem(rand, 6000)
+            )
+        for index in range(PRODUCTS):
+            archive.writestr(
+                'export/products/RH{0:05d}.json'.format(index),
+                json.dumps({
+                    'id': 'RH{0:05d}'.format(index),
+                    'productContent': [
+                        {'content': {'label': 'repo-{0}'.format(content)}}
+                        for content in range(50)
+                    ],
+                })
+            )
+            archive.writestr(
+                'export/products/RH{0:05d}.pem'.format(index),
+                pem(rand, 2000)
+            )
+    manifest = six.BytesIO()
+    with zipfile.ZipFile(manifest, 'w', zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr('consumer_export.zip', consumer_export.getvalue())
+        archive.writestr('signature', b'signature')
+    return manifest.getvalue()
+
+
+def members(manifest):
+    """Return the names and contents of a cloned manifest members, except
+    the consumer data which changes on every clone.
+
+    """
+    archive = zipfile.ZipFile(six.BytesIO(zipfile.ZipFile(
+        manifest).read('consumer_export.zip')))
+    return [
+        (name, archive.read(name)) for name in archive.namelist()
+        if name != 'export/consumer.json'
+    ]
+
+
+def benchmark():
+    """Time both cloners and print the results."""
+    template = make_template()
+    cloner = ManifestCloner(template, RSA.generate(2048).exportKey())
+    if members(legacy_clone(cloner)) != members(cloner.clone()):
+        raise AssertionError('Cloners disagree on the manifest members')
+    print('template: {0} KB, {1} members'.format(
+        len(template) // 1024, len(members(cloner.clone())) + 1))
+    print('{0:<8} {1:>12} {2:>12}'.format('cloner', 'clone (ms)', 'clones/s'))
+    timings = []
+    for name, clone in (
+            ('legacy', lambda: legacy_clone(cloner)),
+            ('current', cloner.clone)):
+        best = min(timeit.repeat(clone, repeat=REPEAT, number=NUMBER))
+        timings.append(best / NUMBER)
+        print('{0:<8} {1:>12.2f} {2:>12.1f}'.format(
+            name, timings[-1] * 1000, 1 / timings[-1]))
+    print('speedup: {0:.1f}x'.format(timings[0] / timings[1]))
+
+
+if __name__ == '__main__':
+    benchmark()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python
+"""Benchmark ``robottelo.cli.hammer.parse_info``.
+
+Compare the current parser with the previous implementation, kept below, on
+the sample hammer info outputs stored in ``tests/robottelo/data/hammer``.
+Both parsers must return the same result for every sample. Run it from any
+directory, robottelo is imported from the repository the script belongs to::
+
+    python scripts/benchmark_parse_info.py
+
+"""
+from __future__ import print_function
+import glob
+import io
+import os
+import re
+import sys
+import timeit
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+sys.path.insert(0, ROOT)
+
+from robottelo.cli import hammer  # noqa pylint:disable=wrong-import-position
+
+FIXTURES = os.path.join(
+    ROOT, 'tests', 'robottelo', 'data', 'hammer', '*_info.txt')
+REPEAT = 5
+NUMBER = 100
+
+
+def legacy_parse_info(output):
+    """The parser replaced by the current ``hammer.parse_info``."""
+    # info dictionary
+    contents = {}
+    sub_prop = None  # stores name of the last group of sub-properties
+    sub_num = None  # is not None when list of properties
+
+    for line in output:
+        # skip empty lines
+        if line == '':
+            continue
+        if line.startswith(' '):  # sub-properties are indented
+            # values are separated by ':' or '=>'
+            if line.find(':') != -1:
+                key, value = line.lstrip().split(":", 1)
+            elif line.find('=>') != -1:
+                key, value = line.lstrip().split(" =>", 1)
+            else:
+                key = value = None
+
+            if key is None and value is None:
+                # Parse single attribute collection properties
+                # Template
+                #  1) template1
+                #  2) template2
+                #
+                # or
+                # Template
+                #  template1
+                #  template2
+                match = re.match(r'\d+\)\s+(.+)$', line.lstrip())
+
+                if match is None:
+                    match = re.match(r'(.*)$', line.lstrip())
+
+                value = match.group(1)
+
+                if isinstance(contents[sub_prop], dict):
+                    contents[sub_prop] = []
+
+                contents[sub_prop].append(value)
+            else:
+                # some properties have many numbered values
+                # Example:
+                # Content:
+                #  1) Repo Name: repo1
+                #     URL:       /custom/4f84fc90-9ffa-...
+                #  2) Repo Name: puppet1
+                #     URL:       /custom/4f84fc90-9ffa-...
+                starts_with_number = re.match(r'(\d+)\)', key)
+                if starts_with_number:
+                    sub_num = int(starts_with_number.group(1))
+                    # no. 1) we need to change dict() to list()
+                    if sub_num == 1:
+                        contents[sub_prop] = []
+                    # remove number from key
+                    key = re.sub(r'\d+\)', '', key)
+                    # append empty dict to array
+                    contents[sub_prop].append({})
+
+                key = key.lstrip().replace(' ', '-').lower()
+
+                # add value to dictionary
+                if sub_num is not None:
+                    contents[sub_prop][-1][key] = value.lstrip()
+                else:
+                    contents[sub_prop][key] = value.lstrip()
+        else:
+            sub_num = None  # new property implies no sub property
+            key, value = line.lstrip().split(":", 1)
+            key = key.lstrip().replace(' ', '-').lower()
+            if value.lstrip() == '':  # 'key:' no value, new sub-property
+                sub_prop = key
+                contents[sub_prop] = {}
+            else:  # 'key: value' line
+                contents[key] = value.lstrip()
+
+    return contents
+
+
+def benchmark():
+    """Time both parsers on every sample and print the results."""
+    print('{0:<28} {1:>7} {2:>12} {3:>12} {4:>8}'.format(
+        'sample', 'lines', 'legacy (ms)', 'current (ms)', 'speedup'))
+    for path in sorted(glob.glob(FIXTURES)):
+        with io.open(path, encoding='utf-8') as handler:
+            output = handler.read().splitlines()
+        if legacy_parse_info(output) != hammer.parse_info(output):
+            raise AssertionError(
+                'Parsers disagree on {0}'.format(os.path.basename(path)))
+        timings = []
+        for parser in (legacy_parse_info, hammer.parse_info):
+            best = min(timeit.repeat(
+                lambda: parser(output),  # pylint:disable=cell-var-from-loop
+                repeat=REPEAT,
+                number=NUMBER,
+            ))
+            timings.append(best / NUMBER * 1000)
+        print('{0:<28} {1:>7} {2:>12.3f} {3:>12.3f} {4:>7.2f}x'.format(
+            os.path.basename(path),
+            len(output),
+            timings[0],
+            timings[1],
+            timings[0] / timings[1],
+        ))
+
+
+if __name__ == '__main__':
+    benchmark()
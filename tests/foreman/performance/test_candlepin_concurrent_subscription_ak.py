@@ -6,8 +6,11 @@ from robottelo.performance.constants import (
     ACTIVATION_KEY,
     CONTENT_VIEW,
     LIFE_CYCLE_ENV,
+    OPEN_LOOP_DURATION,
+    OPEN_LOOP_RATE,
     QUANTITY,
     RAW_AK_FILE_NAME,
+    SOAK_DURATION,
     STAT_AK_FILE_NAME,
 )
 from robottelo.test import ConcurrentTestCase
@@ -166,3 +169,39 @@ class ConcurrentSubActivationKeyTestCase(ConcurrentTestCase):
 
         """
         self.kick_off_ak_test(self.num_threads[5], 5000)
+
+    def test_subscribe_ak_open_loop_10_clients(self):
+        """Subscribe systems at a constant rate using 10 virtual machines
+
+        @Steps:
+
+        1. create activation key (setup)
+        2. get subscription id (setup)
+        3. add activation key to subscription (setup)
+        4. schedule registrations at a constant rate, whatever their
+           completions, each one run by the first free virtual machine
+        5. produce result of latencies measured from the scheduled times
+           and count registrations which missed their schedule
+
+        @Assert: Restoring where there's no activation key or registration
+
+        """
+        self.kick_off_ak_open_loop_test(
+            self.num_threads[5], OPEN_LOOP_RATE, OPEN_LOOP_DURATION)
+
+    def test_subscribe_ak_soak_10_clients(self):
+        """Subscribe systems for a long duration using 10 virtual machines
+
+        @Steps:
+
+        1. create activation key (setup)
+        2. get subscription id (setup)
+        3. add activation key to subscription (setup)
+        4. concurrent run by multiple threads
+           each thread iterates until the duration is elapsed
+        5. produce result of timing from the histograms of each thread
+
+        @Assert: Restoring where there's no activation key or registration
+
+        """
+        self.kick_off_ak_soak_test(self.num_threads[5], SOAK_DURATION)
@@ -0,0 +1,146 @@
+"""Tests for module ``robottelo.cache``."""
+import shutil
+import six
+import tempfile
+import threading
+import unittest2
+
+from robottelo.cache import DEFAULT_DISK_TTL, ObjectCache
+
+if six.PY2:
+    import mock
+else:
+    from unittest import mock
+
+
+class ObjectCacheTestCase(unittest2.TestCase):
+    """Tests for class ``robottelo.cache.ObjectCache``."""
+    def test_make_key(self):
+        """Keys depend on the options, not on their order"""
+        self.assertEqual(
+            ObjectCache.make_key('org', {'name': 'foo', 'label': 'bar'}),
+            ObjectCache.make_key('org', {'label': 'bar', 'name': 'foo'}),
+        )
+        self.assertNotEqual(
+            ObjectCache.make_key('org', {'name': 'foo'}),
+            ObjectCache.make_key('product', {'name': 'foo'}),
+        )
+        self.assertEqual(
+            ObjectCache.make_key('org'), ObjectCache.make_key('org', {}))
+
+    def test_lru_eviction(self):
+        """The least recently used objects are dropped first"""
+        cache = ObjectCache(max_size=2)
+        cache['a'] = 1
+        cache['b'] = 2
+        self.assertEqual(cache['a'], 1)
+        cache['c'] = 3
+
+        self.assertIn('a', cache)
+        self.assertNotIn('b', cache)
+        self.assertIn('c', cache)
+        self.assertEqual(cache.stats()['evictions'], 1)
+
+    @mock.patch('robottelo.cache.time')
+    def test_ttl(self, time):
+        """Objects expire after their time to live"""
+        cache = ObjectCache(max_size=2, ttl=60)
+        time.time.return_value = 1000
+        cache['a'] = 1
+        time.time.return_value = 1030
+        self.assertEqual(cache.get('a'), 1)
+        time.time.return_value = 1061
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(len(cache), 0)
+
+    def test_stats(self):
+        """Hits and misses are counted"""
+        cache = ObjectCache(max_size=2)
+        create = mock.Mock(return_value={'id': 1})
+        cache.get_or_create('a', create)
+        cache.get_or_create('a', create)
+
+        self.assertEqual(create.call_count, 1)
+        self.assertEqual(
+            cache.stats(),
+            {u'evictions': 0, u'hits': 1, u'misses': 1, u'size': 1}
+        )
+
+    def test_get_or_create_once(self):
+        """Concurrent threads asking for a missing key create it once"""
+        cache = ObjectCache(max_size=2)
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def create():
+            """Block until all the threads asked for the key"""
+            calls.append(True)
+            started.set()
+            release.wait(5)
+            return {'id': 1}
+
+        results = []
+        threads = [
+            threading.Thread(
+                target=lambda: results.append(cache.get_or_create('a', create))
+            )
+            for _ in range(3)
+        ]
+        for thread in threads:
+            thread.start()
+        started.wait(5)
+        release.set()
+        for thread in threads:
+            thread.join(5)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [{'id': 1}] * 3)
+        self.assertEqual(cache._key_locks, {})  # pylint:disable=W0212
+
+
+class SharedObjectCacheTestCase(unittest2.TestCase):
+    """Tests for the objects shared on disk."""
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def test_shared(self):
+        """Objects stored by a cache are read by another one"""
+        ObjectCache(max_size=2, path=self.path)['a'] = {'id': 1}
+        other = ObjectCache(max_size=2, path=self.path)
+
+        self.assertIn('a', other)
+        self.assertEqual(other['a'], {'id': 1})
+        self.assertEqual(other.stats()['hits'], 1)
+
+    def test_not_serializable(self):
+        """Objects which are not JSON serializable are kept in memory"""
+        cache = ObjectCache(max_size=2, path=self.path)
+        cache['a'] = object()
+
+        self.assertIn('a', cache)
+        self.assertNotIn('a', ObjectCache(max_size=2, path=self.path))
+
+    @mock.patch('robottelo.cache.settings')
+    def test_per_server(self, settings):
+        """Objects created on a server are not read for another server"""
+        settings.object_cache_ttl = None
+        settings.server.hostname = 'sat1.example.com'
+        ObjectCache(max_size=2, path=self.path)['a'] = {'id': 1}
+        settings.server.hostname = 'sat2.example.com'
+
+        self.assertNotIn('a', ObjectCache(max_size=2, path=self.path))
+
+    @mock.patch('robottelo.cache.time')
+    def test_stored_expire(self, time):
+        """Stored objects expire even when no time to live is set"""
+        time.time.return_value = 1000
+        ObjectCache(max_size=2, ttl=None, path=self.path)['a'] = {'id': 1}
+        time.time.return_value = 1000 + DEFAULT_DISK_TTL - 1
+        self.assertIn('a', ObjectCache(max_size=2, ttl=None, path=self.path))
+        time.time.return_value = 1000 + DEFAULT_DISK_TTL + 1
+        self.assertNotIn(
+            'a', ObjectCache(max_size=2, ttl=None, path=self.path))
@@ -1,7 +1,10 @@
+import os
 import six
+import subprocess
 import unittest2
 
-from robottelo.cli.base import Base
+from robottelo.cli.base import Base, CLIReturnCodeError
+from robottelo.cli.gpgkey import GPGKey
 
 if six.PY2:
     import mock
@@ -13,6 +16,26 @@ class CLIClass(Base):
     """Class used for the username and password lookup tests"""
     foreman_admin_username = 'adminusername'
     foreman_admin_password = 'adminpassword'
+    command_base = 'basecommand'
+
+
+def run_locally(cmd, hostname, timeout):  # pylint:disable=W0613
+    """Run ``cmd`` in a local shell, like ``ssh._exec_command`` does."""
+    process = subprocess.Popen(
+        ['sh', '-c', cmd],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    )
+    stdout, stderr = process.communicate()
+    return (process.returncode, stdout, stderr)
+
+
+def has_ruby():
+    """Whether a ``ruby`` executable is available locally."""
+    return any(
+        os.access(os.path.join(path, 'ruby'), os.X_OK)
+        for path in os.environ.get('PATH', '').split(os.pathsep)
+    )
 
 
 class BaseCliTestCase(unittest2.TestCase):
@@ -21,8 +44,7 @@ class BaseCliTestCase(unittest2.TestCase):
     def test_construct_command(self):
         """_construct_command builds a command using flags and arguments"""
         Base.command_base = 'basecommand'
-        Base.command_sub = 'subcommand'
-        command_parts = Base._construct_command({
+        command_parts = Base._construct_command('subcommand', {
             u'flag-one': True,
             u'flag-two': False,
             u'argument': u'value',
@@ -36,6 +58,27 @@ class BaseCliTestCase(unittest2.TestCase):
         self.assertNotIn(u'--flag-two', command_parts)
         self.assertEqual(len(command_parts), 4)
 
+    def test_construct_command_keeps_no_state(self):
+        """_construct_command does not store the subcommand on the class"""
+        self.assertEqual(
+            CLIClass._construct_command('info', {u'id': 1}),
+            u'basecommand info --id="1"'
+        )
+        self.assertEqual(
+            CLIClass._construct_command('list'), u'basecommand list ')
+        self.assertFalse(hasattr(CLIClass, 'command_sub'))
+
+    def test_requires_org(self):
+        """Subcommands can be exempted from requiring organization-id"""
+        class OrgCLIClass(Base):
+            """Class requiring organization-id except for info"""
+            command_requires_org = True
+            org_optional_subcommands = ('info',)
+
+        self.assertTrue(OrgCLIClass._requires_org('list'))
+        self.assertFalse(OrgCLIClass._requires_org('info'))
+        self.assertFalse(CLIClass._requires_org('list'))
+
     def test_username_password_parameters_lookup(self):
         """Username and password returned are the parameters"""
         username, password = CLIClass._get_username_password('auser', 'apass')
@@ -67,3 +110,350 @@ class BaseCliTestCase(unittest2.TestCase):
         self.assertEqual(new_class.foreman_admin_username, 'auser')
         self.assertEqual(new_class.foreman_admin_password, 'apass')
         self.assertIn(Base, new_class.__bases__)
+
+    @mock.patch('robottelo.cli.base.settings')
+    @mock.patch('robottelo.cli.base.ssh')
+    def test_create_with_info(self, ssh, settings):
+        """``create`` chains the ``info`` command in one remote invocation"""
+        settings.hammer_json = False
+        settings.hammer_sessions = False
+        settings.hammer_shell = False
+        settings.performance = None
+        ssh.command_many.return_value = [
+            mock.Mock(return_code=0, stderr='', stdout=[
+                {u'message': u'Created', u'id': u'42', u'name': u'foo'}]),
+            mock.Mock(return_code=0, stderr='', stdout=[
+                u'Id:   42', u'Name: foo', u'']),
+        ]
+        result = CLIClass.create({u'name': u'foo'})
+
+        self.assertEqual(ssh.command_many.call_count, 1)
+        self.assertEqual(result, {u'id': u'42', u'name': u'foo'})
+        (create, create_format), (info, info_format) = (
+            ssh.command_many.call_args[0][0])
+        self.assertIn(u'--output=csv basecommand create --name="foo"', create)
+        self.assertEqual(create_format, 'csv')
+        self.assertIn(u'basecommand info  --id="$id"', info)
+        self.assertIsNone(info_format)
+
+    @unittest2.skipUnless(has_ruby(), 'the create CSV is parsed by ruby')
+    @mock.patch('robottelo.ssh._exec_command', run_locally)
+    @mock.patch('robottelo.cli.base.settings')
+    def test_create_with_info_quoted_comma(self, settings):
+        """The ID is found when ``create`` output fields contain commas"""
+        settings.hammer_json = False
+        settings.hammer_sessions = False
+        settings.hammer_shell = False
+        settings.performance = None
+
+        def hammer_command(command, *args, **kwargs):
+            """Fake hammer printing the ``create`` and ``info`` outputs"""
+            if u' info ' in command:
+                return u'printf \'Id:   %s\\nName: foo\\n\' "$id"'
+            return (
+                u'printf \'Message,Id,Name\\n'
+                u'"Foo, really created",42,"foo, bar"\\n\''
+            )
+
+        with mock.patch.object(
+                CLIClass, '_hammer_command', side_effect=hammer_command):
+            result = CLIClass.create({u'name': u'foo'})
+
+        self.assertEqual(result, {u'id': u'42', u'name': u'foo'})
+
+    @mock.patch('robottelo.cli.base.settings')
+    @mock.patch('robottelo.cli.base.ssh')
+    def test_create_with_info_json(self, ssh, settings):
+        """``create`` fetches the record from the JSON ``info`` output"""
+        settings.hammer_json = True
+        settings.hammer_sessions = False
+        settings.hammer_shell = False
+        settings.performance = None
+        ssh.command_many.return_value = [
+            mock.Mock(return_code=0, stderr='', stdout=[
+                {u'message': u'Created', u'id': u'42', u'name': u'foo'}]),
+            mock.Mock(return_code=0, stderr='', stdout={
+                u'ID': 42, u'Name': u'foo'}),
+        ]
+        result = CLIClass.create({u'name': u'foo'})
+
+        self.assertEqual(result, {u'id': u'42', u'name': u'foo'})
+        (_, info_format) = ssh.command_many.call_args[0][0][1]
+        self.assertEqual(info_format, 'json')
+
+    @mock.patch('robottelo.cli.base.settings')
+    @mock.patch('robottelo.cli.base.ssh')
+    def test_create_with_info_failure(self, ssh, settings):
+        """A failing ``create`` is reported with its own command"""
+        settings.hammer_json = False
+        settings.hammer_sessions = False
+        settings.hammer_shell = False
+        settings.performance = None
+        ssh.command_many.return_value = [
+            mock.Mock(return_code=65, stderr=u'Name has already been taken',
+                      stdout=[]),
+            mock.Mock(return_code=0, stderr='', stdout=b''),
+        ]
+        with self.assertRaises(CLIReturnCodeError) as context:
+            CLIClass.create({u'name': u'foo'})
+        self.assertIn(u'basecommand create', context.exception.msg)
+
+    @mock.patch('robottelo.cli.base.settings')
+    @mock.patch('robottelo.cli.base.ssh')
+    def test_create_without_info(self, ssh, settings):
+        """``create`` does not fetch the record when ``fetch_info`` is off"""
+        settings.hammer_json = False
+        settings.hammer_sessions = False
+        settings.hammer_shell = False
+        settings.performance = None
+        ssh.command.return_value = mock.Mock(
+            return_code=0,
+            stderr='',
+            stdout=[{u'message': u'Created', u'id': u'42', u'name': u'foo'}],
+        )
+        result = CLIClass.create({u'name': u'foo'}, fetch_info=False)
+
+        self.assertEqual(ssh.command.call_count, 1)
+        self.assertEqual(result[0][u'id'], u'42')
+        self.assertNotIn(
+            u' info ', ssh.command.call_args[0][0].decode('utf-8'))
+
+    @mock.patch('robottelo.cli.base.settings')
+    @mock.patch('robottelo.cli.base.ssh')
+    def test_create_with_info_override(self, ssh, settings):
+        """``create`` works with classes overriding ``info``"""
+        settings.hammer_json = False
+        settings.hammer_sessions = False
+        settings.hammer_shell = False
+        settings.performance = None
+        for json_output in (None, False):
+            ssh.command.reset_mock()
+            ssh.command.side_effect = [
+                mock.Mock(return_code=0, stderr='', stdout=[
+                    {u'message': u'Created', u'id': u'42',
+                     u'name': u'foo'}]),
+                mock.Mock(return_code=0, stderr='', stdout=[
+                    {u'id': u'42', u'name': u'foo', u'organization': u'org',
+                     u'content': u'key'}]),
+            ]
+            result = GPGKey.create(
+                {u'name': u'foo', u'organization-id': u'1'},
+                json_output=json_output,
+            )
+            self.assertEqual(ssh.command.call_count, 2)
+            self.assertEqual(result[u'id'], u'42')
+            self.assertEqual(result[u'content'], u'key')
+            self.assertIn(
+                u'gpg info', ssh.command.call_args[0][0].decode('utf-8'))
+
+    @mock.patch('robottelo.cli.base.settings')
+    @mock.patch('robottelo.cli.base.ssh')
+    def test_list_json(self, ssh, settings):
+        """JSON output is requested when the setting is enabled and records
+        keep the shape of the CSV output
+
+        """
+        settings.hammer_json = True
+        settings.hammer_sessions = False
+        settings.hammer_shell = False
+        settings.performance = None
+        ssh.command.return_value = mock.Mock(
+            return_code=0,
+            stderr='',
+            stdout=[{u'ID': 1, u'Name': u'foo', u'Content Type': u'yum'}],
+        )
+        result = CLIClass.list()
+
+        self.assertEqual(
+            result, [{u'id': u'1', u'name': u'foo', u'content-type': u'yum'}])
+        self.assertIn(
+            u'--output=json basecommand list',
+            ssh.command.call_args[0][0].decode('utf-8')
+        )
+        self.assertEqual(ssh.command.call_args[1]['output_format'], 'json')
+
+    @mock.patch('robottelo.cli.base.settings')
+    @mock.patch('robottelo.cli.base.ssh')
+    def test_json_output_per_class_and_call(self, ssh, settings):
+        """The class attribute and the call parameter override the setting
+        """
+        settings.hammer_json = False
+        settings.hammer_sessions = False
+        settings.hammer_shell = False
+        settings.performance = None
+        ssh.command.return_value = mock.Mock(
+            return_code=0, stderr='', stdout={u'ID': 1, u'Name': u'foo'})
+
+        class JSONCLIClass(CLIClass):
+            """Class requesting JSON output"""
+            json_output = True
+
+        self.assertEqual(JSONCLIClass.info({u'id': 1}), {
+            u'id': u'1', u'name': u'foo'})
+        self.assertEqual(CLIClass.info({u'id': 1}, json_output=True), {
+            u'id': u'1', u'name': u'foo'})
+        self.assertEqual(ssh.command.call_args[1]['output_format'], 'json')
+        self.assertFalse(JSONCLIClass._use_json(False))
+        self.assertFalse(CLIClass._use_json())
+
+    @mock.patch('robottelo.cli.base.hammer_session')
+    @mock.patch('robottelo.cli.base.settings')
+    @mock.patch('robottelo.cli.base.ssh')
+    def test_execute_with_session(self, ssh, settings, hammer_session):
+        """Commands rely on the hammer session instead of the credentials
+        and are run again once logged in if the session has expired
+
+        """
+        settings.hammer_json = False
+        settings.hammer_sessions = True
+        settings.hammer_shell = False
+        settings.performance = None
+        hammer_session.login.return_value = True
+        hammer_session.session_home.return_value = u'$HOME/session'
+        hammer_session.session_config.return_value = (
+            u'$HOME/session/session.yml')
+        hammer_session.expired.side_effect = lambda r: r.return_code == 129
+        hammer_session.invalidate.return_value = True
+        ssh.command.side_effect = [
+            mock.Mock(return_code=129, stderr=u'Session expired'),
+            mock.Mock(return_code=0, stderr=u'', stdout=[{u'id': u'1'}]),
+        ]
+        result = CLIClass.list()
+
+        self.assertEqual(result, [{u'id': u'1'}])
+        self.assertEqual(ssh.command.call_count, 2)
+        hammer_session.invalidate.assert_called_once_with(
+            'adminusername', 'adminpassword')
+        command = ssh.command.call_args[0][0].decode('utf-8')
+        self.assertIn(u'HOME="$HOME/session"', command)
+        self.assertIn(u'-c "$HOME/session/session.yml"', command)
+        self.assertNotIn(u'adminpassword', command)
+        self.assertTrue(command.endswith(u' </dev/null'))
+
+    @mock.patch('robottelo.cli.base.settings')
+    @mock.patch('robottelo.cli.base.ssh')
+    def test_execute_many(self, ssh, settings):
+        """``execute_many`` sends all the hammer commands at once"""
+        settings.hammer_json = False
+        settings.hammer_sessions = False
+        settings.hammer_shell = False
+        settings.performance = None
+        CLIClass.execute_many([
+            (u'basecommand list', 'csv'),
+            (u'basecommand info --id="1"', None),
+        ])
+
+        self.assertEqual(ssh.command_many.call_count, 1)
+        commands = ssh.command_many.call_args[0][0]
+        self.assertEqual([fmt for _, fmt in commands], ['csv', None])
+        self.assertTrue(commands[0][0].endswith(
+            u'-u adminusername -p adminpassword --output=csv basecommand list'
+        ))
+        self.assertTrue(commands[1][0].endswith(
+            u'-u adminusername -p adminpassword  basecommand info --id="1"'))
+
+    @mock.patch('robottelo.cli.base.settings')
+    @mock.patch('robottelo.cli.base.hammer_shell')
+    def test_execute_many_shell_stop_on_error(self, hammer_shell, settings):
+        """``execute_many`` does not send the commands following a failed
+        one to the ``hammer shell`` session
+
+        """
+        settings.hammer_json = False
+        settings.hammer_sessions = False
+        settings.hammer_shell = True
+        settings.performance = None
+        shell = hammer_shell.session.return_value.__enter__.return_value
+        shell.run.return_value = mock.Mock(
+            return_code=65, stderr=u'Error', stdout=u'')
+        results = CLIClass.execute_many([
+            (u'basecommand add-repository --id="1"', 'csv'),
+            (u'basecommand publish --id="1"', None),
+        ], stop_on_error=True)
+
+        self.assertEqual(shell.run.call_count, 1)
+        self.assertEqual([result.return_code for result in results], [65, 65])
+
+    @mock.patch('robottelo.cli.base.settings')
+    @mock.patch('robottelo.cli.base.ssh')
+    def test_execute_timed(self, ssh, settings):
+        """Timed commands are run through ``ssh.timed_command`` without
+        ``time -p``
+
+        """
+        settings.hammer_json = False
+        settings.hammer_sessions = False
+        settings.hammer_shell = True
+        settings.performance = None
+        ssh.timed_command.return_value = mock.Mock(
+            return_code=0, stderr=u'', stdout=u'')
+        response = CLIClass.execute(
+            u'basecommand sync', return_raw_response=True, timed=True)
+
+        self.assertIs(response, ssh.timed_command.return_value)
+        self.assertFalse(ssh.command.called)
+        self.assertTrue(ssh.timed_command.call_args[1]['server_timing'])
+        command = ssh.timed_command.call_args[0][0]
+        if isinstance(command, bytes):
+            command = command.decode('utf-8')
+        self.assertNotIn(u'time -p', command)
+        self.assertTrue(command.endswith(u'basecommand sync'))
+
+    @mock.patch('robottelo.cli.base.settings')
+    @mock.patch('robottelo.cli.base.ssh.command_stream')
+    def test_iter_list(self, command_stream, settings):
+        """``iter_list`` yields the records of the streamed output"""
+        settings.hammer_json = False
+        settings.hammer_sessions = False
+        settings.hammer_shell = False
+        settings.performance = None
+        stream = command_stream.return_value.__enter__.return_value
+        stream.__iter__.return_value = iter([u'Id,Name', u'1,foo', u'2,bar'])
+        stream.return_code = 0
+        stream.stderr = u''
+
+        self.assertEqual(
+            [record[u'name'] for record in CLIClass.iter_list()],
+            [u'foo', u'bar']
+        )
+        self.assertIn(
+            u'--output=csv basecommand list --per-page="10000"',
+            command_stream.call_args[0][0].decode('utf-8')
+        )
+
+    @mock.patch('robottelo.cli.base.settings')
+    @mock.patch('robottelo.cli.base.hammer_shell')
+    def test_iter_list_shell(self, hammer_shell, settings):
+        """``iter_list`` yields the same records in ``hammer shell`` mode"""
+        settings.hammer_json = True
+        settings.hammer_sessions = False
+        settings.hammer_shell = True
+        settings.performance = None
+        hammer_shell.execute.return_value = mock.Mock(
+            return_code=0, stderr=u'', stdout=[u'Id,Name', u'1,foo', u''])
+
+        records = list(CLIClass.iter_list())
+        self.assertEqual(
+            [record.as_dict() for record in records],
+            [{u'id': u'1', u'name': u'foo'}]
+        )
+        self.assertEqual(
+            hammer_shell.execute.call_args[0][0],
+            u'--output=csv basecommand list --per-page="10000"'
+        )
+
+    @mock.patch('robottelo.cli.base.settings')
+    @mock.patch('robottelo.cli.base.ssh.command_stream')
+    def test_iter_list_error(self, command_stream, settings):
+        """``iter_list`` reports a failure once the output is consumed"""
+        settings.hammer_json = False
+        settings.hammer_sessions = False
+        settings.hammer_shell = False
+        settings.performance = None
+        stream = command_stream.return_value.__enter__.return_value
+        stream.__iter__.return_value = iter([])
+        stream.return_code = 70
+        stream.stderr = u'Error: forbidden'
+
+        with self.assertRaises(CLIReturnCodeError):
+            list(CLIClass.iter_list())
@@ -3,6 +3,7 @@ import six
 
 from fauxfactory import gen_integer
 from robottelo import decorators
+from robottelo.cache import ObjectCache
 from robottelo.constants import BZ_CLOSED_STATUSES, BZ_OPEN_STATUSES
 from unittest2 import SkipTest, TestCase
 # (Too many public methods) pylint: disable=R0904
@@ -151,12 +152,12 @@ class BzBugIsOpenTestCase(TestCase):
 class CacheableTestCase(TestCase):
     """Tests for :func:`robottelo.decorators.cacheable`."""
     def setUp(self):
-        self.object_cache_patcher = mock.patch.dict(
-            'robottelo.decorators.OBJECT_CACHE')
+        self.object_cache_patcher = mock.patch(
+            'robottelo.decorators.OBJECT_CACHE', ObjectCache(max_size=10))
         self.object_cache = self.object_cache_patcher.start()
 
         def make_foo(options):
-            return {'id': 42}
+            return {'id': 42, 'options': options}
 
         self.make_foo = decorators.cacheable(make_foo)
 
@@ -166,21 +167,28 @@ class CacheableTestCase(TestCase):
     def test_build_cache(self):
         """Create a new object and add it to the cache."""
         obj = self.make_foo(cached=True)
-        self.assertEqual(decorators.OBJECT_CACHE, {'foo': {'id': 42}})
-        self.assertEqual(id(decorators.OBJECT_CACHE['foo']), id(obj))
+        key = ObjectCache.make_key('foo')
+        self.assertEqual(len(decorators.OBJECT_CACHE), 1)
+        self.assertEqual(id(decorators.OBJECT_CACHE[key]), id(obj))
 
     def test_return_from_cache(self):
         """Return an already cached object."""
         cache_obj = {'id': 42}
-        decorators.OBJECT_CACHE['foo'] = cache_obj
+        decorators.OBJECT_CACHE[ObjectCache.make_key('foo')] = cache_obj
         obj = self.make_foo(cached=True)
         self.assertEqual(id(cache_obj), id(obj))
 
     def test_create_and_not_add_to_cache(self):
         """Create a new object and not add it to the cache."""
         self.make_foo(cached=False)
-        self.assertNotIn('foo', decorators.OBJECT_CACHE)
-        self.assertEqual(decorators.OBJECT_CACHE, {})
+        self.assertEqual(len(decorators.OBJECT_CACHE), 0)
+
+    def test_cache_per_options(self):
+        """Objects created with different options are cached apart."""
+        first = self.make_foo({'name': 'first'}, cached=True)
+        second = self.make_foo({'name': 'second'}, cached=True)
+        self.assertIsNot(first, second)
+        self.assertIs(self.make_foo({'name': 'first'}, cached=True), first)
 
 
 class RmBugIsOpenTestCase(TestCase):
@@ -0,0 +1,167 @@
+"""Tests for module ``robottelo.performance.driver``."""
+import threading
+import time
+import unittest2
+
+from robottelo.performance.driver import LoadDriver, OpenLoopDriver
+
+
+class LoadDriverTestCase(unittest2.TestCase):
+    """Tests for class ``robottelo.performance.driver.LoadDriver``."""
+    def test_iterations(self):
+        """Each client runs the given number of iterations"""
+        results = LoadDriver(
+            lambda client, iteration: (client, iteration),
+            [u'a', u'b'],
+            iterations=3,
+        ).run()
+        self.assertEqual(results, [
+            [(u'a', 0), (u'a', 1), (u'a', 2)],
+            [(u'b', 0), (u'b', 1), (u'b', 2)],
+        ])
+
+    def test_histogram(self):
+        """Each client records its timings into its own histogram"""
+        histograms = LoadDriver(
+            lambda client, iteration: client + iteration,
+            [1, 10],
+            iterations=3,
+            histogram=True,
+        ).run()
+        self.assertEqual([len(histogram) for histogram in histograms], [3, 3])
+        self.assertEqual(
+            [(histogram.min, histogram.max) for histogram in histograms],
+            [(1, 3), (10, 12)],
+        )
+
+    def test_start_together(self):
+        """Workers only start once all of them are ready"""
+        starts = []
+        lock = threading.Lock()
+
+        def scenario(client, iteration):  # pylint:disable=unused-argument
+            """Record the start time"""
+            with lock:
+                starts.append(time.time())
+
+        LoadDriver(scenario, range(4), iterations=1).run()
+        self.assertEqual(len(starts), 4)
+        self.assertLess(max(starts) - min(starts), 0.5)
+
+    def test_duration(self):
+        """Workers stop after the given duration"""
+        started = time.time()
+        results = LoadDriver(
+            lambda client, iteration: time.sleep(0.01) or iteration,
+            range(2),
+            duration=0.2,
+        ).run()
+        self.assertLess(time.time() - started, 1)
+        for timings in results:
+            self.assertGreater(len(timings), 1)
+            self.assertEqual(timings, list(range(len(timings))))
+
+    def test_ramp_up(self):
+        """Workers starts are spread over the ramp-up period"""
+        starts = {}
+
+        def scenario(client, iteration):  # pylint:disable=unused-argument
+            """Record the start time"""
+            starts.setdefault(client, time.time())
+
+        LoadDriver(scenario, range(3), iterations=1, ramp_up=0.3).run()
+        self.assertGreaterEqual(starts[2] - starts[0], 0.15)
+
+    def test_errors(self):
+        """Failed iterations are recorded and skipped"""
+        def scenario(client, iteration):
+            """Fail on the second iteration"""
+            if iteration == 1:
+                raise ValueError(client)
+            return iteration
+
+        driver = LoadDriver(scenario, [u'a'], iterations=3)
+        self.assertEqual(driver.run(), [[0, 2]])
+        self.assertEqual(len(driver.errors), 1)
+        self.assertEqual(driver.errors[0][:2], (0, 1))
+
+    def test_cancel(self):
+        """Cancelled workers stop after their current iteration"""
+        def scenario(client, iteration):  # pylint:disable=unused-argument
+            """Cancel the run on the third iteration"""
+            if iteration == 2:
+                driver.cancel()
+            return iteration
+
+        driver = LoadDriver(scenario, [u'a'], iterations=10)
+        self.assertEqual(driver.run(), [[0, 1, 2]])
+        self.assertTrue(driver.cancelled)
+
+    def test_limits_required(self):
+        """Either iterations or duration must be given"""
+        with self.assertRaises(ValueError):
+            LoadDriver(lambda client, iteration: None, [u'a'])
+
+
+class OpenLoopDriverTestCase(unittest2.TestCase):
+    """Tests for class ``robottelo.performance.driver.OpenLoopDriver``."""
+    def test_constant_rate(self):
+        """Requests are scheduled at the given rate"""
+        samples = OpenLoopDriver(
+            lambda client, number: number, range(2), rate=50, requests=10,
+        ).run()
+        self.assertEqual(
+            [sample.value for sample in samples], list(range(10)))
+        gaps = [
+            later.scheduled - earlier.scheduled
+            for earlier, later in zip(samples, samples[1:])
+        ]
+        for gap in gaps:
+            self.assertAlmostEqual(gap, 0.02, places=6)
+        for sample in samples:
+            self.assertGreaterEqual(sample.started, sample.scheduled)
+            self.assertGreaterEqual(sample.latency, sample.lag)
+
+    def test_missed_schedules(self):
+        """Requests waiting for a busy client are missed and their latency
+        includes the wait
+
+        """
+        driver = OpenLoopDriver(
+            lambda client, number: time.sleep(0.1),
+            [u'a'],
+            rate=100,
+            requests=3,
+        )
+        samples = driver.run()
+        self.assertEqual(driver.missed, 2)
+        self.assertGreater(samples[2].lag, 0.15)
+        self.assertGreater(samples[2].latency, 0.25)
+
+    def test_poisson_duration(self):
+        """Poisson arrivals stop at the end of the duration"""
+        driver = OpenLoopDriver(
+            lambda client, number: number,
+            range(4),
+            rate=200,
+            duration=0.2,
+            arrival='poisson',
+            seed=1,
+        )
+        samples = driver.run()
+        self.assertGreater(len(samples), 5)
+        self.assertTrue(all(
+            sample.scheduled - samples[0].scheduled < 0.2
+            for sample in samples
+        ))
+        self.assertEqual(
+            [sample.number for sample in samples], list(range(len(samples))))
+
+    def test_invalid(self):
+        """Invalid parameters are rejected"""
+        for kwargs in ({}, {'requests': 1, 'arrival': 'burst'}):
+            with self.assertRaises(ValueError):
+                OpenLoopDriver(
+                    lambda client, number: None, [u'a'], 1, **kwargs)
+        with self.assertRaises(ValueError):
+            OpenLoopDriver(lambda client, number: None, [u'a'], 0, requests=1)
@@ -0,0 +1,91 @@
+"""Tests for module ``robottelo.cli.entity_pool``."""
+import itertools
+import six
+import unittest2
+
+from robottelo.cli import entity_pool
+
+if six.PY2:
+    import mock
+else:
+    from unittest import mock
+
+
+class MakeFoo(object):
+    """A fake ``make_*`` function numbering the entities created"""
+    __name__ = 'make_foo'
+
+    def __init__(self, fail=False):
+        self.counter = itertools.count(1)
+        self.fail = fail
+        self.options = []
+
+    def __call__(self, options=None):
+        self.options.append(options)
+        if self.fail:
+            raise ValueError('Could not create foo')
+        return {'id': next(self.counter)}
+
+
+class EntityPoolTestCase(unittest2.TestCase):
+    """Tests for class ``robottelo.cli.entity_pool.EntityPool``."""
+    def test_checkout_hit(self):
+        """Entities created in the background are checked out"""
+        make = MakeFoo()
+        cleanup = mock.Mock()
+        pool = entity_pool.EntityPool(make, {'name': 'foo'}, 2, cleanup)
+        pool.refill()
+        pool.wait()
+
+        self.assertEqual(pool.checkout(), {'id': 1})
+        pool.wait()
+        self.assertEqual(pool.stats()['hits'], 1)
+        self.assertEqual(pool.stats()['ready'], 2)
+        self.assertEqual(make.options, [{'name': 'foo'}] * 3)
+        self.assertIsNot(make.options[0], pool.options)
+
+        pool.close()
+        self.assertEqual(
+            [call[0][0] for call in cleanup.call_args_list],
+            [{'id': 2}, {'id': 3}]
+        )
+        self.assertEqual(pool.stats()['ready'], 0)
+
+    def test_checkout_miss(self):
+        """An entity is created on the spot when the pool is empty"""
+        make = MakeFoo()
+        pool = entity_pool.EntityPool(make, size=1)
+
+        self.assertEqual(pool.checkout(), {'id': 1})
+        self.assertEqual(pool.stats()['misses'], 1)
+        pool.close()
+
+    def test_fill_failure(self):
+        """Failures stop filling the pool and are counted"""
+        pool = entity_pool.EntityPool(MakeFoo(fail=True), size=3)
+        pool.refill()
+        pool.wait()
+
+        self.assertEqual(pool.stats()['failures'], 1)
+        self.assertEqual(pool.stats()['ready'], 0)
+        pool.close()
+
+
+class GetPoolTestCase(unittest2.TestCase):
+    """Tests for the pools registry."""
+    def tearDown(self):
+        entity_pool.close_pools()
+
+    def test_get_pool(self):
+        """Pools are shared for the same function and options"""
+        make = MakeFoo()
+        pool = entity_pool.get_pool(make, {'a': 1, 'b': 2})
+
+        self.assertIs(entity_pool.get_pool(make, {'b': 2, 'a': 1}), pool)
+        self.assertIsNot(entity_pool.get_pool(make, {'a': 1}), pool)
+
+    def test_deleter(self):
+        """The entities are deleted by their ID"""
+        cli_object = mock.Mock()
+        entity_pool.deleter(cli_object)({'id': 42, 'name': 'foo'})
+        cli_object.delete.assert_called_once_with({u'id': 42})
@@ -0,0 +1,195 @@
+"""Tests for module ``robottelo.cli.factory``."""
+import six
+import threading
+import unittest2
+
+from robottelo.cli import entity_pool, factory
+from robottelo.cli.factory import CLIFactoryError, EntityBuilder
+
+if six.PY2:
+    import mock
+else:
+    from unittest import mock
+
+
+class EntityBuilderTestCase(unittest2.TestCase):
+    """Tests for class ``robottelo.cli.factory.EntityBuilder``."""
+    def test_run(self):
+        """Steps get the results of the steps they depend on"""
+        builder = EntityBuilder()
+        builder.add('org', lambda done: 1)
+        builder.add('product', lambda done: done['org'] + 1, requires=['org'])
+        builder.add(
+            'repo', lambda done: done['product'] * 10, requires=['product'])
+
+        self.assertEqual(
+            builder.run(), {'org': 1, 'product': 2, 'repo': 20})
+        self.assertEqual(
+            sorted(builder.timings), ['org', 'product', 'repo'])
+
+    def test_run_concurrently(self):
+        """Independent steps run at the same time"""
+        barrier = threading.Event()
+        started = []
+
+        def step(done):
+            """Wait for the other step to be started too"""
+            started.append(True)
+            if len(started) == 2:
+                barrier.set()
+            return barrier.wait(5)
+
+        builder = EntityBuilder()
+        builder.add('org', lambda done: None)
+        builder.add('lce', step, requires=['org'])
+        builder.add('cv', step, requires=['org'])
+
+        results = builder.run()
+        self.assertTrue(results['lce'])
+        self.assertTrue(results['cv'])
+
+    def test_run_error(self):
+        """No step is started once a step has failed"""
+        dependent = mock.Mock()
+
+        def fail(done):
+            """Fail like a make_* function"""
+            raise CLIFactoryError('Failed to create product')
+
+        builder = EntityBuilder()
+        builder.add('product', fail)
+        builder.add('repo', dependent, requires=['product'])
+
+        with self.assertRaises(CLIFactoryError):
+            builder.run()
+        self.assertFalse(dependent.called)
+
+    def test_run_base_exception(self):
+        """Steps raising exceptions not deriving from Exception are reported"""
+        def leave(done):
+            """Exit from the step"""
+            raise SystemExit(1)
+
+        builder = EntityBuilder()
+        builder.add('product', leave)
+        with self.assertRaises(SystemExit):
+            builder.run()
+
+    @mock.patch.object(EntityBuilder, '_run_step')
+    def test_run_worker_error(self, run_step):
+        """Errors raised out of the step wrapper are reported"""
+        run_step.side_effect = RuntimeError('worker failed')
+        builder = EntityBuilder()
+        builder.add('product', lambda done: None)
+        with self.assertRaises(RuntimeError):
+            builder.run()
+
+    def test_unknown_step(self):
+        """Dependencies must be declared"""
+        builder = EntityBuilder()
+        builder.add('repo', lambda done: None, requires=['product'])
+        with self.assertRaises(CLIFactoryError):
+            builder.run()
+
+    def test_circular_dependency(self):
+        """Circular dependencies are refused before running any step"""
+        step = mock.Mock()
+        builder = EntityBuilder()
+        builder.add('a', step, requires=['b'])
+        builder.add('b', step, requires=['a'])
+        with self.assertRaises(CLIFactoryError):
+            builder.run()
+        self.assertFalse(step.called)
+
+
+@mock.patch('robottelo.cli.factory.settings')
+class PooledTestCase(unittest2.TestCase):
+    """Tests for decorator ``robottelo.cli.factory.pooled``."""
+    def setUp(self):
+        self.cli_object = mock.Mock()
+        self.make = mock.Mock(__name__='make_foo', return_value={'id': 1})
+        self.pooled_make = factory.pooled(self.cli_object)(self.make)
+
+    def tearDown(self):
+        entity_pool.close_pools()
+
+    def test_disabled(self, settings):
+        """Entities are created on the spot when pools are disabled"""
+        settings.entity_pool_size = 0
+        self.assertEqual(self.pooled_make(), {'id': 1})
+        self.make.assert_called_once_with(None, cached=False)
+
+    def test_options(self, settings):
+        """Entities created with options are not pooled"""
+        settings.entity_pool_size = 2
+        self.pooled_make({'name': 'foo'})
+        self.make.assert_called_once_with({'name': 'foo'}, cached=False)
+
+    def test_pooled(self, settings):
+        """Entities created without options come from a pool"""
+        settings.entity_pool_size = 2
+        self.assertEqual(self.pooled_make(), {'id': 1})
+        pool = entity_pool.get_pool(self.make)
+        pool.wait(5)
+
+        self.assertEqual(pool.stats()['ready'], 2)
+        self.assertEqual(self.pooled_make(), {'id': 1})
+        self.assertEqual(pool.stats()['hits'], 1)
+        entity_pool.close_pools()
+        self.cli_object.delete.assert_called_with({u'id': 1})
+
+
+class SetupOrgTestCase(unittest2.TestCase):
+    """Tests for the ``setup_org_for_a_*`` helpers."""
+    @mock.patch.multiple(
+        'robottelo.cli.factory',
+        ActivationKey=mock.DEFAULT,
+        ContentView=mock.DEFAULT,
+        Repository=mock.DEFAULT,
+        Task=mock.DEFAULT,
+        _publish_content_view_with_repository=mock.DEFAULT,
+        activationkey_add_subscription_to_repo=mock.DEFAULT,
+        make_activation_key=mock.DEFAULT,
+        make_content_view=mock.DEFAULT,
+        make_lifecycle_environment=mock.DEFAULT,
+        make_org=mock.DEFAULT,
+        make_product=mock.DEFAULT,
+        make_repository=mock.DEFAULT,
+    )
+    def test_setup_org_for_a_custom_repo(self, **mocks):
+        """The IDs of all the entities are returned"""
+        mocks['make_org'].return_value = {'id': '1'}
+        mocks['make_lifecycle_environment'].return_value = {'id': '2'}
+        mocks['make_content_view'].return_value = {'id': '3'}
+        mocks['make_product'].return_value = {'id': '4', 'name': 'product'}
+        mocks['make_repository'].return_value = {'id': '5'}
+        mocks['make_activation_key'].return_value = {'id': '6'}
+        mocks['_publish_content_view_with_repository'].return_value = {
+            'id': '7'}
+
+        result = factory.setup_org_for_a_custom_repo({'url': 'http://repo'})
+
+        self.assertEqual(result, {
+            u'activationkey-id': '6',
+            u'content-view-id': '3',
+            u'lifecycle-environment-id': '2',
+            u'organization-id': '1',
+            u'product-id': '4',
+            u'repository-id': '5',
+        })
+        publish = mocks['_publish_content_view_with_repository']
+        publish.assert_called_once_with('1', '3', '5')
+        mocks['Repository'].synchronize_async.assert_called_once_with({
+            u'id': '5'})
+        mocks['ContentView'].version_promote_async.assert_called_once_with({
+            u'id': '7',
+            u'organization-id': '1',
+            u'to-lifecycle-environment-id': '2',
+        })
+        self.assertEqual(mocks['Task'].wait_for_tasks.call_count, 2)
+        add_subscription = mocks['activationkey_add_subscription_to_repo']
+        add_subscription.assert_called_once_with({
+            u'activationkey-id': '6',
+            u'organization-id': '1',
+            u'subscription': 'product',
+        })
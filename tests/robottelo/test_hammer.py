@@ -1,5 +1,7 @@
 # -*- encoding: utf-8 -*-
 """Tests for Robottelo's hammer helpers"""
+import io
+import os
 import unittest2
 
 from robottelo.cli import hammer
@@ -289,3 +291,166 @@ class ParseInfoTestCase(unittest2.TestCase):
                 ],
             }
         )
+
+
+class ParseInfoFixturesTestCase(unittest2.TestCase):
+    """Tests for parsing sample info outputs stored in ``data/hammer``"""
+    @staticmethod
+    def parse_fixture(name):
+        """Parse the sample info output ``name``"""
+        path = os.path.join(
+            os.path.dirname(os.path.abspath(__file__)), 'data', 'hammer', name)
+        with io.open(path, encoding='utf-8') as handler:
+            return hammer.parse_info(handler.read().splitlines())
+
+    def test_content_view_info(self):
+        """Can parse long lists of numbered properties"""
+        info = self.parse_fixture('content_view_info.txt')
+        self.assertEqual(info['id'], '42')
+        self.assertEqual(info['composite'], {})
+        self.assertEqual(len(info['yum-repositories']), 60)
+        self.assertEqual(len(info['versions']), 300)
+        self.assertEqual(
+            info['versions'][-1],
+            {'id': '1300', 'version': '300.0',
+             'published': '2015/01/21 12:00:00'}
+        )
+        self.assertEqual(info['lifecycle-environments'][0]['name'], 'Library')
+        self.assertEqual(info['activation-keys'][-1], 'ak-040')
+
+    def test_host_info(self):
+        """Can parse sub-properties separated by ':' and '=>'"""
+        info = self.parse_fixture('host_info.txt')
+        self.assertEqual(info['network']['mac'], '52:54:00:12:34:56')
+        self.assertEqual(info['network']['subnet'], '')
+        self.assertEqual(info['parameters']['param_200'], 'value 200')
+        self.assertEqual(info['last-report'], '2015/09/14 12:03:27')
+        self.assertEqual(len(info['interfaces']), 30)
+        self.assertEqual(info['interfaces'][0]['mac-address'],
+                         '52:54:00:00:00:01')
+
+    def test_organization_info(self):
+        """Can parse lists of single values"""
+        info = self.parse_fixture('organization_info.txt')
+        self.assertEqual(len(info['users']), 151)
+        self.assertEqual(info['templates'][0], 'Template 001 (provision)')
+        self.assertEqual(info['hostgroups'][-1], 'hostgroup-100')
+        self.assertEqual(info['compute-resources'], {})
+
+
+class IterCSVTestCase(unittest2.TestCase):
+    """Tests for lazily parsing CSV hammer output"""
+    def test_iter_csv(self):
+        """Rows are the same as the ones returned by ``parse_csv``"""
+        output_lines = [
+            u'Header,Header 2',
+            u'header value 1,header with spaces value',
+            u'"""double quote escaped value""","," escaped value',
+            u'unicode,chårs',
+            u'',
+        ]
+        self.assertEqual(
+            list(hammer.iter_csv(output_lines)),
+            hammer.parse_csv(output_lines)
+        )
+
+    def test_iter_csv_lazy(self):
+        """Lines are only consumed when rows are requested"""
+        consumed = []
+
+        def lines():
+            """Record the lines consumed"""
+            for line in (u'Id,Name', u'1,foo', u'2,bar'):
+                consumed.append(line)
+                yield line
+
+        rows = hammer.iter_csv(lines())
+        self.assertEqual(next(rows), {u'id': u'1', u'name': u'foo'})
+        self.assertEqual(consumed, [u'Id,Name', u'1,foo'])
+
+    def test_iter_csv_empty(self):
+        """No rows are returned for an empty output"""
+        self.assertEqual(list(hammer.iter_csv([])), [])
+
+
+class CSVRecordTestCase(unittest2.TestCase):
+    """Tests for the compact rows of CSV hammer output"""
+    def setUp(self):
+        self.records = list(hammer.iter_csv_records([
+            u'Id,Name,Content Type',
+            u'1,foo,yum',
+            u'2,bar',
+        ]))
+
+    def test_mapping(self):
+        """Records behave like read-only dictionaries"""
+        record = self.records[0]
+        self.assertEqual(record[u'id'], u'1')
+        self.assertEqual(record.get(u'content-type'), u'yum')
+        self.assertIsNone(record.get(u'missing'))
+        self.assertEqual(list(record), [u'id', u'name', u'content-type'])
+        self.assertEqual(len(record), 3)
+        self.assertIn(u'name', record)
+        with self.assertRaises(TypeError):
+            record[u'id'] = u'3'  # pylint:disable=E1137
+
+    def test_short_row(self):
+        """Missing trailing values are missing keys, like with ``zip``"""
+        record = self.records[1]
+        self.assertEqual(len(record), 2)
+        self.assertNotIn(u'content-type', record)
+        self.assertEqual(record.as_dict(), {u'id': u'2', u'name': u'bar'})
+
+    def test_as_dict(self):
+        """Records compare equal to the rows returned by ``parse_csv``"""
+        rows = hammer.parse_csv([
+            u'Id,Name,Content Type',
+            u'1,foo,yum',
+            u'2,bar',
+        ])
+        self.assertEqual(self.records, rows)
+        self.assertEqual([record.as_dict() for record in self.records], rows)
+        self.assertIs(type(self.records[0].as_dict()), dict)
+
+    def test_shared_header(self):
+        """All the records of an output share the header mapping"""
+        # pylint:disable=protected-access
+        self.assertIs(self.records[0]._index, self.records[1]._index)
+        self.assertFalse(hasattr(self.records[0], '__dict__'))
+
+
+class NormalizeJSONTestCase(unittest2.TestCase):
+    """Tests for normalizing JSON hammer output"""
+    def test_normalize_json(self):
+        """Key names are normalized at any depth and values are converted
+        to strings like the CSV output gives them
+
+        """
+        self.assertEqual(
+            hammer.normalize_json({
+                u'ID': 1,
+                u'Content Views': [{u'ID': 2, u'Name': u'cv'}],
+                u'Lifecycle Environments': {u'Library': True},
+                u'Enabled': False,
+                u'Description': None,
+            }),
+            {
+                u'id': u'1',
+                u'content-views': [{u'id': u'2', u'name': u'cv'}],
+                u'lifecycle-environments': {u'library': u'yes'},
+                u'enabled': u'no',
+                u'description': u'',
+            }
+        )
+
+    def test_normalize_json_list(self):
+        """Records get the shape of the parsed CSV output"""
+        self.assertEqual(
+            hammer.normalize_json_list([{u'ID': 1, u'Name': u'foo'}]),
+            [{u'id': u'1', u'name': u'foo'}]
+        )
+        self.assertEqual(
+            hammer.normalize_json_list({u'Message': u'Created', u'ID': 1}),
+            [{u'message': u'Created', u'id': u'1'}]
+        )
+        self.assertEqual(hammer.normalize_json_list(None), {})
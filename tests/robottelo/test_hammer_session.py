@@ -0,0 +1,97 @@
+"""Tests for module ``robottelo.cli.hammer_session``."""
+import six
+import unittest2
+
+from robottelo.cli import hammer_session
+
+if six.PY2:
+    import mock
+else:
+    from unittest import mock
+
+
+@mock.patch('robottelo.cli.hammer_session.settings')
+@mock.patch('robottelo.cli.hammer_session.ssh')
+class HammerSessionTestCase(unittest2.TestCase):
+    """Tests for the hammer sessions logins."""
+    def setUp(self):
+        hammer_session._logged_in.clear()
+
+    def tearDown(self):
+        hammer_session._logged_in.clear()
+
+    def test_session_home(self, ssh, settings):
+        """Each credential pair gets its own home directory"""
+        home = hammer_session.session_home('admin', 'changeme')
+        self.assertTrue(home.startswith(u'$HOME/.robottelo/hammer-sessions/'))
+        self.assertEqual(
+            home, hammer_session.session_home('admin', 'changeme'))
+        self.assertNotEqual(
+            home, hammer_session.session_home('admin', 'newpassword'))
+
+    def test_login_once(self, ssh, settings):
+        """Hammer is logged in only once for a credential pair"""
+        settings.server.hostname = 'server'
+        ssh.command.return_value = mock.Mock(return_code=0, stderr=u'')
+        self.assertTrue(hammer_session.login('admin', 'changeme'))
+        self.assertTrue(hammer_session.login('admin', 'changeme'))
+
+        self.assertEqual(ssh.command.call_count, 1)
+        script = ssh.command.call_args[0][0].decode('utf-8')
+        home = hammer_session.session_home('admin', 'changeme')
+        config = hammer_session.session_config('admin', 'changeme')
+        self.assertTrue(config.startswith(home))
+        self.assertIn(
+            u'HOME="{0}" hammer -c "{1}" auth login basic -u admin '
+            u'-p changeme'.format(home, config),
+            script
+        )
+        self.assertIn(u':use_sessions: true', script)
+        # The hammer configuration of the SSH user is kept
+        self.assertIn(
+            u'ln -s "$HOME/.hammer/cli.modules.d" '
+            u'"{0}/.hammer/cli.modules.d"'.format(home),
+            script
+        )
+
+    def test_login_failure(self, ssh, settings):
+        """A failed login is reported and tried again on the next call"""
+        settings.server.hostname = 'server'
+        ssh.command.return_value = mock.Mock(
+            return_code=129, stderr=u'Invalid username or password')
+        self.assertFalse(hammer_session.login('admin', 'wrong'))
+        self.assertFalse(hammer_session.login('admin', 'wrong'))
+        self.assertEqual(ssh.command.call_count, 2)
+
+    def test_invalidate(self, ssh, settings):
+        """An invalidated session is logged in again"""
+        settings.server.hostname = 'server'
+        ssh.command.return_value = mock.Mock(return_code=0, stderr=u'')
+        hammer_session.login('admin', 'changeme')
+
+        self.assertTrue(hammer_session.invalidate('admin', 'changeme'))
+        self.assertFalse(hammer_session.invalidate('admin', 'changeme'))
+        hammer_session.login('admin', 'changeme')
+        self.assertEqual(ssh.command.call_count, 2)
+
+    def test_logout_all(self, ssh, settings):
+        """Sessions logged in by this process are logged out and removed"""
+        ssh.command.return_value = mock.Mock(return_code=0, stderr=u'')
+        hammer_session.login('admin', 'changeme', 'server')
+        hammer_session._logged_in[('server', 'other', 'secret')] = -1
+        ssh.command.reset_mock()
+        hammer_session.logout_all()
+
+        self.assertEqual(ssh.command.call_count, 1)
+        script = ssh.command.call_args[0][0].decode('utf-8')
+        self.assertIn(u'auth logout', script)
+        self.assertIn(u'rm -rf "{0}"'.format(
+            hammer_session.session_home('admin', 'changeme')), script)
+        self.assertEqual(ssh.command.call_args[1]['hostname'], 'server')
+        self.assertEqual(
+            list(hammer_session._logged_in), [('server', 'other', 'secret')])
+
+    def test_expired(self, ssh, settings):
+        """Only authentication failures are reported as expired sessions"""
+        self.assertTrue(hammer_session.expired(mock.Mock(return_code=129)))
+        self.assertFalse(hammer_session.expired(mock.Mock(return_code=65)))
@@ -0,0 +1,120 @@
+"""Tests for module ``robottelo.cli.hammer_shell``."""
+import six
+import unittest2
+
+from robottelo.cli import hammer_shell
+
+if six.PY2:
+    import mock
+else:
+    from unittest import mock
+
+
+class MockChannel(object):
+    """A mock ``paramiko.Channel`` running a fake hammer shell.
+
+    Every line sent is answered with the output and exit status registered
+    in ``replies``, the status being printed like ``hammer_shell.PRELUDE``
+    does. The frame markers get the same complaint hammer prints for unknown
+    sub-commands.
+
+    """
+    def __init__(self, replies):
+        self.replies = replies
+        self.closed = False
+        self.sent = []
+        self.stdout = b''
+        self.stderr = b''
+
+    def exit_status_ready(self):
+        """The fake shell never exits by itself."""
+        return False
+
+    def sendall(self, data):
+        """Queue the fake shell answer to every line of ``data``."""
+        for line in data.splitlines():
+            self.sent.append(line)
+            if line.startswith(b'__robottelo_frame_'):
+                self.stderr += (
+                    b"Error: No such sub-command '" + line + b"'.\n\n"
+                    b"See: 'hammer --help'\n" +
+                    hammer_shell.STATUS_PREFIX + b'64\n'
+                )
+            else:
+                stdout, stderr, status = self.replies[line]
+                self.stdout += hammer_shell.PROMPT + stdout
+                self.stderr += stderr
+                if status is not None:
+                    self.stderr += (
+                        hammer_shell.STATUS_PREFIX +
+                        str(status).encode('ascii') + b'\n'
+                    )
+
+    def recv_ready(self):
+        return len(self.stdout) > 0
+
+    def recv_stderr_ready(self):
+        return len(self.stderr) > 0
+
+    def recv(self, size):
+        data, self.stdout = self.stdout[:size], self.stdout[size:]
+        return data
+
+    def recv_stderr(self, size):
+        data, self.stderr = self.stderr[:size], self.stderr[size:]
+        return data
+
+
+@mock.patch('robottelo.cli.hammer_shell.select')
+class HammerShellTestCase(unittest2.TestCase):
+    """Tests for class ``robottelo.cli.hammer_shell.HammerShell``."""
+    def setUp(self):
+        self.shell = hammer_shell.HammerShell('admin', 'changeme', 'server')
+        self.shell._channel = MockChannel({
+            b'--output=csv organization list': (
+                b'Id,Name\n1,Default Organization\n', b'', 0),
+            b'organization info --id="2"': (
+                b'', b'Could not find organization 2\n', 65),
+            b'organization list': (
+                b'', b'Failed to load a plugin, ignored\n', 0),
+            b'organization delete': (b'', b'', None),
+        })
+
+    def test_run(self, select):
+        """The command output is framed and parsed like ``ssh.command``."""
+        select.select.return_value = ([], [], [])
+        result = self.shell.run('organization list', output_format='csv')
+        self.assertEqual(result.return_code, 0)
+        self.assertFalse(result.stderr)
+        self.assertEqual(
+            result.stdout, [{'id': '1', 'name': 'Default Organization'}])
+
+    def test_run_error(self, select):
+        """The complaint about the marker is not part of the stderr and
+        errors reported by hammer give a non-zero return code.
+
+        """
+        select.select.return_value = ([], [], [])
+        result = self.shell.run('organization info --id="2"')
+        self.assertEqual(result.return_code, 65)
+        self.assertEqual(result.stderr, u'Could not find organization 2\n')
+        self.assertEqual(self.shell._channel.stderr, b'')
+
+    def test_run_dead_process(self, select):
+        """A dead session can't run commands."""
+        self.shell._channel.closed = True
+        with self.assertRaises(hammer_shell.HammerShellError):
+            self.shell.run('organization list')
+
+    def test_run_warning(self, select):
+        """Warnings do not make a command fail"""
+        select.select.return_value = ([], [], [])
+        result = self.shell.run('organization list')
+        self.assertEqual(result.return_code, 0)
+        self.assertEqual(result.stderr, u'Failed to load a plugin, ignored\n')
+
+    def test_run_no_status(self, select):
+        """A command without exit status breaks the session"""
+        select.select.return_value = ([], [], [])
+        with self.assertRaises(hammer_shell.HammerShellError):
+            self.shell.run('organization delete')
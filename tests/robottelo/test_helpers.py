@@ -4,6 +4,7 @@ import six
 import unittest2
 from robottelo.helpers import (
     HostInfoError,
+    canonical_options,
     escape_search,
     get_host_info,
     get_server_version,
@@ -117,3 +118,23 @@ class EscapeSearchTestCase(unittest2.TestCase):
         term = escape_search('term')
         self.assertEqual(term[0], '"')
         self.assertEqual(term[-1], '"')
+
+
+class CanonicalOptionsTestCase(unittest2.TestCase):
+    def test_order(self):
+        """Equal options give the same key whatever their order"""
+        self.assertEqual(
+            canonical_options({u'name': u'foo', u'organization-id': 1}),
+            canonical_options({u'organization-id': 1, u'name': u'foo'}),
+        )
+
+    def test_empty(self):
+        """No options are the same as empty options"""
+        self.assertEqual(canonical_options(None), canonical_options({}))
+
+    def test_different(self):
+        """Different options give different keys"""
+        self.assertNotEqual(
+            canonical_options({u'organization-id': 1}),
+            canonical_options({u'organization-id': 2}),
+        )
@@ -0,0 +1,89 @@
+"""Tests for module ``robottelo.performance.histogram``."""
+import math
+import random
+import unittest2
+
+from robottelo.performance.histogram import LatencyHistogram
+
+
+def nearest_rank(values, percent):
+    """Return the exact nearest-rank percentile of ``values``."""
+    values = sorted(values)
+    rank = max(int(math.ceil(percent / 100.0 * len(values))), 1)
+    return values[rank - 1]
+
+
+class LatencyHistogramTestCase(unittest2.TestCase):
+    """Tests for class ``robottelo.performance.histogram.LatencyHistogram``.
+    """
+    def setUp(self):  # noqa pylint:disable=C0103
+        rand = random.Random(0)
+        self.values = [rand.lognormvariate(0, 1.5) for _ in range(20000)]
+
+    def test_percentiles(self):
+        """Percentiles are within the relative error"""
+        histogram = LatencyHistogram.from_values(self.values, 0.01)
+        percents = (0, 1, 50, 90, 95, 99, 99.9, 100)
+        for percent, value in zip(
+                percents, histogram.percentiles(percents)):
+            expected = nearest_rank(self.values, percent)
+            self.assertLessEqual(
+                abs(value - expected), 0.01 * expected, percent)
+        self.assertEqual(histogram.percentile(0), min(self.values))
+        self.assertEqual(histogram.percentile(100), max(self.values))
+
+    def test_exact_stats(self):
+        """Count, min, max, mean and standard deviation are exact"""
+        histogram = LatencyHistogram.from_values([0, 1, 2, 3, 4])
+        self.assertEqual(len(histogram), 5)
+        self.assertEqual(histogram.zero_count, 1)
+        self.assertEqual(histogram.min, 0)
+        self.assertEqual(histogram.max, 4)
+        self.assertAlmostEqual(histogram.mean, 2)
+        self.assertAlmostEqual(histogram.std, 2 ** 0.5)
+        self.assertEqual(histogram.percentile(20), 0)
+
+    def test_bounded_size(self):
+        """The number of buckets depends on the range of the values only"""
+        histogram = LatencyHistogram.from_values(
+            self.values * 10, 0.01)
+        self.assertEqual(len(histogram), 200000)
+        self.assertLess(len(histogram.counts), 1000)
+
+    def test_merge(self):
+        """Merging histograms gives the histogram of all the values"""
+        histograms = [
+            LatencyHistogram.from_values(self.values[i::4])
+            for i in range(4)
+        ]
+        merged = LatencyHistogram.merged(histograms)
+        whole = LatencyHistogram.from_values(self.values)
+        self.assertEqual(merged.counts, whole.counts)
+        self.assertEqual(len(merged), len(whole))
+        self.assertEqual(merged.min, whole.min)
+        self.assertEqual(merged.max, whole.max)
+        self.assertEqual(
+            merged.percentiles((50, 99)), whole.percentiles((50, 99)))
+
+    def test_merge_relative_error(self):
+        """Histograms with different relative errors can't be merged"""
+        with self.assertRaises(ValueError):
+            LatencyHistogram(0.01).merge(LatencyHistogram(0.02))
+
+    def test_empty(self):
+        """An empty histogram has no statistics"""
+        histogram = LatencyHistogram.merged([])
+        self.assertEqual(len(histogram), 0)
+        self.assertIsNone(histogram.mean)
+        self.assertIsNone(histogram.std)
+        self.assertEqual(histogram.percentiles((50, 99)), [None, None])
+
+    def test_invalid_values(self):
+        """Negative values and percentages out of range are rejected"""
+        histogram = LatencyHistogram()
+        with self.assertRaises(ValueError):
+            histogram.record(-1)
+        with self.assertRaises(ValueError):
+            histogram.percentile(101)
+        with self.assertRaises(ValueError):
+            LatencyHistogram(0)
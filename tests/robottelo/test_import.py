@@ -0,0 +1,94 @@
+"""Tests for module ``robottelo.cli.import_``."""
+import six
+import unittest2
+
+from collections import OrderedDict
+
+from robottelo.cli.import_ import Import
+
+if six.PY2:
+    import mock
+else:
+    from unittest import mock
+
+
+class ReadTransitionCSVTestCase(unittest2.TestCase):
+    """Tests for ``robottelo.cli.import_.Import.read_transition_csv``."""
+    @mock.patch('robottelo.cli.import_.ssh')
+    def test_read_transition_csv(self, ssh):
+        """Records of later files update the ones with the same key"""
+        ssh.read_files.return_value = OrderedDict((
+            (u'/root/organizations-1.csv', (
+                b'sat5,sat6,name\n'
+                b'1,10,"Org, Inc."\n'
+                b'2,20,Other\n'
+            )),
+            (u'/root/organizations-2.csv', (
+                b'sat5,sat6,name\n'
+                b'3,30,New\n'
+                b'1,11,"Org, Inc."\n'
+            )),
+        ))
+
+        self.assertEqual(
+            Import.read_transition_csv([u'/root/organizations*']),
+            [
+                {u'sat5': u'1', u'sat6': u'11', u'name': u'Org, Inc.'},
+                {u'sat5': u'2', u'sat6': u'20', u'name': u'Other'},
+                {u'sat5': u'3', u'sat6': u'30', u'name': u'New'},
+            ]
+        )
+        ssh.read_files.assert_called_once_with([u'/root/organizations*'])
+
+    @mock.patch('robottelo.cli.import_.ssh')
+    def test_read_transition_data(self, ssh):
+        """All the kinds of transition data are read at once"""
+        ssh.read_files.return_value = OrderedDict((
+            (u'/root/.transition_data/products-1.csv',
+                b'org_id,sat6\n1,10\n'),
+            (u'/root/.transition_data/repositories-1.csv',
+                b'sat5,sat6\n5,50\n'),
+        ))
+
+        self.assertEqual(
+            Import.read_transition_data([
+                (u'products', u'org_id'),
+                (u'repositories', u'sat5'),
+            ]),
+            [
+                [{u'org_id': u'1', u'sat6': u'10'}],
+                [{u'sat5': u'5', u'sat6': u'50'}],
+            ]
+        )
+        self.assertEqual(ssh.read_files.call_count, 1)
+
+    @mock.patch('robottelo.cli.import_.ssh')
+    def test_csv_to_dataset(self, ssh):
+        """The rows of all the files are returned in the files order"""
+        ssh.read_files.return_value = OrderedDict((
+            (u'/tmp/b.csv', b'name,label\nb,"x, y"\n'),
+            (u'/tmp/a.csv', b'name,label\na,z\n'),
+        ))
+
+        self.assertEqual(
+            Import.csv_to_dataset([u'/tmp/a.csv', u'/tmp/b.csv']),
+            [
+                {u'name': u'a', u'label': u'z'},
+                {u'name': u'b', u'label': u'x, y'},
+            ]
+        )
+        with self.assertRaises(IOError):
+            Import.csv_to_dataset([u'/tmp/c.csv'])
+
+    def test_merge_on_key(self):
+        """Records are merged on the given key"""
+        self.assertEqual(
+            Import.merge_transition_records(
+                [
+                    [{u'id': u'1', u'a': u'x'}, {u'id': u'2', u'a': u'y'}],
+                    [{u'id': u'1', u'b': u'z'}],
+                ],
+                u'id',
+            ),
+            [{u'id': u'1', u'a': u'x', u'b': u'z'}, {u'id': u'2', u'a': u'y'}]
+        )
@@ -0,0 +1,204 @@
+"""Tests for module ``robottelo.manifests``."""
+import json
+import os
+import requests
+import shutil
+import six
+import tempfile
+import threading
+import time
+import unittest2
+import zipfile
+
+from Crypto.Hash import SHA256
+from Crypto.PublicKey import RSA
+from Crypto.Signature import PKCS1_v1_5
+from robottelo import manifests
+
+if six.PY2:
+    import mock
+else:
+    from unittest import mock
+
+
+class FakeCloner(object):
+    """A ``ManifestCloner`` returning numbered manifests."""
+    def __init__(self):
+        self.count = 0
+
+    def clone(self):
+        """Return the next manifest contents."""
+        self.count += 1
+        return six.BytesIO(u'manifest-{0}'.format(self.count).encode())
+
+
+def wait_for(condition, timeout=5):
+    """Wait for ``condition`` to return ``True``."""
+    deadline = time.time() + timeout
+    while not condition():
+        if time.time() > deadline:
+            raise AssertionError('Timed out waiting for the pool')
+        time.sleep(0.01)
+
+
+def make_template():
+    """Return the contents of a template manifest."""
+    consumer_export = six.BytesIO()
+    with zipfile.ZipFile(
+            consumer_export, 'w', zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr(
+            'export/consumer.json', b'{"uuid": "old", "name": "consumer"}')
+        archive.writestr('export/entitlements/1.json', b'{"pool": 1}' * 100)
+        archive.writestr(
+            zipfile.ZipInfo('export/meta.json'), b'{"version": "0.3"}')
+    manifest = six.BytesIO()
+    with zipfile.ZipFile(manifest, 'w', zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr('consumer_export.zip', consumer_export.getvalue())
+        archive.writestr('signature', b'signature')
+    return manifest.getvalue()
+
+
+class ManifestClonerTestCase(unittest2.TestCase):
+    """Tests for class ``robottelo.manifests.ManifestCloner``."""
+    @classmethod
+    def setUpClass(cls):  # noqa pylint:disable=C0103
+        cls.key = RSA.generate(1024)
+        cls.template = make_template()
+
+    def test_clone(self):
+        """Only the consumer uuid changes and the result is signed"""
+        cloner = manifests.ManifestCloner(
+            self.template, self.key.exportKey())
+        original = zipfile.ZipFile(six.BytesIO(zipfile.ZipFile(
+            six.BytesIO(self.template)).read('consumer_export.zip')))
+        uuids = set()
+        for _ in range(2):
+            manifest = zipfile.ZipFile(cloner.clone())
+            self.assertIsNone(manifest.testzip())
+            consumer_export = manifest.read('consumer_export.zip')
+            self.assertTrue(PKCS1_v1_5.new(self.key.publickey()).verify(
+                SHA256.new(consumer_export), manifest.read('signature')))
+
+            archive = zipfile.ZipFile(six.BytesIO(consumer_export))
+            self.assertIsNone(archive.testzip())
+            self.assertEqual(archive.namelist(), original.namelist())
+            for info in archive.infolist():
+                self.assertEqual(
+                    info.compress_type,
+                    original.getinfo(info.filename).compress_type
+                )
+                if info.filename != 'export/consumer.json':
+                    self.assertEqual(
+                        archive.read(info), original.read(info.filename))
+            consumer = json.loads(
+                archive.read('export/consumer.json').decode('utf-8'))
+            self.assertEqual(consumer[u'name'], u'consumer')
+            uuids.add(consumer[u'uuid'])
+        self.assertEqual(len(uuids), 2)
+        self.assertNotIn(u'old', uuids)
+
+
+class ManifestPoolTestCase(unittest2.TestCase):
+    """Tests for class ``robottelo.manifests.ManifestPool``."""
+    def test_get(self):
+        """Manifests are cloned ahead of time up to the pool size"""
+        cloner = FakeCloner()
+        pool = manifests.ManifestPool(cloner, 2)
+
+        first = pool.get()
+        wait_for(lambda: pool.stats()[u'ready'] == 2)
+        second = pool.get()
+
+        contents = set((first.read(), second.read()))
+        self.assertEqual(len(contents), 2)
+        self.assertEqual(
+            pool.stats(), {u'hits': 1, u'misses': 1, u'ready': 1})
+        wait_for(lambda: pool.stats()[u'ready'] == 2)
+
+    def test_clone_failure(self):
+        """Manifests are cloned on demand when the thread fails"""
+        main_thread = threading.current_thread()
+
+        def clone():
+            """Fail to clone out of the main thread."""
+            if threading.current_thread() is not main_thread:
+                raise ValueError('boom')
+            return six.BytesIO(b'manifest')
+
+        cloner = mock.Mock()
+        cloner.clone.side_effect = clone
+        pool = manifests.ManifestPool(cloner, 2)
+
+        self.assertEqual(pool.get().read(), b'manifest')
+        wait_for(lambda: pool._thread is None)  # noqa pylint:disable=W0212
+        self.assertEqual(pool.stats()[u'ready'], 0)
+
+
+class CloneTestCase(unittest2.TestCase):
+    """Tests for function ``robottelo.manifests.clone``."""
+    @mock.patch('robottelo.manifests._manifest_cloner')
+    @mock.patch('robottelo.manifests.settings')
+    def test_clone_without_pool(self, settings, cloner):
+        """Manifests are cloned on demand if the pool is disabled"""
+        settings.fake_manifest.pool_size = 0
+        cloner.clone.return_value = six.BytesIO(b'manifest')
+        with manifests.clone() as manifest:
+            self.assertEqual(manifest.content.read(), b'manifest')
+
+
+class DownloadCacheTestCase(unittest2.TestCase):
+    """Tests for class ``robottelo.manifests.DownloadCache``."""
+    url = u'http://example.org/manifest.zip'
+
+    def setUp(self):  # noqa pylint:disable=C0103
+        self.path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.path)
+        self.cache = manifests.DownloadCache(self.path)
+        patcher = mock.patch('robottelo.manifests.requests.get')
+        self.get = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_fetch(self):
+        """The server is asked whether the cached file changed"""
+        self.get.return_value = mock.Mock(
+            status_code=200, content=b'zip', headers={'ETag': u'"v1"'})
+        self.assertEqual(self.cache.fetch(self.url), b'zip')
+
+        self.get.return_value = mock.Mock(status_code=304)
+        self.assertEqual(
+            manifests.DownloadCache(self.path).fetch(self.url), b'zip')
+        self.get.assert_called_with(
+            self.url, headers={'If-None-Match': u'"v1"'})
+
+    def test_fetch_changed(self):
+        """Changed files are downloaded and cached again"""
+        self.cache.store(self.url, b'old', last_modified=u'yesterday')
+        self.get.return_value = mock.Mock(
+            status_code=200, content=b'new', headers={})
+        self.assertEqual(self.cache.fetch(self.url), b'new')
+        self.get.assert_called_once_with(
+            self.url, headers={'If-Modified-Since': u'yesterday'})
+        self.assertEqual(self.cache.load(self.url)[0], b'new')
+
+    def test_fetch_offline(self):
+        """Cached files are used without contacting the server"""
+        with self.assertRaises(IOError):
+            self.cache.fetch(self.url, offline=True)
+        self.cache.store(self.url, b'zip')
+        self.assertEqual(self.cache.fetch(self.url, offline=True), b'zip')
+        self.assertFalse(self.get.called)
+
+    def test_fetch_unreachable(self):
+        """Cached files are used when the server can not be reached"""
+        self.cache.store(self.url, b'zip', etag=u'"v1"')
+        self.get.side_effect = requests.ConnectionError()
+        self.assertEqual(self.cache.fetch(self.url), b'zip')
+
+    def test_corrupted(self):
+        """Corrupted files are not used"""
+        self.cache.store(self.url, b'zip')
+        blobs = os.path.join(self.path, u'blobs')
+        for name in os.listdir(blobs):
+            with open(os.path.join(blobs, name), 'wb') as handler:
+                handler.write(b'garbage')
+        self.assertEqual(self.cache.load(self.url), (None, None))
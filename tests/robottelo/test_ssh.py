@@ -1,7 +1,13 @@
 """Tests for module ``robottelo.ssh``."""
 # (too-many-public-methods) pylint: disable=R0904
 import os
+import shutil
+import subprocess
 import six
+import sys
+import tempfile
+import time
+import unittest2
 
 from robottelo import ssh
 from unittest2 import TestCase
@@ -9,9 +15,25 @@ from unittest2 import TestCase
 if six.PY2:
     import mock
 else:
+    import asyncio
     from unittest import mock
 
 
+class MockTransport(object):
+    """A mock ``paramiko.Transport`` object."""
+    def __init__(self):
+        self.active = True
+        self.keepalive = None
+
+    def is_active(self):
+        """Return whether the transport was not marked as dead."""
+        return self.active
+
+    def set_keepalive(self, interval):
+        """Record the keepalive interval."""
+        self.keepalive = interval
+
+
 class MockSSHClient(object):
     """A mock ``paramiko.SSHClient`` object."""
     def __init__(self):
@@ -30,6 +52,7 @@ class MockSSHClient(object):
         self.hostname = None
         self.username = None
         self.key_filename = None
+        self.transport = MockTransport()
 
     def set_missing_host_key_policy(self, policy):  # pylint:disable=W0613
         """A no-op stub method."""
@@ -58,6 +81,10 @@ class MockSSHClient(object):
         """A no-op stub method."""
         self.close_ += 1
 
+    def get_transport(self):
+        """Return the mock transport."""
+        return self.transport
+
 
 class SSHTestCase(TestCase):
     """Tests for module ``robottelo.ssh``."""
@@ -90,3 +117,517 @@ class SSHTestCase(TestCase):
         self.assertEqual(connection.set_missing_host_key_policy_, 1)
         self.assertEqual(connection.connect_, 1)
         self.assertEqual(connection.close_, 1)
+
+
+class SSHConnectionPoolTestCase(TestCase):
+    """Tests for class ``robottelo.ssh.SSHConnectionPool``."""
+    def setUp(self):
+        """Mock up ``paramiko.SSHClient`` and create a new pool."""
+        patcher = mock.patch(
+            'robottelo.ssh._call_paramiko_sshclient', MockSSHClient)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.pool = ssh.SSHConnectionPool(
+            keepalive_interval=15, max_idle_time=60)
+
+    def test_reuse_connection(self):
+        """The same connection is handed out for the same parameters."""
+        client = self.pool.acquire('example.com', 'nobody', 'key')
+        self.pool.release(client)
+        self.assertIs(
+            self.pool.acquire('example.com', 'nobody', 'key'), client)
+        self.assertEqual(client.connect_, 1)
+        self.assertEqual(client.close_, 0)
+        self.assertEqual(client.transport.keepalive, 15)
+        self.assertIsNot(
+            self.pool.acquire('example.org', 'nobody', 'key'), client)
+
+    def test_reconnect_dead_connection(self):
+        """A new connection is made when the pooled one is dead."""
+        client = self.pool.acquire('example.com', 'nobody', 'key')
+        self.pool.release(client)
+        client.transport.active = False
+        new_client = self.pool.acquire('example.com', 'nobody', 'key')
+        self.assertIsNot(new_client, client)
+        self.assertEqual(client.close_, 1)
+
+    def test_discard_in_use_connection(self):
+        """A discarded connection is closed only by its last user."""
+        client = self.pool.acquire('example.com', 'nobody', 'key')
+        self.assertIs(
+            self.pool.acquire('example.com', 'nobody', 'key'), client)
+        self.pool.release(client, discard=True)
+        self.assertEqual(client.close_, 0)
+        self.assertIsNot(
+            self.pool.acquire('example.com', 'nobody', 'key'), client)
+        self.pool.release(client)
+        self.assertEqual(client.close_, 1)
+
+    @mock.patch('robottelo.ssh.time')
+    def test_evict_idle_connection(self, time):
+        """Connections idle for more than ``max_idle_time`` are closed."""
+        time.time.return_value = 1000
+        client = self.pool.acquire('example.com', 'nobody', 'key')
+        self.pool.release(client)
+        time.time.return_value = 1061
+        other_client = self.pool.acquire('example.org', 'nobody', 'key')
+        self.assertEqual(client.close_, 1)
+        self.assertEqual(other_client.close_, 0)
+
+    @mock.patch('robottelo.ssh.os')
+    def test_forked_process(self, os_mock):
+        """Connections inherited from a parent process are not reused."""
+        os_mock.getpid.return_value = self.pool._pid
+        client = self.pool.acquire('example.com', 'nobody', 'key')
+        self.pool.release(client)
+        os_mock.getpid.return_value = self.pool._pid + 1
+        self.assertIsNot(
+            self.pool.acquire('example.com', 'nobody', 'key'), client)
+        self.assertEqual(client.close_, 0)
+
+
+def run_locally(cmd, hostname, timeout):  # pylint:disable=W0613
+    """Run ``cmd`` in a local shell, like ``ssh._exec_command`` does."""
+    process = subprocess.Popen(
+        ['sh', '-c', cmd],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    )
+    stdout, stderr = process.communicate()
+    return (process.returncode, stdout, stderr)
+
+
+@mock.patch('robottelo.ssh._exec_command', run_locally)
+class CommandManyTestCase(TestCase):
+    """Tests for function ``robottelo.ssh.command_many``."""
+    def test_command_many(self):
+        """The output and return code of every command are separated"""
+        results = ssh.command_many([
+            ('printf "Id,Name\\n1,foo\\n"', 'csv'),
+            ('(echo oops >&2; exit 3)', None),
+            ('printf "no newline"', None),
+            ('true', None),
+        ], hostname='localhost')
+
+        self.assertEqual(len(results), 4)
+        self.assertEqual(results[0].return_code, 0)
+        self.assertEqual(results[0].stdout, [{'id': '1', 'name': 'foo'}])
+        self.assertFalse(results[0].stderr)
+        self.assertEqual(results[1].return_code, 3)
+        self.assertEqual(results[1].stderr, u'oops\n')
+        self.assertEqual(results[2].stdout, [u'no newline'])
+        self.assertEqual(results[3].return_code, 0)
+        self.assertFalse(results[3].stdout)
+
+    def test_command_many_interrupted(self):
+        """Commands not run get the script exit status"""
+        results = ssh.command_many([
+            ('echo first', None),
+            ('echo second; exit 5', None),
+            ('echo third', None),
+        ], hostname='localhost')
+
+        self.assertEqual(results[0].stdout, [u'first', u''])
+        self.assertEqual(results[1].stdout, [u'second', u''])
+        self.assertEqual(results[1].return_code, 5)
+        self.assertEqual(results[2].return_code, 5)
+        self.assertFalse(results[2].stdout)
+
+    def test_command_many_stop_on_error(self):
+        """Commands following a failed command are not run"""
+        results = ssh.command_many([
+            ('echo first', None),
+            ('(echo oops >&2; exit 4)', None),
+            ('echo third', None),
+        ], hostname='localhost', stop_on_error=True)
+
+        self.assertEqual(results[0].return_code, 0)
+        self.assertEqual(results[1].return_code, 4)
+        self.assertEqual(results[1].stderr, u'oops\n')
+        self.assertEqual(results[2].return_code, 4)
+        self.assertFalse(results[2].stdout)
+
+
+def run_locally_timed(cmd, hostname, timeout, timings):
+    """Run ``cmd`` locally like ``run_locally`` and record fake phases."""
+    timings.update(connect=0.0, execute=0.0, transfer=0.0)
+    return run_locally(cmd, hostname, timeout)
+
+
+@mock.patch('robottelo.ssh._exec_command', run_locally_timed)
+class TimedCommandTestCase(TestCase):
+    """Tests for function ``robottelo.ssh.timed_command``."""
+    def test_timed_command(self):
+        """The timing phases are set on the result"""
+        result = ssh.timed_command('echo foo', hostname='localhost')
+
+        self.assertEqual(result.return_code, 0)
+        self.assertEqual(result.stdout, [u'foo', u''])
+        self.assertIsNone(result.timing.server)
+        self.assertGreaterEqual(result.timing.total, 0)
+        self.assertEqual(result.timing.elapsed, result.timing.execute)
+
+    def test_server_timing(self):
+        """The server timing is removed from stderr and the return code is
+        kept
+
+        """
+        result = ssh.timed_command(
+            'echo foo; echo bar >&2; sleep 0.1; exit 3',
+            hostname='localhost',
+            server_timing=True,
+        )
+
+        self.assertEqual(result.return_code, 3)
+        self.assertEqual(result.stdout, [u'foo', u''])
+        self.assertEqual(result.stderr.strip(), u'bar')
+        self.assertGreaterEqual(result.timing.server, 0.1)
+        self.assertEqual(result.timing.elapsed, result.timing.execute)
+
+
+@mock.patch('robottelo.ssh._exec_command', run_locally)
+class ReadFilesTestCase(TestCase):
+    """Tests for function ``robottelo.ssh.read_files``."""
+    def setUp(self):  # noqa pylint:disable=C0103
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+        for name, content in (
+                (u'data-10.csv', b'ten\n'),
+                (u'data-2.csv', b'two\n'),
+                (u'other.csv', b'other\n')):
+            with open(os.path.join(self.tmpdir, name), 'wb') as handler:
+                handler.write(content)
+
+    def test_read_files(self):
+        """Files matching the patterns are read in version order"""
+        files = ssh.read_files(
+            [os.path.join(self.tmpdir, u'data-*')], hostname='localhost')
+        self.assertEqual(list(files.items()), [
+            (os.path.join(self.tmpdir, u'data-2.csv'), b'two\n'),
+            (os.path.join(self.tmpdir, u'data-10.csv'), b'ten\n'),
+        ])
+
+    def test_read_files_no_match(self):
+        """Patterns matching no file are left out"""
+        files = ssh.read_files(
+            [os.path.join(self.tmpdir, u'missing*')], hostname='localhost')
+        self.assertEqual(len(files), 0)
+
+
+class MockWindowChannel(object):
+    """A mock ``paramiko.Channel`` whose command, like a real one, can only
+    end once its output fits in the channel window.
+
+    """
+    window = 2 * 1024 * 1024
+
+    def __init__(self, stdout, stderr, status):
+        self.stdout = stdout
+        self.stderr = stderr
+        self.status = status
+        self.timeout = None
+        self.closed = False
+        self.command = None
+
+    @property
+    def eof_received(self):
+        return self.exit_status_ready()
+
+    def settimeout(self, timeout):
+        self.timeout = timeout
+
+    def exec_command(self, command):
+        self.command = command
+
+    def exit_status_ready(self):
+        return len(self.stdout) + len(self.stderr) <= self.window
+
+    def recv_exit_status(self):
+        if not self.exit_status_ready():
+            raise AssertionError('Deadlock: the command output is not read')
+        return self.status
+
+    def recv_ready(self):
+        return len(self.stdout) > 0
+
+    def recv_stderr_ready(self):
+        return len(self.stderr) > 0
+
+    def recv(self, size):
+        data, self.stdout = self.stdout[:size], self.stdout[size:]
+        return data
+
+    def recv_stderr(self, size):
+        data, self.stderr = self.stderr[:size], self.stderr[size:]
+        return data
+
+    def close(self):
+        self.closed = True
+
+
+class ExecCommandTestCase(TestCase):
+    """Tests for function ``robottelo.ssh._exec_command``."""
+    def setUp(self):
+        self.connection = mock.MagicMock()
+        patcher = mock.patch('robottelo.ssh._get_pooled_connection')
+        get_pooled_connection = patcher.start()
+        self.addCleanup(patcher.stop)
+        get_pooled_connection.return_value.__enter__.return_value = (
+            self.connection)
+
+    def test_output_larger_than_window(self):
+        """The output is read while the command runs"""
+        stdout = os.urandom(3 * MockWindowChannel.window)
+        stderr = b'e' * MockWindowChannel.window
+        channel = MockWindowChannel(stdout, stderr, 2)
+        self.connection.get_transport.return_value.open_session.return_value = (  # noqa
+            channel)
+        timings = {}
+        result = ssh._exec_command(  # pylint:disable=W0212
+            'tar -czf - /data', 'example.com', 30, timings)
+
+        self.assertEqual(result, (2, stdout, stderr))
+        self.assertEqual(channel.command, 'tar -czf - /data')
+        self.assertEqual(channel.timeout, 30)
+        self.assertTrue(channel.closed)
+        self.assertEqual(
+            sorted(timings), ['connect', 'execute', 'transfer'])
+
+    @mock.patch('robottelo.ssh.select')
+    def test_explicit_timeout(self, select):
+        """A silent command fails once the given timeout is reached"""
+        select.select.return_value = ([], [], [])
+        channel = MockWindowChannel(b'', b'', 0)
+        channel.exit_status_ready = lambda: False
+        self.connection.get_transport.return_value.open_session.return_value = (  # noqa
+            channel)
+        with self.assertRaises(ssh.socket.timeout):
+            ssh._exec_command(  # pylint:disable=W0212
+                'sleep 60', 'example.com', 0.01)
+        self.assertTrue(channel.closed)
+
+    @mock.patch('robottelo.ssh._exec_command')
+    def test_no_default_timeout(self, exec_command):
+        """Commands wait forever unless a timeout is given"""
+        exec_command.return_value = (0, b'', b'')
+        ssh.command('foreman-rake katello:reindex', hostname='example.com')
+        ssh.command_many([('true', None)], hostname='example.com')
+        for call in exec_command.call_args_list:
+            self.assertIsNone(call[0][2])
+
+
+class MockChannel(object):
+    """A mock ``paramiko.Channel`` whose command ends after ``delay``."""
+    running = 0
+    max_running = 0
+
+    def __init__(self, loop, delay, stdout, stderr, status):
+        self.closed = False
+        self.eof_received = False
+        self.stdout = stdout
+        self.stderr = stderr
+        self.status = status
+        self.read_fd, self.write_fd = os.pipe()
+        MockChannel.running += 1
+        MockChannel.max_running = max(
+            MockChannel.max_running, MockChannel.running)
+        loop.call_later(delay, self.finish)
+
+    def finish(self):
+        """Make the command output available and end the command."""
+        self.eof_received = True
+        os.write(self.write_fd, b'x')
+
+    def fileno(self):
+        return self.read_fd
+
+    def exit_status_ready(self):
+        return self.eof_received
+
+    def recv_exit_status(self):
+        return self.status
+
+    def recv_ready(self):
+        return self.eof_received and len(self.stdout) > 0
+
+    def recv_stderr_ready(self):
+        return self.eof_received and len(self.stderr) > 0
+
+    def recv(self, size):
+        data, self.stdout = self.stdout[:size], self.stdout[size:]
+        return data
+
+    def recv_stderr(self, size):
+        data, self.stderr = self.stderr[:size], self.stderr[size:]
+        return data
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            MockChannel.running -= 1
+            os.close(self.read_fd)
+            os.close(self.write_fd)
+
+
+@unittest2.skipIf(sys.version_info < (3, 5), 'asyncio engine needs 3.5')
+class AsyncCommandTestCase(TestCase):
+    """Tests for functions ``robottelo.ssh.acommand`` and ``afanout``."""
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.addCleanup(self.loop.close)
+        self.pool = mock.Mock()
+        patcher = mock.patch('robottelo.ssh._connection_pool', self.pool)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.opened = []
+        MockChannel.running = MockChannel.max_running = 0
+
+    def mock_channels(self, delay=0.01, stdout=b'', stderr=b'', status=0):
+        """Make the pool hand clients opening ``MockChannel`` objects."""
+        def open_channel(client, cmd):
+            """Open a mock channel and record the command."""
+            self.opened.append(cmd)
+            return MockChannel(self.loop, delay, stdout, stderr, status)
+        patcher = mock.patch(
+            'robottelo.ssh_async._open_channel', open_channel)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_acommand(self):
+        """The command output is collected without blocking"""
+        self.mock_channels(stdout=b'Id,Name\n1,foo\n', stderr=b'warn\n')
+        result = self.loop.run_until_complete(
+            ssh.acommand('hammer --output=csv org list', 'host1', 'csv'))
+
+        self.assertEqual(self.opened, ['hammer --output=csv org list'])
+        self.assertEqual(result.return_code, 0)
+        self.assertEqual(result.stdout, [{'id': '1', 'name': 'foo'}])
+        self.assertEqual(result.stderr, u'warn\n')
+        self.pool.acquire.assert_called_once_with(hostname='host1')
+        self.pool.release.assert_called_once_with(
+            self.pool.acquire.return_value, discard=False)
+
+    def test_acommand_timeout(self):
+        """The channel is closed when the command times out"""
+        self.mock_channels(delay=10)
+        with self.assertRaises(asyncio.TimeoutError):
+            self.loop.run_until_complete(
+                ssh.acommand('sleep 10', 'host1', timeout=0.05))
+        self.assertEqual(MockChannel.running, 0)
+        self.assertEqual(self.pool.release.call_count, 1)
+
+    def test_acommand_timeout_while_starting(self):
+        """The client and channel are released when the command times out
+        before the executor is done starting it
+
+        """
+        self.mock_channels()
+
+        def acquire(hostname):  # pylint:disable=W0613
+            """Take a while to connect"""
+            time.sleep(0.1)
+            return mock.sentinel.client
+        self.pool.acquire.side_effect = acquire
+        with self.assertRaises(asyncio.TimeoutError):
+            self.loop.run_until_complete(
+                ssh.acommand('true', 'host1', timeout=0.01))
+        self.assertFalse(self.pool.release.called)
+        self.loop.run_until_complete(asyncio.sleep(0.3))
+        self.pool.release.assert_called_once_with(mock.sentinel.client)
+        self.assertEqual(MockChannel.running, 0)
+
+    def test_afanout(self):
+        """Commands run concurrently, bounded on each host"""
+        self.mock_channels(stdout=b'done\n', status=3)
+        with mock.patch('robottelo.ssh_async.MAX_COMMANDS_PER_HOST', 2):
+            results = self.loop.run_until_complete(asyncio.gather(
+                ssh.afanout('true', ['host1', 'host2', 'host3']),
+                ssh.afanout('true', ['host1', 'host2', 'host3']),
+                ssh.afanout('true', ['host1', 'host2', 'host3']),
+            ))
+
+        self.assertEqual(len(self.opened), 9)
+        # Two commands on each of the three hosts at most
+        self.assertEqual(MockChannel.max_running, 6)
+        for result in results:
+            self.assertEqual(sorted(result), ['host1', 'host2', 'host3'])
+            for host_result in result.values():
+                self.assertEqual(host_result.return_code, 3)
+                self.assertEqual(host_result.stdout, [u'done', u''])
+
+
+class MockStreamChannel(object):
+    """A mock ``paramiko.Channel`` which received all of its output."""
+    def __init__(self, chunks, stderr):
+        self.chunks = list(chunks)
+        self.stderr = stderr
+        self.eof_received = True
+        self.closed = False
+        self.command = None
+
+    def exec_command(self, command):
+        self.command = command
+
+    def recv_ready(self):
+        return len(self.chunks) > 0
+
+    def recv_stderr_ready(self):
+        return len(self.stderr) > 0
+
+    def recv(self, size):  # pylint:disable=W0613
+        return self.chunks.pop(0) if self.chunks else b''
+
+    def recv_stderr(self, size):
+        data, self.stderr = self.stderr[:size], self.stderr[size:]
+        return data
+
+    def recv_exit_status(self):
+        return 0
+
+    def close(self):
+        self.closed = True
+
+
+class CommandStreamTestCase(TestCase):
+    """Tests for function ``robottelo.ssh.command_stream``."""
+    def setUp(self):
+        self.connection = mock.MagicMock()
+        patcher = mock.patch('robottelo.ssh._get_pooled_connection')
+        get_pooled_connection = patcher.start()
+        self.addCleanup(patcher.stop)
+        get_pooled_connection.return_value.__enter__.return_value = (
+            self.connection)
+
+    def mock_channel(self, chunks, stderr=b''):
+        """Make the connection open a channel receiving ``chunks``."""
+        channel = MockStreamChannel(chunks, stderr)
+        self.connection.get_transport.return_value.open_session.return_value = (  # noqa
+            channel)
+        return channel
+
+    def test_command_stream(self):
+        """Lines are decoded and cleaned up as chunks are received"""
+        channel = self.mock_channel([
+            b'Id,Name\n1,"" \xc3',
+            b'\xa5\n[ INFO 2015] Rails\n\x1b[32m2,green\x1b[0m',
+            b'\n3,last',
+        ], b'\x1b[31mwarning\x1b[0m\n')
+        stream = ssh.command_stream('hammer list', 'example.com')
+        self.assertIsNone(stream.return_code)
+        lines = list(stream)
+
+        self.assertEqual(channel.command, 'hammer list')
+        self.assertEqual(
+            lines, [u'Id,Name', u'1, \xe5', u'2,green', u'3,last'])
+        self.assertEqual(stream.return_code, 0)
+        self.assertEqual(stream.stderr, u'warning\n')
+        self.assertTrue(channel.closed)
+
+    def test_command_stream_close(self):
+        """Closing the stream early closes the channel"""
+        channel = self.mock_channel([b'1\n', b'2\n', b'3\n'])
+        with ssh.command_stream('seq 3', 'example.com') as stream:
+            self.assertEqual(next(iter(stream)), u'1')
+        self.assertTrue(channel.closed)
+        self.assertEqual(channel.chunks, [b'2\n', b'3\n'])
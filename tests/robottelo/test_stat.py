@@ -0,0 +1,106 @@
+"""Tests for module ``robottelo.performance.stat``."""
+import csv
+import numpy
+import os
+import shutil
+import tempfile
+import six
+import unittest2
+
+from robottelo.performance.graph import (
+    generate_line_chart_stat_bucketized_candlepin,
+)
+from robottelo.performance.histogram import LatencyHistogram
+from robottelo.performance.stat import (
+    STAT_HEADER,
+    generate_stat_for_concurrent_thread,
+    generate_stat_for_histogram,
+)
+
+if six.PY2:
+    import mock
+else:
+    from unittest import mock
+
+
+class StatTestCase(unittest2.TestCase):
+    """Tests for the statistics csv files."""
+    def setUp(self):  # noqa pylint:disable=C0103
+        self.directory = tempfile.mkdtemp()
+        self.stat_file = os.path.join(self.directory, 'stat.csv')
+
+    def tearDown(self):  # noqa pylint:disable=C0103
+        shutil.rmtree(self.directory)
+
+    def read_rows(self):
+        """Return the rows of the statistics file."""
+        with open(self.stat_file) as handler:
+            return list(csv.reader(handler))
+
+    def test_concurrent_thread(self):
+        """A row of statistics is written for each bucket"""
+        stat = generate_stat_for_concurrent_thread(
+            'client-0', [float(value) for value in range(1, 201)],
+            self.stat_file, 100)
+
+        rows = self.read_rows()
+        self.assertEqual(rows[:3], [[], ['client-0'], STAT_HEADER])
+        self.assertEqual([row[0] for row in rows[3:]], ['1-100', '101-200'])
+        self.assertEqual(len(rows[3]), len(STAT_HEADER))
+        self.assertEqual(sorted(stat), [0, 1])
+        self.assertEqual(stat[1][:3], (101, 150.5, 200))
+        self.assertAlmostEqual(stat[1][3], 28.866, places=3)
+        self.assertAlmostEqual(float(rows[4][-1]), 199.901)
+
+    def test_concurrent_thread_ragged(self):
+        """The timings left after the full buckets make a last bucket"""
+        time_list = [float(value) for value in range(1, 251)]
+        stat = generate_stat_for_concurrent_thread(
+            'client-0', time_list, self.stat_file, 100)
+
+        rows = self.read_rows()
+        self.assertEqual(
+            [row[0] for row in rows[3:]], ['1-100', '101-200', '201-250'])
+        self.assertEqual(sorted(stat), [0, 1, 2])
+        self.assertEqual(stat[2][:3], (201, 225.5, 250))
+        for row, start in zip(rows[3:], (0, 100, 200)):
+            bucket = numpy.array(time_list[start:start + 100])
+            self.assertAlmostEqual(float(row[3]), numpy.mean(bucket))
+            self.assertAlmostEqual(
+                float(row[7]), numpy.percentile(bucket, 95))
+
+    @mock.patch('robottelo.performance.graph.pygal')
+    def test_concurrent_thread_ragged_chart(self, pygal):
+        """The chart has a label for every bucket, the last one included"""
+        stat = generate_stat_for_concurrent_thread(
+            'client-0', [float(value) for value in range(1, 251)],
+            self.stat_file, 100)
+        generate_line_chart_stat_bucketized_candlepin(
+            stat, 'client-0', 'client-0.svg', 100, 250)
+
+        self.assertEqual(
+            pygal.Line.return_value.x_labels,
+            ['1-100', '101-200', '201-250'],
+        )
+
+    def test_concurrent_thread_short(self):
+        """Fewer timings than a bucket make a single bucket"""
+        stat = generate_stat_for_concurrent_thread(
+            'client-0', [1.0, 3.0], self.stat_file, 100)
+
+        self.assertEqual(self.read_rows()[3][0], '1-2')
+        self.assertEqual(stat, {0: (1, 2, 3, 1)})
+
+    def test_histogram(self):
+        """The statistics of a histogram are written"""
+        histogram = LatencyHistogram.from_values(
+            [float(value) for value in range(1, 1001)])
+        gmin, gmedian, gmax, _ = generate_stat_for_histogram(
+            'test-2', histogram, self.stat_file)
+
+        rows = self.read_rows()
+        self.assertEqual(rows[:2], [[], STAT_HEADER])
+        self.assertEqual(rows[2][0], 'test-2')
+        self.assertEqual((gmin, gmax), (1, 1000))
+        self.assertLessEqual(abs(gmedian - 500), 5)
+        self.assertLessEqual(abs(float(rows[2][-1]) - 999), 10)
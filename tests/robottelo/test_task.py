@@ -0,0 +1,122 @@
+"""Tests for module ``robottelo.cli.task``."""
+import six
+import unittest2
+
+from robottelo.cli.base import CLIError
+from robottelo.cli.repository import Repository
+from robottelo.cli.task import Task, TaskError
+
+if six.PY2:
+    import mock
+else:
+    from unittest import mock
+
+TASK_1 = u'11111111-2222-3333-4444-555555555555'
+TASK_2 = u'66666666-7777-8888-9999-000000000000'
+
+
+@mock.patch('robottelo.cli.task.time')
+@mock.patch.object(Task, 'list')
+class WaitForTasksTestCase(unittest2.TestCase):
+    """Tests for ``robottelo.cli.task.Task.wait_for_tasks``."""
+    def setUp(self):
+        self.now = [0]
+
+    def clock(self, time):
+        """Make sleeping move the mocked clock forward"""
+        time.time.side_effect = lambda: self.now[0]
+
+        def sleep(seconds):
+            self.now[0] += seconds
+        time.sleep.side_effect = sleep
+
+    def test_wait(self, task_list, time):
+        """Tasks are polled together until all are stopped, backing off"""
+        self.clock(time)
+        task_list.side_effect = [
+            [
+                {'id': TASK_1, 'state': 'running', 'result': 'pending'},
+                {'id': TASK_2, 'state': 'stopped', 'result': 'success'},
+            ],
+            [{'id': TASK_1, 'state': 'running', 'result': 'pending'}],
+            [{'id': TASK_1, 'state': 'stopped', 'result': 'success'}],
+        ]
+        tasks = Task.wait_for_tasks([TASK_1, TASK_2])
+
+        self.assertEqual(sorted(tasks), [TASK_1, TASK_2])
+        self.assertEqual(
+            [call[0][0] for call in time.sleep.call_args_list], [1, 2])
+        self.assertEqual(
+            task_list.call_args_list[0][0][0],
+            {u'search': u'id = {0} or id = {1}'.format(TASK_1, TASK_2)}
+        )
+        self.assertEqual(
+            task_list.call_args_list[1][0][0],
+            {u'search': u'id = {0}'.format(TASK_1)}
+        )
+
+    def test_failed(self, task_list, time):
+        """Tasks which did not succeed are reported"""
+        self.clock(time)
+        task_list.return_value = [
+            {'id': TASK_1, 'state': 'stopped', 'result': 'error'}]
+        with self.assertRaises(TaskError):
+            Task.wait_for_tasks([TASK_1])
+
+    def test_warning(self, task_list, time):
+        """Tasks with warnings succeed, like hammer reports them"""
+        self.clock(time)
+        task_list.side_effect = [
+            [
+                {'id': TASK_1, 'state': 'running', 'result': 'warning'},
+                {'id': TASK_2, 'state': 'stopped', 'result': 'success'},
+            ],
+            [{'id': TASK_1, 'state': 'stopped', 'result': 'warning'}],
+        ]
+        tasks = Task.wait_for_tasks([TASK_1, TASK_2])
+
+        self.assertEqual(sorted(tasks), [TASK_1, TASK_2])
+        self.assertEqual(tasks[TASK_1]['result'], 'warning')
+
+    def test_paused(self, task_list, time):
+        """Paused tasks are reported at once, with the other tasks pending"""
+        self.clock(time)
+        task_list.return_value = [
+            {'id': TASK_1, 'state': 'paused', 'result': 'error'},
+            {'id': TASK_2, 'state': 'running', 'result': 'pending'},
+        ]
+        with self.assertRaises(TaskError) as context:
+            Task.wait_for_tasks([TASK_1, TASK_2])
+        self.assertEqual(task_list.call_count, 1)
+        self.assertFalse(time.sleep.called)
+        self.assertIn(
+            u'{0} (paused, error)'.format(TASK_1), str(context.exception))
+
+    def test_timeout(self, task_list, time):
+        """Waiting stops after the timeout"""
+        self.clock(time)
+        task_list.return_value = [
+            {'id': TASK_1, 'state': 'running', 'result': 'pending'}]
+        with self.assertRaises(TaskError):
+            Task.wait_for_tasks([TASK_1], timeout=60)
+        self.assertLessEqual(self.now[0], 60)
+
+
+@mock.patch.object(Repository, 'execute')
+class ExecuteAsyncTestCase(unittest2.TestCase):
+    """Tests for starting tasks with ``--async``."""
+    def test_synchronize_async(self, execute):
+        """The task UUID is extracted from the output"""
+        execute.return_value = [
+            u'Repository is being synchronized in task {0}'.format(TASK_1)]
+        self.assertEqual(Repository.synchronize_async({u'id': 1}), TASK_1)
+        command = execute.call_args[0][0].split()
+        self.assertEqual(command[:2], [u'repository', u'synchronize'])
+        self.assertIn(u'--id="1"', command)
+        self.assertIn(u'--async', command)
+
+    def test_no_task(self, execute):
+        """A missing task is reported"""
+        execute.return_value = [u'Nothing to do']
+        with self.assertRaises(CLIError):
+            Repository.synchronize_async({u'id': 1})